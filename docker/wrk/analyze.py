@@ -1,119 +1,271 @@
 #!/usr/bin/env python3
 
+import argparse
 import json
-import re
 import os
 import sys
 import glob
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from datetime import datetime
 
-def parse_wrk_output(content):
-    """Parse wrk output and extract metrics"""
-    results = {}
-    
-    # Parse requests per second
-    rps_match = re.search(r'Requests/sec:\s+(\d+\.?\d*)', content)
-    if rps_match:
-        results['requests_per_sec'] = float(rps_match.group(1))
-    
-    # Parse latency
-    latency_match = re.search(r'Latency\s+(\d+\.?\d*)(us|ms|s)', content)
-    if latency_match:
-        latency_value = float(latency_match.group(1))
-        latency_unit = latency_match.group(2)
-        
-        # Convert to milliseconds
-        if latency_unit == 'us':
-            latency_value = latency_value / 1000
-        elif latency_unit == 's':
-            latency_value = latency_value * 1000
-        
-        results['latency_ms'] = latency_value
-    
-    # Parse transfer rate
-    transfer_match = re.search(r'Transfer/sec:\s+(\d+\.?\d*)(KB|MB|GB)', content)
-    if transfer_match:
-        transfer_value = float(transfer_match.group(1))
-        transfer_unit = transfer_match.group(2)
-        
-        # Convert to MB/s
-        if transfer_unit == 'KB':
-            transfer_value = transfer_value / 1024
-        elif transfer_unit == 'GB':
-            transfer_value = transfer_value * 1024
-        
-        results['transfer_mb_per_sec'] = transfer_value
-    
-    # Parse total requests
-    requests_match = re.search(r'(\d+) requests in', content)
-    if requests_match:
-        results['total_requests'] = int(requests_match.group(1))
-    
-    return results
+import numpy as np
+
+from hdr_histogram import WRK_HISTOGRAM_PREFIX, LatencyHistogram, omission_report
+from parse_cache import ParseCache, write_json_atomic
+from results_store import ResultsStore, rows_from_results
+from scalability import print_scalability, summary_scalability
+from wrk_metrics import WrkMetrics, parse_wrk_output
+
+# Bump whenever parse output changes so cached results are not reused
+PARSER_VERSION = 'wrk-4'
+
+# histogram is a LatencyHistogram when wrk ran with latency-histogram.lua
+# started: wall clock of the wrk start ('YYYY-mm-dd HH:MM:SS'), when the log has it
+BenchmarkRecord = namedtuple('BenchmarkRecord', ['runtime', 'endpoint', 'connections', 'metrics', 'histogram',
+                                                 'started'], defaults=(None, None))
+
+class WrkLogParser:
+    """Line-driven state machine over a run-benchmark.sh log.
+
+    Lines are fed one at a time; every wrk block terminated by `---`
+    yields a BenchmarkRecord. Only the current block is buffered, so
+    memory does not grow with the size of the log.
+    """
+
+    def __init__(self, runtime):
+        self.runtime = runtime
+        self.endpoint = None
+        self.connections = None
+        self.started = None
+        self._in_wrk = False
+        self._block = []
+        self._histogram = None
+
+    def feed(self, line):
+        """Consume one line, returning a record when a block completes"""
+        if line.startswith('Endpoint: '):
+            self.endpoint = line[len('Endpoint: '):].strip()
+            self.connections = None
+            self._reset_block()
+        elif line.startswith('Connections: '):
+            self.connections = line[len('Connections: '):].strip()
+            self.started = None
+            self._reset_block()
+        elif line.startswith('Started: ') and not self._in_wrk:
+            self.started = line[len('Started: '):].strip()
+        elif self._in_wrk:
+            if line.strip() == '---':
+                return self._finish_block()
+            if line.startswith(WRK_HISTOGRAM_PREFIX):
+                # Kept out of the block: it can be a very long line
+                self._histogram = LatencyHistogram.from_wrk_line(line)
+            else:
+                self._block.append(line)
+        elif line.startswith('Running') and self.connections is not None:
+            self._in_wrk = True
+        return None
+
+    def close(self):
+        """Flush a trailing block that was not terminated by `---`"""
+        if self._in_wrk:
+            return self._finish_block()
+        return None
+
+    def _reset_block(self):
+        self._in_wrk = False
+        self._block = []
+        self._histogram = None
+
+    def _finish_block(self):
+        content = ''.join(self._block)
+        histogram = self._histogram
+        self._reset_block()
+        if not content or self.endpoint is None:
+            return None
+        return BenchmarkRecord(self.runtime, self.endpoint, self.connections,
+                               parse_wrk_output(content), histogram, self.started)
+
+def runtime_from_path(filepath):
+    """Runtime name encoded in a <runtime>-benchmark-<ts>.txt file name"""
+    return os.path.basename(filepath).split('-')[0]
+
+def iter_benchmark_records(filepath):
+    """Stream BenchmarkRecords out of a benchmark file in a single pass"""
+    parser = WrkLogParser(runtime_from_path(filepath))
+    with open(filepath, 'r', errors='replace') as f:
+        for line in f:
+            record = parser.feed(line)
+            if record is not None:
+                yield record
+    record = parser.close()
+    if record is not None:
+        yield record
 
 def analyze_benchmark_file(filepath):
     """Analyze a single benchmark file"""
-    with open(filepath, 'r') as f:
-        content = f.read()
-    
-    runtime_name = os.path.basename(filepath).split('-')[0]
-    
-    # Split content by endpoints
-    sections = content.split('Endpoint: ')
     results = {
-        'runtime': runtime_name,
+        'runtime': runtime_from_path(filepath),
         'endpoints': {}
     }
     
-    for section in sections[1:]:  # Skip first empty section
-        lines = section.split('\n')
-        endpoint_name = lines[0].strip()
-        
-        results['endpoints'][endpoint_name] = {}
-        
-        # Find connection sections
-        conn_sections = section.split('Connections: ')
-        for conn_section in conn_sections[1:]:
-            conn_lines = conn_section.split('\n')
-            connections = conn_lines[0].strip()
-            
-            # Find wrk output
-            wrk_start = False
-            wrk_content = ""
-            for line in conn_lines:
-                if 'Running' in line and 'wrk' in line:
-                    wrk_start = True
-                elif wrk_start and line.strip() == '---':
-                    break
-                elif wrk_start:
-                    wrk_content += line + "\n"
-            
-            if wrk_content:
-                metrics = parse_wrk_output(wrk_content)
-                results['endpoints'][endpoint_name][connections] = metrics
+    for record in iter_benchmark_records(filepath):
+        endpoint = results['endpoints'].setdefault(record.endpoint, {})
+        endpoint[record.connections] = record.metrics.to_dict()
+        # latency-histogram.lua prints an empty line for a cell with no responses
+        if record.histogram is not None and record.histogram.total > 0:
+            histograms = results.setdefault('histograms', {}).setdefault(record.endpoint, {})
+            histograms[record.connections] = record.histogram.encode()
     
     return results
 
-def generate_summary(results_dir, timestamp):
-    """Generate summary analysis"""
-    pattern = os.path.join(results_dir, f"*-benchmark-{timestamp}.txt")
-    benchmark_files = glob.glob(pattern)
+class LogFollower:
+    """Feed lines appended to a growing benchmark file to a WrkLogParser
+
+    Only complete lines are consumed; a trailing partial line is kept
+    until the rest of it has been written.
+    """
+
+    READ_SIZE = 1024 * 1024
+
+    def __init__(self, filepath):
+        self.filepath = filepath
+        self.parser = WrkLogParser(runtime_from_path(filepath))
+        self.offset = 0
+        self._partial = ''
+
+    def poll(self):
+        """BenchmarkRecords completed since the previous poll"""
+        records = []
+        with open(self.filepath, 'r', errors='replace') as f:
+            f.seek(self.offset)
+            while True:
+                chunk = f.read(self.READ_SIZE)
+                if not chunk:
+                    break
+                lines = (self._partial + chunk).split('\n')
+                self._partial = lines.pop()
+                for line in lines:
+                    record = self.parser.feed(line + '\n')
+                    if record is not None:
+                        records.append(record)
+            self.offset = f.tell()
+        return records
+
+def timestamp_from_path(filepath):
+    """Timestamp encoded in a <runtime>-benchmark-<ts>.txt file name"""
+    name = os.path.basename(filepath)
+    return name.split('-benchmark-', 1)[1][:-len('.txt')]
+
+def find_benchmark_files(results_dir, timestamps=None):
+    """Benchmark files for the given timestamps, or every file under the tree"""
+    if timestamps:
+        paths = []
+        for timestamp in timestamps:
+            paths.extend(glob.glob(os.path.join(results_dir, f"*-benchmark-{timestamp}.txt")))
+    else:
+        paths = glob.glob(os.path.join(results_dir, '**', '*-benchmark-*.txt'), recursive=True)
+    return sorted(set(paths))
+
+def analyze_files(paths, jobs=1, cache=None):
+    """Analyze benchmark files, in a process pool when jobs > 1
+
+    Results come back in the order of `paths` whatever the pool does, so
+    summaries built from them are deterministic. With a ParseCache, only
+    files whose contents are not cached yet are parsed.
+    """
+    results = [None] * len(paths)
+    pending = []
+    for i, path in enumerate(paths):
+        if cache is not None:
+            results[i] = cache.get(path)
+        if results[i] is None:
+            pending.append(i)
     
-    if not benchmark_files:
-        print(f"No benchmark files found for timestamp {timestamp}")
-        return
+    if jobs <= 1 or len(pending) <= 1:
+        for i in pending:
+            results[i] = analyze_benchmark_file(paths[i])
+    else:
+        # Largest files first keeps the workers evenly loaded to the end
+        order = sorted(pending, key=lambda i: os.path.getsize(paths[i]), reverse=True)
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            futures = {pool.submit(analyze_benchmark_file, paths[i]): i for i in order}
+            for future in as_completed(futures):
+                results[futures[future]] = future.result()
     
+    if cache is not None:
+        for i in pending:
+            cache.put(paths[i], results[i])
+        cache.save()
+    return results
+
+def open_cache(results_dir, cache_dir=None):
+    """ParseCache for results_dir, or None when caching is disabled"""
+    if cache_dir == '':
+        return None
+    return ParseCache(cache_dir or os.path.join(results_dir, '.analyze-cache'), PARSER_VERSION)
+
+def store_runs(results_dir, runs, store_dir=None):
+    """Append {timestamp: results} to the columnar results store"""
+    if store_dir == '':
+        return
+    store = ResultsStore(store_dir or os.path.join(results_dir, 'store'))
+    rows = [rows_from_results(ts, results) for ts, results in sorted(runs.items())]
+    if rows:
+        store.append(np.concatenate(rows))
+    print(f"Results store updated: {store.store_dir}")
+
+def write_histograms(results_dir, timestamp, results):
+    """Save the encoded per-run histograms of one timestamp for hdr_histogram.py"""
+    histograms = {r['runtime']: r['histograms'] for r in results if r.get('histograms')}
+    if not histograms:
+        return None
+    histogram_file = os.path.join(results_dir, f"histograms-{timestamp}.json")
+    write_json_atomic(histogram_file, histograms)
+    return histogram_file
+
+def summary_omission(results):
+    """Raw vs coordinated-omission corrected percentiles per runtime x endpoint x connections"""
+    report = {}
+    for result in sorted(results, key=lambda r: r['runtime']):
+        for endpoint, by_connections in sorted(result.get('histograms', {}).items()):
+            for connections, encoded in sorted(by_connections.items(), key=lambda x: int(x[0])):
+                cell = omission_report(LatencyHistogram.decode(encoded))
+                report.setdefault(result['runtime'], {}).setdefault(endpoint, {})[connections] = cell
+    return report
+
+def _ms_cell(value):
+    # None: the cell got no responses
+    return f"{'n/a':>7}" if value is None else f"{value:>7.2f}"
+
+def print_omission(report):
+    """Print raw and corrected tail latency side by side"""
+    if not report:
+        return
+    print("\nCoordinated omission (raw -> corrected, ms):")
+    print("============================================")
+    print(f"{'runtime':<12} {'endpoint':<14} {'conns':>5} {'interval':>9} "
+          f"{'p50':>17} {'p99':>17} {'p99.9':>17}")
+    for runtime, endpoints in report.items():
+        for endpoint, by_connections in endpoints.items():
+            for connections, cell in by_connections.items():
+                raw, corrected = cell['raw'], cell['corrected']
+                columns = ' '.join(f"{_ms_cell(raw[p])} -> {_ms_cell(corrected[p])}" for p in ('p50', 'p99', 'p99.9'))
+                print(f"{runtime:<12} {endpoint:<14} {connections:>5} "
+                      f"{cell['expected_interval_ms']:>9.2f} {columns}")
+
+def build_summary(timestamp, results):
+    """Summary of one timestamp from its per-runtime file results"""
     summary = {
         'timestamp': timestamp,
         'runtimes': {},
         'comparisons': {}
     }
     
-    # Analyze each runtime
-    for filepath in benchmark_files:
-        result = analyze_benchmark_file(filepath)
-        runtime = result['runtime']
-        summary['runtimes'][runtime] = result
+    for result in sorted(results, key=lambda r: r['runtime']):
+        # Histograms go to histograms-<ts>.json, not the summary
+        summary['runtimes'][result['runtime']] = {k: v for k, v in result.items() if k != 'histograms'}
     
     # Generate comparisons
     if len(summary['runtimes']) > 1:
@@ -136,8 +288,10 @@ def generate_summary(results_dir, timestamp):
                     # Find best performing runtime for each metric
                     best_rps = max(runtime_metrics.items(), 
                                  key=lambda x: x[1].get('requests_per_sec', 0))
+                    # Rank latency by the p99 tail; the mean hides it
                     best_latency = min(runtime_metrics.items(), 
-                                     key=lambda x: x[1].get('latency_ms', float('inf')))
+                                     key=lambda x: x[1].get('latency_p99_ms',
+                                                            x[1].get('latency_ms', float('inf'))))
                     
                     summary['comparisons'][endpoint][connections] = {
                         'metrics': runtime_metrics,
@@ -145,14 +299,16 @@ def generate_summary(results_dir, timestamp):
                         'best_latency': best_latency[0]
                     }
     
-    # Save summary
-    summary_file = os.path.join(results_dir, f"summary-{timestamp}.json")
-    with open(summary_file, 'w') as f:
-        json.dump(summary, f, indent=2)
+    # USL fit of the connection sweep per runtime x endpoint
+    summary['scalability'] = summary_scalability(summary)
     
-    print(f"Summary analysis saved to: {summary_file}")
+    # wrk is closed-loop: its stalls hide the requests that would have queued
+    summary['coordinated_omission'] = summary_omission(results)
     
-    # Print quick overview
+    return summary
+
+def print_overview(summary):
+    """Print the quick console overview of one timestamp"""
     print("\nQuick Performance Overview:")
     print("==========================")
     
@@ -164,15 +320,179 @@ def generate_summary(results_dir, timestamp):
                 best_latency = conn_400.get('best_latency', 'N/A')
                 print(f"{endpoint.upper()} (400 connections):")
                 print(f"  Best RPS: {best_rps}")
-                print(f"  Best Latency: {best_latency}")
+                print(f"  Best Latency (p99): {best_latency}")
                 print()
 
-if __name__ == "__main__":
-    if len(sys.argv) != 3:
-        print("Usage: python3 analyze.py <results_dir> <timestamp>")
-        sys.exit(1)
+def generate_summary(results_dir, timestamp, jobs=1, cache_dir=None, store_dir=None):
+    """Generate summary analysis"""
+    benchmark_files = find_benchmark_files(results_dir, [timestamp])
+    
+    if not benchmark_files:
+        print(f"No benchmark files found for timestamp {timestamp}")
+        return
+    
+    cache = open_cache(results_dir, cache_dir)
+    results = analyze_files(benchmark_files, jobs, cache)
+    summary = build_summary(timestamp, results)
+    
+    # Save summary
+    summary_file = os.path.join(results_dir, f"summary-{timestamp}.json")
+    with open(summary_file, 'w') as f:
+        json.dump(summary, f, indent=2)
+    
+    print(f"Summary analysis saved to: {summary_file}")
+    histogram_file = write_histograms(results_dir, timestamp, results)
+    if histogram_file:
+        print(f"Latency histograms saved to: {histogram_file}")
+    store_runs(results_dir, {timestamp: results}, store_dir)
+    
+    print_overview(summary)
+    print_scalability(summary['scalability'])
+    print_omission(summary['coordinated_omission'])
+
+def generate_batch_summary(results_dir, timestamps=None, jobs=None, output=None, cache_dir=None,
+                           store_dir=None):
+    """Analyze many timestamps (or a whole results tree) into one summary"""
+    benchmark_files = find_benchmark_files(results_dir, timestamps)
+    
+    if not benchmark_files:
+        print(f"No benchmark files found in {results_dir}")
+        return
+    
+    jobs = jobs or os.cpu_count() or 1
+    cache = open_cache(results_dir, cache_dir)
+    results = analyze_files(benchmark_files, jobs, cache)
+    
+    by_timestamp = {}
+    for filepath, result in zip(benchmark_files, results):
+        by_timestamp.setdefault(timestamp_from_path(filepath), []).append(result)
     
-    results_dir = sys.argv[1]
-    timestamp = sys.argv[2]
+    batch = {
+        'timestamps': sorted(by_timestamp),
+        'runs': {ts: build_summary(ts, by_timestamp[ts]) for ts in sorted(by_timestamp)}
+    }
+    
+    summary_file = output or os.path.join(results_dir, "summary-batch.json")
+    with open(summary_file, 'w') as f:
+        json.dump(batch, f, indent=2)
+    for ts in sorted(by_timestamp):
+        write_histograms(results_dir, ts, by_timestamp[ts])
     
-    generate_summary(results_dir, timestamp)
\ No newline at end of file
+    print(f"Analyzed {len(benchmark_files)} files from {len(by_timestamp)} runs with {jobs} jobs")
+    if cache is not None:
+        print(f"Parse cache: {cache.hits} hits, {cache.misses} parsed")
+    store_runs(results_dir, by_timestamp, store_dir)
+    print(f"Batch summary saved to: {summary_file}")
+
+def latest_timestamp(results_dir):
+    """Timestamp of the most recently modified benchmark file"""
+    paths = glob.glob(os.path.join(results_dir, '*-benchmark-*.txt'))
+    if not paths:
+        return None
+    return timestamp_from_path(max(paths, key=os.path.getmtime))
+
+def follow_summary(results_dir, timestamp=None, interval=2.0, idle_timeout=300.0,
+                   cache_dir=None, store_dir=None):
+    """Refresh summary-<ts>.json as run-benchmark.sh appends wrk blocks
+
+    Stops after idle_timeout seconds without new output (or on Ctrl-C) and
+    then writes the final summary the normal way.
+    """
+    timestamp = timestamp or latest_timestamp(results_dir)
+    if timestamp is None:
+        print(f"No benchmark files found in {results_dir}")
+        return
+    
+    summary_file = os.path.join(results_dir, f"summary-{timestamp}.json")
+    followers = {}
+    results = {}
+    cells = 0
+    last_change = time.monotonic()
+    print(f"Following *-benchmark-{timestamp}.txt in {results_dir} (Ctrl-C to stop)")
+    
+    try:
+        while True:
+            # Runtimes are benchmarked one after another, so files keep appearing
+            for filepath in find_benchmark_files(results_dir, [timestamp]):
+                if filepath not in followers:
+                    followers[filepath] = LogFollower(filepath)
+            
+            new_records = []
+            for follower in followers.values():
+                new_records.extend(follower.poll())
+            
+            if new_records:
+                last_change = time.monotonic()
+                for record in new_records:
+                    result = results.setdefault(record.runtime, {'runtime': record.runtime, 'endpoints': {}})
+                    result['endpoints'].setdefault(record.endpoint, {})[record.connections] = \
+                        record.metrics.to_dict()
+                cells += len(new_records)
+                
+                summary = build_summary(timestamp, list(results.values()))
+                write_json_atomic(summary_file, summary)
+                
+                if sys.stdout.isatty():
+                    print("\033[2J\033[H", end='')
+                print(f"[{datetime.now():%H:%M:%S}] {cells} wrk runs parsed, "
+                      f"summary refreshed: {summary_file}")
+                for record in new_records:
+                    m = record.metrics
+                    p99 = m.tail_latency_ms
+                    print(f"  {record.runtime} {record.endpoint} @ {record.connections}: "
+                          f"{m.requests_per_sec or 0:.0f} rps, "
+                          f"p99 {'n/a' if p99 is None else f'{p99:.2f} ms'}, "
+                          f"{m.socket_errors} socket errors, {m.non_2xx_3xx} non-2xx")
+                print_overview(summary)
+            elif time.monotonic() - last_change > idle_timeout:
+                print(f"No new output for {idle_timeout:.0f}s, finishing")
+                break
+            
+            time.sleep(interval)
+    except KeyboardInterrupt:
+        print("\nStopped following")
+    
+    generate_summary(results_dir, timestamp, 1, cache_dir, store_dir)
+
+def main():
+    parser = argparse.ArgumentParser(description="Summarize wrk benchmark results")
+    parser.add_argument('results_dir')
+    parser.add_argument('timestamps', nargs='*',
+                        help="one timestamp writes summary-<ts>.json; several run in batch mode")
+    parser.add_argument('--all', action='store_true',
+                        help="batch-analyze every *-benchmark-*.txt under results_dir")
+    parser.add_argument('--jobs', '-j', type=int, default=None,
+                        help="worker processes (default: 1, or all cores in batch mode)")
+    parser.add_argument('--output', '-o', help="batch summary path")
+    parser.add_argument('--follow', '-f', action='store_true',
+                        help="tail the files of one timestamp (default: newest) while the run is going")
+    parser.add_argument('--interval', type=float, default=2.0,
+                        help="--follow poll interval in seconds")
+    parser.add_argument('--idle-timeout', type=float, default=300.0,
+                        help="--follow stops after this many seconds without new output")
+    parser.add_argument('--cache-dir', default=None,
+                        help="parse cache location (default: <results_dir>/.analyze-cache)")
+    parser.add_argument('--no-cache', dest='cache_dir', action='store_const', const='',
+                        help="parse every file from scratch")
+    parser.add_argument('--store-dir', default=None,
+                        help="columnar results store (default: <results_dir>/store)")
+    parser.add_argument('--no-store', dest='store_dir', action='store_const', const='',
+                        help="do not append to the results store")
+    args = parser.parse_args()
+    
+    if args.follow:
+        if len(args.timestamps) > 1 or args.all:
+            parser.error("--follow takes at most one timestamp")
+        follow_summary(args.results_dir, args.timestamps[0] if args.timestamps else None,
+                       args.interval, args.idle_timeout, args.cache_dir, args.store_dir)
+    elif args.all or len(args.timestamps) > 1:
+        generate_batch_summary(args.results_dir, None if args.all else args.timestamps,
+                               args.jobs, args.output, args.cache_dir, args.store_dir)
+    elif len(args.timestamps) == 1:
+        generate_summary(args.results_dir, args.timestamps[0], args.jobs or 1, args.cache_dir,
+                         args.store_dir)
+    else:
+        parser.error("give a timestamp, several timestamps, or --all")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,624 @@
+#!/usr/bin/env python3
+"""Micro-benchmarks for the wrk result analyzers.
+
+Usage: python3 bench.py parser [--size-mb N]
+       python3 bench.py batch [--runs N] [--size-mb N] [--jobs 1 2 4 8]
+       python3 bench.py cache [--runs N] [--size-mb N]
+       python3 bench.py extract [--blocks N]
+       python3 bench.py histogram [--runs N] [--samples N]
+       python3 bench.py k6 [--requests N]
+       python3 bench.py timeseries [--samples N] [--window S]
+       python3 bench.py samples [--requests N] [--window S]
+       python3 bench.py console [--seconds N]
+       python3 bench.py omission [--seconds N] [--stall-ms MS] [--every S]
+       python3 bench.py report [--requests N ...] [--window S] [--points N]
+       python3 bench.py pivot [--runs N]
+       python3 bench.py resources [--rows N]
+       python3 bench.py loadgen [--rates R ...] [--duration S] [--connections N]
+"""
+
+import argparse
+import json
+import math
+import os
+import random
+import re
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from analyze import PARSER_VERSION, analyze_files, find_benchmark_files, iter_benchmark_records
+from hdr_histogram import WRK_HISTOGRAM_PREFIX, LatencyHistogram, closed_loop_interval_us
+from k6_console import parse_console_log
+from k6_stream import K6StreamIngester
+from html_report import render_report
+from k6_timeseries import Samples, Stage, load_samples, stage_series, window_series
+from parse_cache import ParseCache
+from wrk_metrics import parse_wrk_output, to_mb, to_ms
+
+WRK_BLOCK = """Connections: {connections}
+Running 30s test @ http://{runtime}:8000/api/{endpoint}
+  12 threads and {connections} connections
+  Thread Stats   Avg      Stdev     Max   +/- Stdev
+    Latency    12.34ms    3.21ms 105.67ms   87.65%
+    Req/Sec   678.90     45.67     1.01k    71.23%
+  Latency Distribution
+     50%   11.98ms
+     75%   13.45ms
+     90%   16.78ms
+     99%   32.10ms
+  243210 requests in 30.01s, 54.32MB read
+  Socket errors: connect 0, read 12, write 0, timeout 3
+  Non-2xx or 3xx responses: 7
+Requests/sec:   8104.52
+Transfer/sec:      1.81MB
+---
+
+"""
+
+ENDPOINTS = ['health', 'database', 'cache', 'file-read', 'file-write', 'api-external']
+CONNECTIONS = ['100', '200', '400', '800']
+
+def write_synthetic_log(path, size_mb, runtime='swoole'):
+    """Write a run-benchmark.sh shaped log of roughly size_mb megabytes"""
+    target = size_mb * 1024 * 1024
+    written = 0
+    with open(path, 'w') as f:
+        header = f"Laravel PHP Runtime Benchmark - {runtime}\nTimestamp: 20250101_000000\n\n"
+        f.write(header)
+        written += len(header)
+        while True:
+            for endpoint in ENDPOINTS:
+                chunk = [f"Endpoint: {endpoint}\n-------------------\n"]
+                for connections in CONNECTIONS:
+                    chunk.append(WRK_BLOCK.format(runtime=runtime, endpoint=endpoint,
+                                                  connections=connections))
+                text = ''.join(chunk)
+                f.write(text)
+                written += len(text)
+            if written >= target:
+                break
+    return os.path.getsize(path)
+
+def bench_parser(args):
+    """Report streaming parser throughput (MB/s) and peak Python memory"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'swoole-benchmark-20250101_000000.txt')
+        size = write_synthetic_log(path, args.size_mb)
+
+        start = time.perf_counter()
+        records = sum(1 for _ in iter_benchmark_records(path))
+        elapsed = time.perf_counter() - start
+
+        # Separate pass: tracemalloc slows the parser down several times
+        tracemalloc.start()
+        for _ in iter_benchmark_records(path):
+            pass
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    size_mb = size / (1024 * 1024)
+    print(f"Parsed {size_mb:.1f} MB, {records} records in {elapsed:.2f}s")
+    print(f"  Throughput: {size_mb / elapsed:.1f} MB/s")
+    print(f"  Peak traced memory: {peak / 1024:.1f} KiB")
+
+def write_synthetic_tree(root, runs, size_mb):
+    """One synthetic benchmark file per runtime for each of `runs` timestamps"""
+    for run in range(runs):
+        timestamp = f"20250101_{run:06d}"
+        for runtime in ('swoole', 'php', 'frankenphp'):
+            write_synthetic_log(os.path.join(root, f"{runtime}-benchmark-{timestamp}.txt"),
+                                size_mb, runtime)
+    return find_benchmark_files(root)
+
+def bench_batch(args):
+    """Report process-pool speedup of the batch analyzer over a synthetic tree"""
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = write_synthetic_tree(tmp, args.runs, args.size_mb)
+
+        baseline = None
+        reference = None
+        print(f"{len(paths)} files x {args.size_mb} MB, {os.cpu_count()} cores")
+        for jobs in args.jobs:
+            start = time.perf_counter()
+            results = analyze_files(paths, jobs)
+            elapsed = time.perf_counter() - start
+            baseline = baseline or elapsed
+            reference = reference or results
+            assert results == reference, "parallel results differ from serial"
+            print(f"  jobs={jobs:<3} {elapsed:7.2f}s  speedup x{baseline / elapsed:.2f}")
+
+def bench_cache(args):
+    """Report cold (parse everything) vs warm (all cache hits) analysis time"""
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = write_synthetic_tree(tmp, args.runs, args.size_mb)
+        cache_dir = os.path.join(tmp, '.analyze-cache')
+
+        print(f"{len(paths)} files x {args.size_mb} MB")
+        for label in ('cold', 'warm'):
+            start = time.perf_counter()
+            cache = ParseCache(cache_dir, PARSER_VERSION)
+            analyze_files(paths, 1, cache)
+            elapsed = time.perf_counter() - start
+            print(f"  {label}: {elapsed * 1000:8.1f} ms  "
+                  f"({cache.hits} hits, {cache.misses} parsed, "
+                  f"{elapsed / len(paths) * 1e6:.0f} us/file)")
+
+# The per-field re.search extraction wrk_metrics replaced, kept as the
+# baseline: one scan of the text per field group.
+LEGACY_TIME = r'(\d+\.?\d*)(us|ms|s|m|h)'
+LEGACY_SCANS = 8
+
+def legacy_parse_wrk_output(content):
+    metrics = {}
+    m = re.search(r'Requests/sec:\s+(\d+\.?\d*)', content)
+    if m:
+        metrics['requests_per_sec'] = float(m.group(1))
+    m = re.search(r'Latency\s+' + LEGACY_TIME + r'\s+' + LEGACY_TIME + r'\s+' + LEGACY_TIME, content)
+    if m:
+        g = m.groups()
+        metrics['latency_ms'] = to_ms(g[0], g[1])
+        metrics['latency_stdev_ms'] = to_ms(g[2], g[3])
+        metrics['latency_max_ms'] = to_ms(g[4], g[5])
+    else:
+        m = re.search(r'Latency\s+' + LEGACY_TIME, content)
+        if m:
+            metrics['latency_ms'] = to_ms(*m.groups())
+    for m in re.finditer(r'^\s*(50|75|90|99)(?:\.0+)?%\s+' + LEGACY_TIME, content, re.M):
+        metrics[f'latency_p{m.group(1)}_ms'] = to_ms(m.group(2), m.group(3))
+    m = re.search(r'Transfer/sec:\s+(\d+\.?\d*)(B|KB|MB|GB|TB)', content)
+    if m:
+        metrics['transfer_mb_per_sec'] = to_mb(*m.groups())
+    m = re.search(r'(\d+) requests in ' + LEGACY_TIME + r', (\d+\.?\d*)(B|KB|MB|GB|TB) read', content)
+    if m:
+        g = m.groups()
+        metrics['total_requests'] = int(g[0])
+        metrics['duration_s'] = to_ms(g[1], g[2]) / 1000
+        metrics['read_mb'] = to_mb(g[3], g[4])
+    m = re.search(r'Socket errors: connect (\d+), read (\d+), write (\d+), timeout (\d+)', content)
+    if m:
+        (metrics['errors_connect'], metrics['errors_read'],
+         metrics['errors_write'], metrics['errors_timeout']) = map(int, m.groups())
+    m = re.search(r'Non-2xx or 3xx responses: (\d+)', content)
+    if m:
+        metrics['non_2xx_3xx'] = int(m.group(1))
+    return metrics
+
+def bench_extract(args):
+    """Compare the single-pass extractor with per-field re.search scans"""
+    blocks = [WRK_BLOCK.format(runtime='swoole', endpoint=e, connections=c)
+              for e in ENDPOINTS for c in CONNECTIONS]
+    blocks = (blocks * (args.blocks // len(blocks) + 1))[:args.blocks]
+    chars = sum(len(b) for b in blocks)
+
+    for block in blocks[:len(ENDPOINTS) * len(CONNECTIONS)]:
+        new = parse_wrk_output(block).to_dict()
+        old = legacy_parse_wrk_output(block)
+        assert all(new[k] == v for k, v in old.items()), "extractors disagree"
+
+    print(f"{len(blocks)} wrk blocks, {chars / 1024:.0f} KiB")
+    for label, parse, scans in (('re.search per field', legacy_parse_wrk_output, LEGACY_SCANS),
+                                ('single finditer', parse_wrk_output, 1)):
+        start = time.perf_counter()
+        for block in blocks:
+            parse(block)
+        elapsed = time.perf_counter() - start
+        print(f"  {label:<20} {scans} pass(es), {scans * chars / 1024:.0f} KiB scanned, "
+              f"{elapsed * 1e6 / len(blocks):.1f} us/block")
+
+def exact_percentile(sorted_values, p):
+    return sorted_values[max(0, math.ceil(len(sorted_values) * p / 100) - 1)]
+
+def bench_histogram(args):
+    """Merged HDR histograms vs averaging per-run percentiles"""
+    rng = random.Random(0)
+    runs = []
+    for run in range(args.runs):
+        # Lognormal body with a run-dependent heavy tail, in microseconds
+        scale = 1 + run % 4
+        runs.append([int(rng.lognormvariate(8, 0.6) * scale) + 1 for _ in range(args.samples)])
+
+    lines = []
+    for samples in runs:
+        counts = {}
+        for value in samples:
+            counts[value] = counts.get(value, 0) + 1
+        lines.append(WRK_HISTOGRAM_PREFIX + ','.join(f"{v}:{c}" for v, c in sorted(counts.items())))
+
+    start = time.perf_counter()
+    histograms = [LatencyHistogram.from_wrk_line(line) for line in lines]
+    ingest = time.perf_counter() - start
+    encoded = [h.encode() for h in histograms]
+    start = time.perf_counter()
+    merged = LatencyHistogram.merged(LatencyHistogram.decode(e) for e in encoded)
+    merge = time.perf_counter() - start
+
+    pooled = sorted(v for samples in runs for v in samples)
+    print(f"{args.runs} runs x {args.samples} samples; wrk line {sum(map(len, lines)) / len(lines) / 1024:.0f} KiB, "
+          f"encoded {sum(map(len, encoded)) / len(encoded) / 1024:.1f} KiB per run")
+    print(f"ingest {ingest * 1000 / args.runs:.1f} ms/run, decode+merge {merge * 1000:.1f} ms total")
+    print(f"{'pct':>7} {'exact':>10} {'merged':>10} {'err':>7} {'avg of runs':>12} {'err':>7}")
+    for p in (50, 90, 99, 99.9):
+        exact = exact_percentile(pooled, p)
+        averaged = sum(exact_percentile(sorted(samples), p) for samples in runs) / len(runs)
+        value = merged.percentile(p)
+        print(f"{p:>7g} {exact:>10} {value:>10} {value / exact - 1:>+7.2%} "
+              f"{averaged:>12.0f} {averaged / exact - 1:>+7.2%}")
+
+K6_METRICS = ['http_reqs', 'http_req_duration', 'http_req_blocked', 'http_req_connecting',
+              'http_req_tls_handshaking', 'http_req_sending', 'http_req_waiting',
+              'http_req_receiving', 'http_req_failed', 'checks', 'data_sent', 'data_received']
+
+def write_synthetic_k6(path, requests):
+    """k6 --out json style NDJSON: one Point per metric per request"""
+    rng = random.Random(0)
+    runtimes = ['swoole', 'php_fpm', 'frankenphp']
+    with open(path, 'w') as f:
+        for name in K6_METRICS:
+            f.write(json.dumps({'type': 'Metric', 'data': {'name': name, 'type': 'trend'},
+                                'metric': name}) + '\n')
+        for i in range(requests):
+            tags = {'runtime': runtimes[i % 3], 'endpoint': f"/api/{ENDPOINTS[i % len(ENDPOINTS)]}",
+                    'scenario': 'default', 'method': 'GET', 'status': '200'}
+            time_ = f"2025-10-01T06:{i // 60000 % 60:02d}:{i // 1000 % 60:02d}.{i % 1000:03d}000Z"
+            duration = rng.lognormvariate(2.5, 0.7)
+            for name in K6_METRICS:
+                if name == 'http_req_duration':
+                    value = duration
+                elif name in ('http_req_failed', 'checks'):
+                    value = int((rng.random() < 0.01) == (name == 'http_req_failed'))
+                else:
+                    value = rng.random()
+                f.write(json.dumps({'metric': name, 'type': 'Point',
+                                    'data': {'time': time_, 'value': value, 'tags': tags}},
+                               separators=(',', ':')) + '\n')
+
+def bench_k6(args):
+    """Throughput and peak memory of the k6 NDJSON stream ingester"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'k6.json')
+        write_synthetic_k6(path, args.requests)
+        size = os.path.getsize(path)
+
+        start = time.perf_counter()
+        ingester = K6StreamIngester().ingest(path)
+        elapsed = time.perf_counter() - start
+
+        tracemalloc.start()
+        K6StreamIngester().ingest(path)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    print(f"{args.requests} requests, {ingester.lines} lines, {size / 1048576:.0f} MiB")
+    print(f"  {ingester.lines / elapsed:,.0f} lines/s, {size / 1048576 / elapsed:.1f} MiB/s, "
+          f"{len(ingester.groups)} groups, peak {peak / 1048576:.1f} MiB")
+
+def synthetic_samples(n, duration=330.0):
+    """n in-memory k6 samples over the bateria 3 stages, and those stages"""
+    import numpy as np
+    rng = np.random.default_rng(0)
+    stages = [Stage(i * 60.0, (i + 1) * 60.0, t0, t1)
+              for i, (t0, t1) in enumerate([(0, 10), (10, 25), (25, 50), (50, 100), (100, 200)])]
+    stages.append(Stage(300.0, 330.0, 200, 0))
+    samples = Samples(
+        labels=np.array(['swoole', 'php_fpm', 'frankenphp']),
+        time=np.sort(rng.random(n) * duration),
+        duration_ms=rng.lognormal(3, 0.8, n),
+        group=rng.integers(0, 3, n),
+        failed_time=np.sort(rng.random(n) * duration),
+        failed=(rng.random(n) < 0.01).astype(float),
+        failed_group=rng.integers(0, 3, n),
+    )
+    return samples, stages
+
+def bench_timeseries(args):
+    """Per-window aggregation over in-memory k6 samples"""
+    n = args.samples
+    duration = 330.0
+    samples, stages = synthetic_samples(n, duration)
+
+    start = time.perf_counter()
+    windows = window_series(samples, args.window, stages)
+    window_time = time.perf_counter() - start
+    start = time.perf_counter()
+    by_stage = stage_series(samples, stages)
+    stage_time = time.perf_counter() - start
+
+    print(f"{n:,} samples over {duration:.0f}s, 3 runtimes")
+    print(f"  {len(windows)} windows of {args.window:g}s in {window_time:.2f}s "
+          f"({n / window_time / 1e6:.1f}M samples/s)")
+    print(f"  {len(by_stage)} runtime x stage rows in {stage_time:.2f}s")
+
+def bench_samples(args):
+    """k6 NDJSON to per-window series end to end: the parse, not only the binning"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'k6.json')
+        write_synthetic_k6(path, args.requests)
+        size = os.path.getsize(path)
+
+        start = time.perf_counter()
+        samples = load_samples([path])
+        load_time = time.perf_counter() - start
+    start = time.perf_counter()
+    windows = window_series(samples, args.window)
+    window_time = time.perf_counter() - start
+
+    points = len(samples.time) + len(samples.failed_time)
+    print(f"{args.requests:,} requests, {size / 1048576:.0f} MiB, {len(K6_METRICS)} metrics per request")
+    print(f"  load_samples   {load_time:6.2f}s  {points / load_time:>10,.0f} points/s  "
+          f"{size / 1048576 / load_time:.0f} MiB/s")
+    print(f"  window_series  {window_time:6.2f}s  {len(windows)} windows of {args.window:g}s")
+    print(f"  end to end     {load_time + window_time:6.2f}s  "
+          f"{len(samples.time) / (load_time + window_time):>10,.0f} requests/s")
+
+def bench_report(args):
+    """HTML report size and build time against the number of requests"""
+    print(f"{'requests':>12} {'build':>8} {'html':>9}")
+    for n in args.requests:
+        samples, stages = synthetic_samples(n)
+        start = time.perf_counter()
+        report = render_report(samples, stages, window_s=args.window, points=args.points)
+        elapsed = time.perf_counter() - start
+        print(f"{n:>12,} {elapsed:>7.2f}s {len(report.encode()) / 1024:>7.0f}KiB")
+
+def synthetic_store_rows(runs, endpoints=23, connections=(100, 200, 400, 800)):
+    """Store rows of `runs` nightly runs over every runtime x endpoint x connections"""
+    import numpy as np
+    from results_store import DTYPE
+    rng = np.random.default_rng(0)
+    runtimes = ['swoole', 'php_fpm', 'frankenphp']
+    n = runs * len(runtimes) * endpoints * len(connections)
+    rows = np.zeros(n, dtype=DTYPE)
+    run = np.repeat(np.arange(runs), n // runs)
+    rows['run_time'] = np.datetime64('2025-09-01T02:00:00', 's') + run * 86400
+    rows['timestamp'] = [f"2025{9 + r // 30:02d}{1 + r % 30:02d}_020000" for r in run.tolist()]
+    rows['runtime'] = np.tile(np.repeat(runtimes, endpoints * len(connections)), runs)
+    rows['endpoint'] = np.tile(np.repeat([f"endpoint-{e:02d}" for e in range(endpoints)], len(connections)),
+                               runs * len(runtimes))
+    rows['connections'] = np.tile(connections, n // len(connections))
+    rows['latency_p99_ms'] = rng.lognormal(3, 0.5, n) * rows['connections'] / 100
+    return rows
+
+def bench_pivot(args):
+    """Vectorized store pivot vs a per-row Python group-by"""
+    import numpy as np
+    from pivot import pivot
+    rows = synthetic_store_rows(args.runs)
+
+    start = time.perf_counter()
+    table = pivot(rows, 'latency_p99_ms', ('runtime', 'connections'), ('endpoint',), ('month',))
+    vectorized = time.perf_counter() - start
+
+    start = time.perf_counter()
+    cells = {}
+    field = rows.dtype.names.index('latency_p99_ms')
+    for row in rows.tolist():
+        key = (str(row[3])[:7], row[0], row[2], row[1])
+        cells.setdefault(key, []).append(row[field])
+    looped = {key: float(np.median(values)) for key, values in cells.items()}
+    loop_time = time.perf_counter() - start
+
+    agree = sorted(looped.values()) == sorted(table.values[table.counts > 0].tolist())
+    print(f"{len(rows):,} store rows -> {table.values.size:,} cells "
+          f"({len(table.facets)} facets x {len(table.rows)} x {len(table.cols)})")
+    print(f"  vectorized pivot {vectorized * 1000:8.1f} ms")
+    print(f"  python group-by  {loop_time * 1000:8.1f} ms  ({loop_time / vectorized:.0f}x, "
+          f"{'same' if agree else 'DIFFERENT'} medians)")
+
+def bench_resources(args):
+    """Column-wise docker stats parsing vs a per-row regex loop"""
+    from resource_stats import UNITS, load_container_stats
+    rng = random.Random(0)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'container_stats.csv')
+        with open(path, 'w') as f:
+            f.write("timestamp,container,cpu_percent,memory_usage,network_io,block_io\n")
+            for i in range(args.rows):
+                f.write(f"2025-10-01 06:{i // 600 % 60:02d}:{i // 10 % 60:02d},swoole_benchmark,"
+                        f"{rng.uniform(0, 400):.2f}%,{rng.uniform(50, 900):.1f}MiB / 2GiB,"
+                        f"{rng.uniform(1, 999):.1f}kB / {rng.uniform(1, 99):.2f}MB,0B / {rng.randint(0, 999)}kB\n")
+
+        start = time.perf_counter()
+        frame = load_container_stats(path)
+        vectorized = time.perf_counter() - start
+
+        start = time.perf_counter()
+        pair = re.compile(r'([\d.]+)\s*([A-Za-z]*)\s*/\s*([\d.]+)\s*([A-Za-z]*)')
+        parsed = []
+        with open(path) as f:
+            next(f)
+            for line in f:
+                fields = line.rstrip('\n').split(',')
+                row = [float(fields[2].rstrip('%'))]
+                for text in fields[3:]:
+                    a, ua, b, ub = pair.match(text).groups()
+                    row += [float(a) * UNITS[ua], float(b) * UNITS[ub]]
+                parsed.append(row)
+        looped = time.perf_counter() - start
+
+    same = abs(sum(r[1] for r in parsed) - frame['memory_bytes'].sum()) < 1e-3 * frame['memory_bytes'].sum()
+    print(f"{args.rows:,} docker stats rows")
+    print(f"  pandas column-wise {vectorized:6.2f}s ({args.rows / vectorized / 1e3:.0f}k rows/s)")
+    print(f"  per-row regex      {looped:6.2f}s ({args.rows / looped / 1e3:.0f}k rows/s, "
+          f"{'same' if same else 'DIFFERENT'} totals)")
+
+def bench_loadgen(args):
+    """Open-loop generator against a stub server: achieved rate, lag and CPU per request"""
+    from loadgen import MixEntry, Target, generate, run
+    port = 19000 + os.getpid() % 1000
+    stub = subprocess.Popen([sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'loadgen.py'),
+                             '--stub-server', str(port)], stdout=subprocess.DEVNULL)
+    try:
+        time.sleep(0.5)
+        loops = ['asyncio']
+        try:
+            import uvloop  # noqa: F401
+            loops.append('uvloop')
+        except ImportError:
+            print("uvloop not installed: asyncio only")
+        targets = [Target('stub', '127.0.0.1', port)]
+        mix = [MixEntry('/api/health', 'static', 1.0)]
+        print(f"{'loop':<8} {'offered':>8} {'achieved':>9} {'p50':>8} {'p99':>8} {'lag p99':>8} {'cpu/req':>8}")
+        for kind in loops:
+            for rate in args.rates:
+                cpu = time.process_time()
+                (stats, sent, elapsed), _ = run(generate(targets, mix, rate, args.duration,
+                                                         connections=args.connections, seed=0), kind)
+                cpu = time.process_time() - cpu
+                latency = LatencyHistogram.merged(stats.latency.values())
+                print(f"{kind:<8} {rate:>8.0f} {latency.total / elapsed:>9.0f} "
+                      f"{latency.percentile(50) / 1000:>6.2f}ms {latency.percentile(99) / 1000:>6.2f}ms "
+                      f"{stats.lag.percentile(99) / 1000:>6.2f}ms {cpu / max(sent, 1) * 1e6:>6.1f}us")
+    finally:
+        stub.terminate()
+        stub.wait()
+
+def write_synthetic_console(path, seconds):
+    """k6 console capture: banner, a log line and progress every 0.1s, summary"""
+    with open(path, 'w') as f:
+        f.write("     scenarios: (100.00%) 1 scenario, 200 max VUs, 6m0s max duration (incl. graceful stop):\n"
+                "              * default: Up to 200 looping VUs for 5m30s over 6 stages "
+                "(gracefulRampDown: 30s, gracefulStop: 30s)\n\n")
+        for tenth in range(seconds * 10):
+            elapsed = f"{tenth // 600}m{tenth % 600 / 10:04.1f}s"
+            vus = min(200, tenth // 15 + 1)
+            f.write(f'time="2025-10-01T11:51:26Z" level=info msg="iteration {tenth}" source=console\n'
+                    f"\nrunning ({elapsed}), {vus:03d}/200 VUs, {tenth * 6} complete and 0 interrupted iterations\n"
+                    f"default   [ {min(100, tenth // 33):3d}% ] {vus:03d}/200 VUs  {elapsed}/5m30.0s\n")
+        f.write("\n     http_reqs......................: 20950  63.4/s\n")
+
+def bench_console(args):
+    """Throughput and peak memory of the k6 console capture parser"""
+    script = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..',
+                          'benchmark', 'k6-bateria-3-comprehensive.js')
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'k6-output.txt')
+        write_synthetic_console(path, args.seconds)
+        size = os.path.getsize(path)
+
+        start = time.perf_counter()
+        result = parse_console_log(path, script)
+        elapsed = time.perf_counter() - start
+
+        tracemalloc.start()
+        parse_console_log(path, script)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    print(f"{size / 1048576:.0f} MiB capture: {size / 1048576 / elapsed:.1f} MiB/s, peak {peak / 1048576:.1f} MiB, "
+          f"{sum(result['event_counts'].values())} log events over {len(result['stages'])} stages")
+
+def bench_omission(args):
+    """Closed-loop raw and corrected percentiles vs the open-loop truth under stalls"""
+    rng = random.Random(0)
+    stall = args.stall_ms * 1000
+    every = args.every * 1000000
+
+    def latency_at(t, service):
+        # The server freezes for `stall` us at the start of every period
+        phase = t % every
+        return service + (stall - phase if phase < stall else 0)
+
+    # One wrk connection: the next request goes out when the last returns
+    raw = LatencyHistogram()
+    t = 0
+    while t < args.seconds * 1000000:
+        value = latency_at(t, int(rng.lognormvariate(6.9, 0.2)))
+        raw.record(value)
+        t += value
+    # What a client keeping the unstalled pace would have seen
+    interval = closed_loop_interval_us(raw)
+    truth = LatencyHistogram()
+    for k in range(args.seconds * 1000000 // interval):
+        truth.record(latency_at(k * interval, int(rng.lognormvariate(6.9, 0.2))))
+
+    start = time.perf_counter()
+    corrected = raw.corrected(interval)
+    elapsed = time.perf_counter() - start
+    print(f"{raw.total} measured, {truth.total} intended, {corrected.total - raw.total} back-filled "
+          f"at {interval} us in {elapsed * 1000:.1f} ms")
+    print(f"{'pct':>7} {'truth':>10} {'raw':>10} {'err':>8} {'corrected':>10} {'err':>8}")
+    for p in (50, 90, 99, 99.9):
+        exact, measured, fixed = truth.percentile(p), raw.percentile(p), corrected.percentile(p)
+        print(f"{p:>7g} {exact:>10} {measured:>10} {measured / exact - 1:>+8.1%} "
+              f"{fixed:>10} {fixed / exact - 1:>+8.1%}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    p = sub.add_parser('parser', help='streaming wrk log parser throughput')
+    p.add_argument('--size-mb', type=int, default=64)
+    p.set_defaults(func=bench_parser)
+
+    p = sub.add_parser('batch', help='process-pool speedup of batch analysis')
+    p.add_argument('--runs', type=int, default=8)
+    p.add_argument('--size-mb', type=int, default=4)
+    p.add_argument('--jobs', type=int, nargs='+', default=[1, 2, 4, 8])
+    p.set_defaults(func=bench_batch)
+
+    p = sub.add_parser('cache', help='cold vs warm parse cache')
+    p.add_argument('--runs', type=int, default=100)
+    p.add_argument('--size-mb', type=int, default=0)
+    p.set_defaults(func=bench_cache)
+
+    p = sub.add_parser('extract', help='single-pass vs per-field wrk extraction')
+    p.add_argument('--blocks', type=int, default=20000)
+    p.set_defaults(func=bench_extract)
+
+    p = sub.add_parser('histogram', help='merged HDR histograms vs averaged percentiles')
+    p.add_argument('--runs', type=int, default=12)
+    p.add_argument('--samples', type=int, default=200000)
+    p.set_defaults(func=bench_histogram)
+
+    p = sub.add_parser('k6', help='k6 NDJSON ingestion throughput and memory')
+    p.add_argument('--requests', type=int, default=200000)
+    p.set_defaults(func=bench_k6)
+
+    p = sub.add_parser('timeseries', help='vectorized per-window k6 aggregation')
+    p.add_argument('--samples', type=int, default=10000000)
+    p.add_argument('--window', type=float, default=1.0)
+    p.set_defaults(func=bench_timeseries)
+
+    p = sub.add_parser('samples', help='k6 NDJSON parse plus per-window aggregation, end to end')
+    p.add_argument('--requests', type=int, default=200000)
+    p.add_argument('--window', type=float, default=1.0)
+    p.set_defaults(func=bench_samples)
+
+    p = sub.add_parser('console', help='k6 console capture parser throughput and memory')
+    p.add_argument('--seconds', type=int, default=20000)
+    p.set_defaults(func=bench_console)
+
+    p = sub.add_parser('omission', help='coordinated-omission correction vs open-loop truth')
+    p.add_argument('--seconds', type=int, default=120)
+    p.add_argument('--stall-ms', type=float, default=500)
+    p.add_argument('--every', type=float, default=10, help="seconds between stalls")
+    p.set_defaults(func=bench_omission)
+
+    p = sub.add_parser('report', help='LTTB-downsampled HTML report size and build time')
+    p.add_argument('--requests', type=int, nargs='+', default=[20000, 1000000, 10000000])
+    p.add_argument('--window', type=float, default=1.0)
+    p.add_argument('--points', type=int, default=1000)
+    p.set_defaults(func=bench_report)
+
+    p = sub.add_parser('pivot', help='vectorized results-store pivot vs per-row group-by')
+    p.add_argument('--runs', type=int, default=365)
+    p.set_defaults(func=bench_pivot)
+
+    p = sub.add_parser('resources', help='docker stats CSV parsing, column-wise vs per row')
+    p.add_argument('--rows', type=int, default=500000)
+    p.set_defaults(func=bench_resources)
+
+    p = sub.add_parser('loadgen', help='open-loop generator throughput against a stub server')
+    p.add_argument('--rates', type=float, nargs='+', default=[5000, 10000, 20000, 40000])
+    p.add_argument('--duration', type=float, default=3.0)
+    p.add_argument('--connections', type=int, default=32)
+    p.set_defaults(func=bench_loadgen)
+
+    args = parser.parse_args()
+    args.func(args)
+
+if __name__ == "__main__":
+    sys.exit(main())
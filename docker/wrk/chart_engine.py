@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""Declarative chart specs drawn by one matplotlib engine.
+
+A Chart is a spec: output filename, figure size, grid layout and a list of
+Panels. A Panel names a drawer kind, a select(data, inputs) function that
+picks the values it draws out of the results data, its style options and
+its cell in the grid. Selecting is plain Python; matplotlib is imported
+only when render() draws, so listing charts or dumping the values they
+plot starts without it.
+
+select() may return an 'options' dict that overrides the panel's options
+for values known only from the data (a title, axis limits).
+
+Charts are keyed for render_cache on what their panels select from the
+results data, the digests of the external inputs they read, their options
+and the code that selects and draws them.
+
+Usage: python3 chart_engine.py        (list the drawer kinds)
+"""
+
+import os
+import sys
+from collections import namedtuple
+
+from render_cache import chart_key, code_version
+
+# title: a string or title(data)
+# inputs: names of external inputs (k6 samples, ...) select() may read
+Chart = namedtuple('Chart', ['filename', 'description', 'panels', 'figsize', 'layout', 'title', 'inputs'],
+                   defaults=((1, 1), None, ()))
+# at: (row, col) of the layout; either may be a (start, stop) span
+Panel = namedtuple('Panel', ['kind', 'select', 'options', 'at'], defaults=({}, (0, 0)))
+
+STYLE = {'figure.figsize': (12, 8), 'font.size': 10, 'axes.grid': True}
+DPI = 300
+ANNOTATE_LIMIT = 400  # heatmap cells labelled with their value
+
+_pyplot = None
+
+def pyplot(headless=False, style=None):
+    """matplotlib.pyplot, imported and styled on first use"""
+    global _pyplot
+    if _pyplot is None:
+        import matplotlib
+        if headless:
+            matplotlib.use('Agg')
+        import matplotlib.pyplot as plt
+        if style:
+            plt.style.use(style)
+        else:
+            plt.rcParams.update(STYLE)
+        _pyplot = plt
+    return _pyplot
+
+def _label_bars(ax, bars, options):
+    fmt = options.get('fmt')
+    if not fmt:
+        return
+    offset = ax.get_ylim()[1] * options.get('label_offset', 0.01)
+    for bar in bars:
+        height = bar.get_height()
+        ax.text(bar.get_x() + bar.get_width() / 2., height + offset, fmt.format(height),
+                ha='center', va='bottom', fontweight=options.get('label_weight', 'bold'),
+                fontsize=options.get('label_size'))
+
+def _draw_bar(ax, values, options):
+    heights = values['values']
+    edge = options.get('edgecolor')
+    bars = ax.bar(values['labels'], heights, color=options.get('colors'), alpha=0.8,
+                  edgecolor=edge, linewidth=1 if edge else 0)
+    if 'headroom' in options:
+        ax.set_ylim(0, max(heights) * options['headroom'])
+    _label_bars(ax, bars, options)
+    for y, color, label in options.get('hlines', ()):
+        ax.axhline(y=y, color=color, linestyle='--', alpha=0.7, label=label)
+
+def _draw_grouped_bar(ax, values, options):
+    series = values['series']
+    x = list(range(len(values['categories'])))
+    width = options.get('width', 0.8 / len(series))
+    colors = options.get('colors') or [None] * len(series)
+    for i, (name, heights) in enumerate(series):
+        offset = (i - (len(series) - 1) / 2) * width
+        bars = ax.bar([v + offset for v in x], heights, width, label=name, color=colors[i], alpha=0.8)
+        _label_bars(ax, bars, options)
+    rotation = options.get('rotation', 0)
+    ax.set_xticks(x)
+    ax.set_xticklabels(values['categories'], rotation=rotation, ha='right' if rotation else 'center')
+
+def _draw_barh(ax, values, options):
+    ax.barh(values['labels'], values['values'], color=options.get('colors'), alpha=0.8)
+
+def _draw_heatmap(ax, values, options):
+    matrix = values['matrix']
+    image = ax.imshow(matrix, cmap=options.get('cmap', 'RdYlGn'), aspect='auto',
+                      vmin=options.get('vmin'), vmax=options.get('vmax'))
+    ax.set_xticks(list(range(len(values['cols']))))
+    ax.set_yticks(list(range(len(values['rows']))))
+    ax.set_xticklabels(values['cols'], rotation=45, ha='right', fontsize=options.get('tick_size'))
+    ax.set_yticklabels(values['rows'], fontsize=options.get('tick_size'))
+    ax.grid(False)
+    fmt = options.get('fmt', '{:.0f}')
+    # Past a few hundred cells the labels are unreadable and dominate draw time
+    if len(matrix) * len(values['cols']) <= options.get('annotate_limit', ANNOTATE_LIMIT):
+        for i, row in enumerate(matrix):
+            for j, value in enumerate(row):
+                if value == value:  # NaN: no data in the cell
+                    ax.text(j, i, fmt.format(value), ha="center", va="center", color="black",
+                            fontweight='bold', fontsize=options.get('label_size'))
+    colorbar = ax.figure.colorbar(image, ax=ax)
+    if 'colorbar' in options:
+        colorbar.set_label(options['colorbar'], fontweight='bold')
+
+def _draw_pie(ax, values, options):
+    ax.pie(values['values'], labels=values['labels'], colors=options.get('colors'),
+           autopct=options.get('autopct', ''), explode=options.get('explode'),
+           shadow=options.get('shadow', False), startangle=90)
+
+def _draw_line(ax, values, options):
+    colors = options.get('colors', {})
+    for label, xs, ys in values['series']:
+        color = colors.get(label, options.get('color'))
+        ax.plot(xs, ys, marker=options.get('marker'), linewidth=options.get('linewidth', 2),
+                markersize=options.get('markersize', 8), color=color, label=label)
+        if options.get('fill'):
+            ax.fill_between(xs, ys, alpha=0.3, color=color)
+    for x in values.get('vlines', ()):
+        ax.axvline(x, color='gray', linestyle='--', alpha=0.5)
+    for text, x, y in values.get('annotations', ()):
+        ax.annotate(text, (x, y), textcoords="offset points", xytext=(0, 10), ha='center',
+                    fontsize=options.get('annotation_size'))
+    if options.get('ymin') is not None:
+        ax.set_ylim(bottom=options['ymin'])
+
+DRAWERS = {
+    'bar': _draw_bar,
+    'grouped_bar': _draw_grouped_bar,
+    'barh': _draw_barh,
+    'heatmap': _draw_heatmap,
+    'pie': _draw_pie,
+    'line': _draw_line,
+}
+
+def _axes(ax, options):
+    if 'title' in options:
+        ax.set_title(options['title'], fontweight='bold', fontsize=options.get('title_size'))
+    if 'xlabel' in options:
+        ax.set_xlabel(options['xlabel'], fontweight='bold')
+    if 'ylabel' in options:
+        ax.set_ylabel(options['ylabel'], fontweight='bold')
+    if 'ylim' in options:
+        ax.set_ylim(*options['ylim'])
+    if 'grid' in options:
+        ax.grid(True, alpha=options['grid'])
+        ax.set_axisbelow(True)
+
+def _span(at):
+    return at if isinstance(at, int) else slice(*at)
+
+def chart_title(chart, data):
+    return chart.title(data) if callable(chart.title) else chart.title
+
+def panel_values(chart, data, inputs=None):
+    """What each panel of chart draws, selected from the results data"""
+    return [panel.select(data, inputs or {}) for panel in chart.panels]
+
+def render_key(chart, data, digests=None):
+    """render_cache key of chart
+
+    Values are selected from the results data alone; external inputs enter
+    through their digests, so a chart that reads k6 samples is keyed
+    without aggregating them.
+    """
+    spec = {
+        'figsize': chart.figsize, 'layout': chart.layout, 'title': chart_title(chart, data),
+        'panels': [[panel.kind, panel.options, panel.at] for panel in chart.panels],
+        'values': panel_values(chart, data),
+        'inputs': {name: (digests or {}).get(name) for name in chart.inputs},
+    }
+    version = code_version(render, _axes, _label_bars, *DRAWERS.values(),
+                           *(panel.select for panel in chart.panels))
+    return chart_key(spec, version)
+
+def render(chart, data, output_dir, inputs=None):
+    """Draw chart into output_dir; returns the PNG path"""
+    plt = pyplot()
+    fig = plt.figure(figsize=chart.figsize)
+    grid = fig.add_gridspec(*chart.layout)
+    for panel, values in zip(chart.panels, panel_values(chart, data, inputs)):
+        options = {**panel.options, **values.get('options', {})}
+        ax = fig.add_subplot(grid[_span(panel.at[0]), _span(panel.at[1])])
+        _axes(ax, options)
+        DRAWERS[panel.kind](ax, values, options)
+        if options.get('legend'):
+            ax.legend(loc=options['legend'])
+    title = chart_title(chart, data)
+    if title:
+        fig.suptitle(title, fontsize=16, fontweight='bold')
+    fig.tight_layout()
+    path = os.path.join(output_dir, chart.filename)
+    fig.savefig(path, dpi=DPI, bbox_inches='tight')
+    if plt.get_backend().lower() != 'agg':
+        plt.show()
+    plt.close(fig)
+    return path
+
+def main():
+    for kind, drawer in DRAWERS.items():
+        print(f"{kind:<12} {drawer.__name__}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
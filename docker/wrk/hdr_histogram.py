@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+"""Mergeable HDR latency histograms for wrk runs.
+
+wrk keeps every latency sample in a 1 us resolution histogram; the
+latency-histogram.lua done() hook dumps its non-empty buckets as
+
+    Latency Histogram (us): <value>:<count>,<value>:<count>,...
+
+(exactly up to a few hundred distinct values; past that, sampled at a
+fine percentile grid, see the script).
+
+LatencyHistogram folds them into HdrHistogram's log-linear buckets with
+three significant digits (values below 2048 us are exact, larger ones are
+within 0.1%), so histograms from threads, repeated runs or different
+runtimes add bucket by bucket and any percentile of any combination is
+read off the merged counts instead of averaging summary lines.
+
+Encoded form: base64 of zlib-compressed varints (bucket index delta, count).
+
+wrk and looping k6 VUs are closed loops: while a request stalls, the
+connection sends nothing, so the requests that would have waited behind
+the stall are never measured. corrected() back-fills them the way
+HdrHistogram's copyCorrectedForCoordinatedOmission does, given the
+interval the generator meant to keep between requests.
+
+Usage: python3 hdr_histogram.py <results_dir> [--runtime R] [--endpoint E]
+                                [--connections N] [--percentiles 50 99 99.9]
+                                [--expected-interval-ms MS]
+"""
+
+import argparse
+import base64
+import glob
+import json
+import math
+import os
+import sys
+import zlib
+
+SIGNIFICANT_DIGITS = 3
+SUB_BUCKET_HALF_COUNT_MAGNITUDE = 10  # ceil(log2(2 * 10**3)) - 1
+SUB_BUCKET_HALF_COUNT = 1 << SUB_BUCKET_HALF_COUNT_MAGNITUDE
+SUB_BUCKET_MASK = (SUB_BUCKET_HALF_COUNT << 1) - 1
+
+WRK_HISTOGRAM_PREFIX = 'Latency Histogram (us): '
+
+REPORT_PERCENTILES = (50, 90, 99, 99.9)
+
+def bucket_index(value):
+    """Counts index of a non-negative integer value"""
+    bucket = max(0, (value | SUB_BUCKET_MASK).bit_length() - SUB_BUCKET_HALF_COUNT_MAGNITUDE - 1)
+    sub_bucket = value >> bucket
+    return ((bucket + 1) << SUB_BUCKET_HALF_COUNT_MAGNITUDE) + sub_bucket - SUB_BUCKET_HALF_COUNT
+
+def bucket_value(index):
+    """(lowest, highest) value that maps to a counts index"""
+    bucket = (index >> SUB_BUCKET_HALF_COUNT_MAGNITUDE) - 1
+    sub_bucket = (index & (SUB_BUCKET_HALF_COUNT - 1)) + SUB_BUCKET_HALF_COUNT
+    if bucket < 0:
+        sub_bucket -= SUB_BUCKET_HALF_COUNT
+        bucket = 0
+    lowest = sub_bucket << bucket
+    return lowest, lowest + (1 << bucket) - 1
+
+def _write_varint(out, n):
+    while n >= 0x80:
+        out.append((n & 0x7f) | 0x80)
+        n >>= 7
+    out.append(n)
+
+def _read_varints(data):
+    n = shift = 0
+    for byte in data:
+        n |= (byte & 0x7f) << shift
+        if byte & 0x80:
+            shift += 7
+        else:
+            yield n
+            n = shift = 0
+
+class LatencyHistogram:
+    """Sparse HDR histogram of latencies in microseconds"""
+
+    def __init__(self, counts=None):
+        self.counts = dict(counts or {})
+
+    def record(self, value_us, count=1):
+        index = bucket_index(int(value_us))
+        self.counts[index] = self.counts.get(index, 0) + count
+
+    def merge(self, other):
+        for index, count in other.counts.items():
+            self.counts[index] = self.counts.get(index, 0) + count
+        return self
+
+    __iadd__ = merge
+
+    @classmethod
+    def merged(cls, histograms):
+        total = cls()
+        for histogram in histograms:
+            total.merge(histogram)
+        return total
+
+    @property
+    def total(self):
+        return sum(self.counts.values())
+
+    def buckets(self):
+        """(highest equivalent value us, count) in ascending value order"""
+        for index in sorted(self.counts):
+            yield bucket_value(index)[1], self.counts[index]
+
+    def percentile(self, p):
+        """Latency (us) at percentile p, as HdrHistogram reports it"""
+        total = self.total
+        if total == 0:
+            return None
+        rank = max(1, math.ceil(total * p / 100))
+        seen = 0
+        for value, count in self.buckets():
+            seen += count
+            if seen >= rank:
+                return value
+        return value
+
+    @property
+    def max(self):
+        return bucket_value(max(self.counts))[1] if self.counts else None
+
+    @property
+    def mean(self):
+        total = self.total
+        if total == 0:
+            return None
+        return sum((sum(bucket_value(i)) / 2) * c for i, c in self.counts.items()) / total
+
+    def corrected(self, expected_interval_us):
+        """Copy with coordinated omission back-filled
+
+        A sample of latency v also stands for the samples v - interval,
+        v - 2 * interval, ... down to the interval that were never sent.
+        """
+        interval = int(expected_interval_us)
+        result = LatencyHistogram(self.counts)
+        if interval <= 0:
+            return result
+        for index, count in self.counts.items():
+            missing = bucket_value(index)[1] - interval
+            while missing >= interval:
+                # Every back-filled value that lands in this bucket at once
+                target = bucket_index(missing)
+                floor = max(bucket_value(target)[0], interval)
+                n = (missing - floor) // interval + 1
+                result.counts[target] = result.counts.get(target, 0) + count * n
+                missing -= n * interval
+        return result
+
+    def encode(self):
+        out = bytearray()
+        previous = 0
+        for index in sorted(self.counts):
+            _write_varint(out, index - previous)
+            _write_varint(out, self.counts[index])
+            previous = index
+        return base64.b64encode(zlib.compress(bytes(out), 9)).decode('ascii')
+
+    @classmethod
+    def decode(cls, text):
+        numbers = _read_varints(zlib.decompress(base64.b64decode(text)))
+        counts = {}
+        index = 0
+        for delta, count in zip(numbers, numbers):
+            index += delta
+            counts[index] = count
+        return cls(counts)
+
+    @classmethod
+    def from_wrk_line(cls, line):
+        """Histogram from the latency-histogram.lua output line"""
+        histogram = cls()
+        body = line[len(WRK_HISTOGRAM_PREFIX):].strip()
+        for pair in body.split(',') if body else ():
+            value, count = pair.split(':')
+            histogram.record(int(float(value)), int(float(count)))
+        return histogram
+
+def closed_loop_interval_us(histogram):
+    """Expected interval of a closed loop with no think time (wrk)
+
+    Each connection sends its next request as soon as the previous one
+    returns, so without stalls it keeps roughly the median latency apart.
+    """
+    return histogram.percentile(50) or 0
+
+def _ms(value_us):
+    return None if value_us is None else value_us / 1000
+
+def omission_report(histogram, expected_interval_us=None, percentiles=REPORT_PERCENTILES):
+    """Raw and coordinated-omission corrected percentiles (ms) side by side
+
+    A histogram without requests (a wrk cell that got no responses) has
+    None for every percentile.
+    """
+    if expected_interval_us is None:
+        expected_interval_us = closed_loop_interval_us(histogram)
+    corrected = histogram.corrected(expected_interval_us)
+    return {
+        'expected_interval_ms': expected_interval_us / 1000,
+        'requests': histogram.total,
+        'backfilled': corrected.total - histogram.total,
+        'raw': {f'p{p:g}': _ms(histogram.percentile(p)) for p in percentiles},
+        'corrected': {f'p{p:g}': _ms(corrected.percentile(p)) for p in percentiles},
+    }
+
+def load_histograms(results_dir, timestamps=None):
+    """Yield (timestamp, runtime, endpoint, connections, histogram) from histograms-<ts>.json"""
+    pattern = os.path.join(results_dir, '**', 'histograms-*.json')
+    for path in sorted(glob.glob(pattern, recursive=True)):
+        timestamp = os.path.basename(path)[len('histograms-'):-len('.json')]
+        if timestamps and timestamp not in timestamps:
+            continue
+        with open(path) as f:
+            data = json.load(f)
+        for runtime, endpoints in data.items():
+            for endpoint, by_connections in endpoints.items():
+                for connections, encoded in by_connections.items():
+                    yield timestamp, runtime, endpoint, connections, LatencyHistogram.decode(encoded)
+
+def _format_ms(value_us):
+    return f"{'n/a':>10}" if value_us is None else f"{value_us / 1000:10.3f}"
+
+def main():
+    parser = argparse.ArgumentParser(description="Exact percentiles over merged wrk histograms")
+    parser.add_argument('results_dir')
+    parser.add_argument('--runtime', action='append', help="repeatable; default: all")
+    parser.add_argument('--endpoint', action='append', help="repeatable; default: all")
+    parser.add_argument('--connections', action='append', help="repeatable; default: all")
+    parser.add_argument('--timestamp', action='append', help="repeatable; default: all runs")
+    parser.add_argument('--percentiles', type=float, nargs='+', default=[50, 90, 99, 99.9, 99.99])
+    parser.add_argument('--expected-interval-ms', type=float, default=None,
+                        help="interval for the coordinated-omission correction "
+                             "(default: each run's median latency)")
+    args = parser.parse_args()
+
+    merged = LatencyHistogram()
+    corrected = LatencyHistogram()
+    runs = 0
+    for timestamp, runtime, endpoint, connections, histogram in load_histograms(
+            args.results_dir, args.timestamp):
+        if args.runtime and runtime not in args.runtime:
+            continue
+        if args.endpoint and endpoint not in args.endpoint:
+            continue
+        if args.connections and connections not in args.connections:
+            continue
+        merged.merge(histogram)
+        # Corrected per run: the expected interval depends on the run
+        interval = (closed_loop_interval_us(histogram) if args.expected_interval_ms is None
+                    else args.expected_interval_ms * 1000)
+        corrected.merge(histogram.corrected(interval))
+        runs += 1
+
+    if merged.total == 0:
+        print("No matching histograms")
+        return 1
+    print(f"Merged {runs} wrk runs, {merged.total} requests "
+          f"({corrected.total - merged.total} back-filled for coordinated omission)")
+    print(f"  {'':<7} {'raw':>10}    {'corrected':>10}")
+    rows = [(f"p{p:<6g}", merged.percentile(p), corrected.percentile(p)) for p in args.percentiles]
+    for label, raw, fixed in rows + [('max    ', merged.max, corrected.max)]:
+        print(f"  {label} {_format_ms(raw)} ms {_format_ms(fixed)} ms")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
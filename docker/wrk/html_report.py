@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+"""Self-contained HTML report of k6 runs, downsampled for the browser.
+
+Per-request samples from k6 `--out json` are binned per runtime into fixed
+windows (k6_timeseries), then every series -- throughput, p50/p95/p99 per
+window and the latency of every single request -- is reduced to at most
+--points points with Largest-Triangle-Three-Buckets. LTTB keeps the point
+of each bucket that spans the largest triangle with its neighbours, so
+stalls and spikes survive where a stride or a mean would flatten them.
+
+Series are drawn as inline SVG polylines: the page has no scripts and no
+external assets, and its size depends on --points and the number of
+runtimes, not on the number of requests, so a 10M-request run opens as
+fast as a 20k one. The results JSON (runtime_performance, test_metadata)
+adds its summary table when given.
+
+Usage: python3 html_report.py <k6-results.json> [...] [--results data.json]
+                              [--script benchmark/k6-*.js] [--window 1]
+                              [--points 1000] [--output report.html]
+"""
+
+import argparse
+import html
+import json
+import math
+import os
+import sys
+from collections import namedtuple
+
+import numpy as np
+
+from k6_timeseries import PERCENTILES, load_samples, stages_from_script, window_series
+
+DEFAULT_POINTS = 1000
+WIDTH = 960
+HEIGHT = 260
+MARGIN = (16, 20, 36, 64)  # top, right, bottom, left
+
+RUNTIME_COLORS = {'swoole': '#2E8B57', 'php_fpm': '#4682B4', 'php-fpm': '#4682B4',
+                  'frankenphp': '#CD853F'}
+PALETTE = ['#8B008B', '#B22222', '#556B2F', '#2F4F4F', '#DAA520', '#708090']
+
+# (series key, heading, unit, note) in page order
+CHARTS = [
+    ('rps', 'Throughput', 'req/s', 'Requests completed per window.'),
+    ('p50_ms', 'Latency p50', 'ms', 'Median latency per window.'),
+    ('p95_ms', 'Latency p95', 'ms', '95th percentile latency per window.'),
+    ('p99_ms', 'Latency p99', 'ms', '99th percentile latency per window.'),
+    ('requests_ms', 'Latency of every request', 'ms',
+     'Each request, LTTB-downsampled: spikes and stalls are kept.'),
+    ('error_rate', 'Error rate', '%', 'Share of http_req_failed per window.'),
+]
+
+# One line of a chart: xs in seconds since the first sample
+Series = namedtuple('Series', ['label', 'xs', 'ys'])
+
+_STYLE = """
+body { font-family: sans-serif; margin: 24px; color: #222; }
+h1 { font-size: 20px; } h2 { font-size: 16px; margin: 28px 0 4px; }
+p.note { color: #666; font-size: 12px; margin: 0 0 6px; }
+table { border-collapse: collapse; font-size: 13px; }
+th, td { border: 1px solid #ccc; padding: 4px 10px; text-align: right; }
+th:first-child, td:first-child { text-align: left; }
+svg text { font-size: 11px; fill: #444; }
+.legend span { display: inline-block; margin-right: 16px; font-size: 13px; }
+.legend i { display: inline-block; width: 14px; height: 3px; margin-right: 4px; vertical-align: middle; }
+"""
+
+def lttb(x, y, threshold):
+    """Indices of the threshold points Largest-Triangle-Three-Buckets keeps
+
+    The first and last points are always kept; the points between them are
+    split into threshold - 2 buckets and each bucket keeps the point that
+    spans the largest triangle with the point kept before it and the mean
+    of the next bucket. Bucket means come from one cumulative sum.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    # Bucket i covers [edges[i], edges[i + 1]); every bucket has a point
+    edges = np.floor(np.linspace(1, n - 1, threshold - 1)).astype(np.int64)
+    edges = np.append(edges, n)
+    sum_x = np.concatenate([[0.0], np.cumsum(x)])
+    sum_y = np.concatenate([[0.0], np.cumsum(y)])
+
+    kept = np.empty(threshold, dtype=np.int64)
+    kept[0] = 0
+    kept[-1] = n - 1
+    a = 0
+    for i in range(threshold - 2):
+        lo, hi, next_hi = edges[i], edges[i + 1], edges[i + 2]
+        count = next_hi - hi
+        mean_x = (sum_x[next_hi] - sum_x[hi]) / count
+        mean_y = (sum_y[next_hi] - sum_y[hi]) / count
+        area = np.abs((x[a] - mean_x) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (mean_y - y[a]))
+        a = lo + int(np.argmax(area))
+        kept[i + 1] = a
+    return kept
+
+def downsample(xs, ys, points):
+    """Series without empty windows (NaN), reduced to points with LTTB"""
+    xs = np.asarray(xs, dtype=float)
+    ys = np.asarray(ys, dtype=float)
+    present = ~np.isnan(ys)
+    xs, ys = xs[present], ys[present]
+    kept = lttb(xs, ys, points)
+    return xs[kept], ys[kept]
+
+def request_latency(samples, label):
+    """(time s, duration ms) of every request of one runtime, in time order"""
+    group = int(np.flatnonzero(samples.labels == label)[0])
+    mine = samples.group == group
+    times = samples.time[mine]
+    order = np.argsort(times, kind='stable')
+    return times[order], samples.duration_ms[mine][order]
+
+def build_series(samples, window_s=1.0, stages=None, points=DEFAULT_POINTS):
+    """{chart key: [Series per runtime]} downsampled for the report"""
+    rows = window_series(samples, window_s, stages)
+    charts = {'rps': [], 'error_rate': [], 'requests_ms': []}
+    charts.update({f'p{p}_ms': [] for p in PERCENTILES})
+    for label in samples.labels:
+        mine = rows[rows['runtime'] == label]
+        for key in charts:
+            if key == 'requests_ms':
+                xs, ys = request_latency(samples, label)
+            else:
+                xs, ys = mine['start_s'] + window_s / 2, mine[key]
+            charts[key].append(Series(str(label), *downsample(xs, ys, points)))
+    return charts
+
+def runtime_totals(samples):
+    """Requests, mean RPS and overall percentiles per runtime over all samples"""
+    span = max(float(samples.time.max()) if len(samples.time) else 0.0, 1e-9)
+    totals = []
+    for group, label in enumerate(samples.labels):
+        durations = samples.duration_ms[samples.group == group]
+        failed = samples.failed[samples.failed_group == group]
+        row = {'runtime': str(label), 'requests': len(durations), 'rps': len(durations) / span,
+               'error_rate': float(failed.mean()) if len(failed) else 0.0}
+        for p in PERCENTILES:
+            row[f'p{p}_ms'] = float(np.percentile(durations, p)) if len(durations) else math.nan
+        totals.append(row)
+    return totals
+
+def _color(label, index):
+    return RUNTIME_COLORS.get(label.lower(), PALETTE[index % len(PALETTE)])
+
+def _ticks(low, high, count=5):
+    """Round tick values covering [low, high]"""
+    if high <= low:
+        return [low]
+    raw = (high - low) / count
+    magnitude = 10 ** math.floor(math.log10(raw))
+    step = next(m * magnitude for m in (1, 2, 2.5, 5, 10) if m * magnitude >= raw)
+    first = math.ceil(low / step) * step
+    return [first + i * step for i in range(int((high - first) / step) + 1)]
+
+def _tick_label(value):
+    return f"{value:g}" if abs(value) < 1e5 else f"{value:.2e}"
+
+def svg_chart(series, stages=(), y_label=''):
+    """Inline SVG line chart of series sharing one time axis"""
+    top, right, bottom, left = MARGIN
+    plot_w, plot_h = WIDTH - left - right, HEIGHT - top - bottom
+    drawn = [s for s in series if len(s.xs)]
+    if not drawn:
+        return '<p class="note">no samples</p>'
+    x_max = max(float(s.xs.max()) for s in drawn)
+    if stages:
+        x_max = max(x_max, stages[-1].end_s)
+    y_max = max(float(s.ys.max()) for s in drawn) * 1.05 or 1.0
+    y_ticks = _ticks(0.0, y_max)
+    y_max = max(y_max, y_ticks[-1])
+    x_max = x_max or 1.0
+
+    def px(x):
+        return left + x / x_max * plot_w
+
+    def py(y):
+        return top + plot_h - y / y_max * plot_h
+
+    parts = [f'<svg xmlns="http://www.w3.org/2000/svg" width="{WIDTH}" height="{HEIGHT}" '
+             f'viewBox="0 0 {WIDTH} {HEIGHT}">']
+    for y in y_ticks:
+        parts.append(f'<line x1="{left}" x2="{left + plot_w}" y1="{py(y):.1f}" y2="{py(y):.1f}" stroke="#eee"/>'
+                     f'<text x="{left - 6}" y="{py(y) + 4:.1f}" text-anchor="end">{_tick_label(y)}</text>')
+    for x in _ticks(0.0, x_max, 10):
+        parts.append(f'<text x="{px(x):.1f}" y="{top + plot_h + 16}" text-anchor="middle">{x:g}s</text>')
+    for number, stage in enumerate(stages, 1):
+        parts.append(f'<line x1="{px(stage.start_s):.1f}" x2="{px(stage.start_s):.1f}" y1="{top}" '
+                     f'y2="{top + plot_h}" stroke="#bbb" stroke-dasharray="4 3"/>'
+                     f'<text x="{px(stage.start_s) + 4:.1f}" y="{top + 10}">{number}: {stage.target} VUs</text>')
+    parts.append(f'<rect x="{left}" y="{top}" width="{plot_w}" height="{plot_h}" fill="none" stroke="#999"/>')
+    parts.append(f'<text x="14" y="{top + plot_h / 2:.0f}" text-anchor="middle" '
+                 f'transform="rotate(-90 14 {top + plot_h / 2:.0f})">{html.escape(y_label)}</text>')
+    for index, s in enumerate(series):
+        if not len(s.xs):
+            continue
+        points = ' '.join(f"{px(x):.1f},{py(y):.1f}" for x, y in zip(s.xs.tolist(), s.ys.tolist()))
+        parts.append(f'<polyline fill="none" stroke="{_color(s.label, index)}" stroke-width="1.2" '
+                     f'points="{points}"><title>{html.escape(s.label)}</title></polyline>')
+    parts.append('</svg>')
+    return ''.join(parts)
+
+def _legend(labels):
+    return '<div class="legend">' + ''.join(
+        f'<span><i style="background:{_color(label, i)}"></i>{html.escape(label)}</span>'
+        for i, label in enumerate(labels)) + '</div>'
+
+def _table(header, rows):
+    head = ''.join(f'<th>{html.escape(str(h))}</th>' for h in header)
+    body = ''.join('<tr>' + ''.join(f'<td>{html.escape(str(v))}</td>' for v in row) + '</tr>' for row in rows)
+    return f'<table><tr>{head}</tr>{body}</table>'
+
+def results_table(results):
+    """Per-runtime summary rows of the results JSON (runtime_performance)"""
+    rows = []
+    for runtime, performance in (results.get('runtime_performance') or {}).items():
+        categories = (performance.get('categories') or {}).values()
+        total = sum(c.get('total_requests', 0) for c in categories)
+        under_2s = sum(c.get('requests_under_2s', 0) for c in categories)
+        succeeded = sum(c.get('success_rate', 0) * c.get('total_requests', 0) for c in categories)
+        rows.append([runtime, performance.get('overall_performance_rank', ''), total,
+                     f"{succeeded / total:.2%}" if total else '-',
+                     f"{under_2s / total:.2%}" if total else '-',
+                     performance.get('degradation_under_load', '')])
+    return _table(['runtime', 'rank', 'requests', 'success', '< 2 s', 'degradation'], rows)
+
+def render_report(samples, stages=(), results=None, window_s=1.0, points=DEFAULT_POINTS, title=None):
+    """The whole report as one HTML string"""
+    charts = build_series(samples, window_s, stages, points)
+    totals = runtime_totals(samples)
+    metadata = (results or {}).get('test_metadata') or {}
+    title = title or metadata.get('test_name') or 'k6 load test report'
+    labels = [str(label) for label in samples.labels]
+
+    body = [f'<h1>{html.escape(title)}</h1>',
+            f'<p class="note">{len(samples.time):,} requests, {len(labels)} runtimes, '
+            f'{window_s:g}s windows, at most {points} points per series'
+            + (f", {html.escape(str(metadata['date']))}" if metadata.get('date') else '') + '</p>',
+            _table(['runtime', 'requests', 'req/s', 'errors'] + [f'p{p}' for p in PERCENTILES],
+                   [[t['runtime'], f"{t['requests']:,}", f"{t['rps']:.1f}", f"{t['error_rate']:.2%}"]
+                    + [f"{t[f'p{p}_ms']:.1f} ms" for p in PERCENTILES] for t in totals])]
+    if results and results.get('runtime_performance'):
+        body += ['<h2>Results summary</h2>', results_table(results)]
+    body.append(_legend(labels))
+    for key, heading, unit, note in CHARTS:
+        series = charts[key]
+        if key == 'error_rate':
+            series = [Series(s.label, s.xs, s.ys * 100) for s in series]
+        body += [f'<h2>{heading}</h2>', f'<p class="note">{note}</p>', svg_chart(series, stages, unit)]
+    return ('<!DOCTYPE html>\n<html><head><meta charset="utf-8">'
+            f'<title>{html.escape(title)}</title><style>{_STYLE}</style></head>\n<body>\n'
+            + '\n'.join(body) + '\n</body></html>\n')
+
+def main():
+    parser = argparse.ArgumentParser(description="Self-contained HTML report of k6 --out json samples")
+    parser.add_argument('paths', nargs='+')
+    parser.add_argument('--results', help="results JSON with runtime_performance / test_metadata")
+    parser.add_argument('--script', help="k6 script whose stages the run followed")
+    parser.add_argument('--window', type=float, default=1.0, help="window length in seconds")
+    parser.add_argument('--points', type=int, default=DEFAULT_POINTS, help="LTTB points per series")
+    parser.add_argument('--tag', default='runtime', help="tag to split series by (default: runtime)")
+    parser.add_argument('--title')
+    parser.add_argument('--output', '-o', default='report.html')
+    args = parser.parse_args()
+
+    samples = load_samples(args.paths, args.tag)
+    if len(samples.time) == 0:
+        print("No http_req_duration samples found")
+        return 1
+    stages = stages_from_script(args.script) if args.script else []
+    results = None
+    if args.results:
+        with open(args.results, encoding='utf-8') as f:
+            results = json.load(f)
+
+    report = render_report(samples, stages, results, args.window, args.points, args.title)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        f.write(report)
+    print(f"{len(samples.time)} samples -> {args.output} ({os.path.getsize(args.output) / 1024:.0f} KiB)")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,376 @@
+#!/usr/bin/env python3
+"""Streaming parser for k6 console captures.
+
+Some runs only kept what k6 printed (`k6 run ... | tee k6-output.txt`):
+the banner with the scenario config, `time=... level=... msg=...` log
+lines, once-a-second progress lines and the end-of-test summary. The
+capture is read one line at a time and turned into the same structure as
+a `--summary-export` JSON (metrics with their values and thresholds,
+root_group checks, state) plus the scenario config and, when the script's
+stages are known, per-stage progress and log-event counts.
+
+Both summary layouts are understood: the classic one
+(`http_reqs......: 20950 63.4/s`, checks as `✓ name` / `↳ 95% — ✓ 9 / ✗ 1`)
+and the sectioned one of newer k6 (`█ THRESHOLDS`, `█ TOTAL RESULTS`).
+
+Usage: python3 k6_console.py <k6-output.txt> [--script benchmark/k6-*.js] [--output summary.json]
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+from functools import lru_cache
+
+from k6_stream import open_text
+from k6_timeseries import stages_from_script
+
+# Log events kept verbatim; later ones are only counted
+MAX_EVENTS = 1000
+
+TIME_UNITS_MS = {'ns': 1e-6, 'µs': 0.001, 'us': 0.001, 'ms': 1.0, 's': 1000.0, 'm': 60000.0,
+                 'h': 3600000.0}
+DATA_UNITS_B = {'B': 1, 'kB': 1e3, 'MB': 1e6, 'GB': 1e9, 'TB': 1e12}
+
+_ANSI = re.compile(r'\x1b\[[0-9;]*[A-Za-z]')
+_TIME_PART = re.compile(r'(\d+(?:\.\d+)?)(ns|µs|us|ms|s|m|h)')
+_DURATION = re.compile(r'^(?:\d+(?:\.\d+)?(?:ns|µs|us|ms|s|m|h))+$')
+_NUMBER = r'-?\d+(?:\.\d+)?(?:e[-+]?\d+)?'
+
+_SCRIPT = re.compile(r'^\s*script:\s*(\S+)')
+_SCENARIOS = re.compile(r'^\s*scenarios:\s*\((?P<percent>[\d.]+)%\)\s*(?P<count>\d+) scenarios?,'
+                        r'\s*(?P<max_vus>\d+) max VUs,\s*(?P<max_duration>\S+) max duration')
+_SCENARIO = re.compile(r'^\s*\*\s*(?P<name>[\w-]+):\s*(?P<description>.*?)\s*$')
+_LOG = re.compile(r'^time="(?P<time>[^"]*)"\s+level=(?P<level>\w+)\s+msg="(?P<msg>(?:[^"\\]|\\.)*)"')
+_PROGRESS = re.compile(r'^running \((?P<elapsed>[\dhms.]+)\), (?P<vus>\d+)/(?P<max_vus>\d+) VUs, '
+                       r'(?P<complete>\d+) complete and (?P<interrupted>\d+) interrupted iterations')
+# Per-scenario bar under it; its clock is the one the stages follow
+_SCENARIO_PROGRESS = re.compile(r'^(?P<name>[\w-]+)\s+(?:[✓✗]\s+)?\[\s*[\d.]+%\s*\]\s+(?P<vus>\d+)/\d+ VUs'
+                                r'\s+(?P<elapsed>[\dhms.]+)(?:/[\dhms.]+)?')
+_METRIC = re.compile(r'^(?:(?P<mark>[✓✗])\s+)?(?P<name>[\w{}:.,\s-]+?)\.{2,}:\s*(?P<value>.*?)\s*$')
+_CHECK = re.compile(r'^(?P<mark>[✓✗])\s+(?P<name>.+?)\s*$')
+_CHECK_COUNTS = re.compile(r'^↳\s*(?P<percent>[\d.]+)%\s*—\s*✓\s*(?P<passes>\d+)\s*/\s*✗\s*(?P<fails>\d+)')
+_THRESHOLD = re.compile(r"^(?P<mark>[✓✗])\s+'(?P<expr>[^']+)'")
+_SECTION = re.compile(r'^█\s+(?P<section>[A-Z ]+?)\s*$')
+_OUT_OF = re.compile(rf'^(?P<rate>{_NUMBER})%\s+(?P<passes>\d+) out of (?P<total>\d+)')
+_TICKS = re.compile(rf'^(?P<rate>{_NUMBER})%\s+✓\s*(?P<passes>\d+)\s+✗\s*(?P<fails>\d+)')
+
+@lru_cache(maxsize=4096)
+def to_ms(text):
+    """Milliseconds in a k6 duration such as '1m2.5s' or '850µs'"""
+    return sum(float(value) * TIME_UNITS_MS[unit] for value, unit in _TIME_PART.findall(text))
+
+def _number(text):
+    """Float for '123', '12.5ms' (as ms), '9.2 MB' style values; None otherwise"""
+    if _DURATION.match(text):
+        return to_ms(text)
+    try:
+        return float(text)
+    except ValueError:
+        return None
+
+def parse_metric_value(text):
+    """(k6 metric type, summary-export style values) of one summary line"""
+    tokens = text.split()
+    if tokens and '=' in tokens[0]:
+        # Trend: avg=563.48ms min=1.2ms med=146.16ms max=11.68s p(90)=1.55s p(95)=2.95s
+        values = {}
+        for pair in text.split():
+            key, _, value = pair.partition('=')
+            number = _number(value)
+            if number is not None:
+                values[key] = number
+        return 'trend', values
+
+    text = ' '.join(tokens)
+    m = _OUT_OF.match(text)
+    if m:
+        passes, total = int(m.group('passes')), int(m.group('total'))
+        return 'rate', {'rate': float(m.group('rate')) / 100, 'passes': passes, 'fails': total - passes}
+    m = _TICKS.match(text)
+    if m:
+        return 'rate', {'rate': float(m.group('rate')) / 100, 'passes': int(m.group('passes')),
+                        'fails': int(m.group('fails'))}
+
+    if len(tokens) >= 2 and tokens[1] in DATA_UNITS_B:
+        # Data counter: 9.2 MB 28 kB/s
+        values = {'count': float(tokens[0]) * DATA_UNITS_B[tokens[1]]}
+        if len(tokens) >= 4 and tokens[3].endswith('/s') and tokens[3][:-2] in DATA_UNITS_B:
+            values['rate'] = float(tokens[2]) * DATA_UNITS_B[tokens[3][:-2]]
+        return 'counter', values
+    if any(t.startswith('min=') for t in tokens):
+        # Gauge: 1 min=1 max=200
+        values = {'value': _number(tokens[0])}
+        for token in tokens[1:]:
+            key, _, value = token.partition('=')
+            if value:
+                values[key] = _number(value)
+        return 'gauge', values
+    # Counter: 20950 63.4/s
+    count = _number(tokens[0]) if tokens else None
+    values = {'count': int(count) if count is not None and count.is_integer() else count}
+    if len(tokens) >= 2 and tokens[1].endswith('/s'):
+        values['rate'] = _number(tokens[1][:-2])
+    return 'counter', values
+
+class K6ConsoleParser:
+    """Line-driven state machine over a k6 console capture"""
+
+    def __init__(self, stages=None):
+        self.stages = list(stages or [])
+        self.script = None
+        self.scenarios = {}
+        self.scenario_summary = None
+        self.metrics = {}
+        self.checks = []
+        self.events = []
+        self.event_counts = {}
+        self.stage_progress = {}
+        self.elapsed_ms = 0.0
+        self.scenario_elapsed_ms = 0.0
+        self._complete = 0
+        self._interrupted = 0
+        self.lines = 0
+        self._section = None
+        self._threshold_metric = None
+        self._parent_metric = None
+
+    def feed(self, line):
+        """Consume one line of the capture"""
+        self.lines += 1
+        # TTY captures redraw progress with carriage returns and colour codes
+        if '\x1b' in line:
+            line = _ANSI.sub('', line)
+        if '\r' in line:
+            for part in line.split('\r'):
+                self._feed(part.strip())
+        else:
+            self._feed(line.strip())
+
+    def _stage_index(self):
+        seconds = self.scenario_elapsed_ms / 1000
+        for i, stage in enumerate(self.stages):
+            if seconds < stage.end_s:
+                return i
+        return -1 if self.stages else None
+
+    def _feed(self, text):
+        if not text:
+            return
+
+        # Log and progress lines are nearly all of a long capture: prefix
+        # checks keep them off the other patterns
+        m = _LOG.match(text) if text.startswith('time="') else None
+        if m:
+            stage = self._stage_index()
+            key = (stage, m.group('level'))
+            self.event_counts[key] = self.event_counts.get(key, 0) + 1
+            if len(self.events) < MAX_EVENTS:
+                self.events.append({'time': m.group('time'), 'level': m.group('level'),
+                                    'msg': m.group('msg').replace('\\"', '"'),
+                                    'elapsed_s': self.scenario_elapsed_ms / 1000, 'stage': stage})
+            return
+
+        m = _PROGRESS.match(text) if text.startswith('running (') else None
+        if m:
+            self.elapsed_ms = to_ms(m.group('elapsed'))
+            self._complete = int(m.group('complete'))
+            self._interrupted = int(m.group('interrupted'))
+            return
+
+        m = _SCENARIO_PROGRESS.match(text) if '% ]' in text else None
+        if m:
+            self.scenario_elapsed_ms = to_ms(m.group('elapsed'))
+            progress = self.stage_progress.setdefault(self._stage_index(), {'max_vus': 0})
+            progress['last_elapsed_s'] = self.scenario_elapsed_ms / 1000
+            progress['last_complete'] = self._complete
+            progress['interrupted'] = self._interrupted
+            progress['max_vus'] = max(progress['max_vus'], int(m.group('vus')))
+            return
+
+        m = _SECTION.match(text)
+        if m:
+            self._section = m.group('section')
+            self._threshold_metric = None
+            return
+
+        m = _SCRIPT.match(text)
+        if m and self.script is None:
+            self.script = m.group(1)
+            return
+        m = _SCENARIOS.match(text)
+        if m:
+            self.scenario_summary = {
+                'percent': float(m.group('percent')),
+                'count': int(m.group('count')),
+                'max_vus': int(m.group('max_vus')),
+                'max_duration_ms': to_ms(m.group('max_duration')),
+            }
+            return
+        if self.scenario_summary is not None and not self.metrics:
+            m = _SCENARIO.match(text)
+            if m:
+                self.scenarios[m.group('name')] = _scenario_config(m.group('description'))
+                return
+
+        m = _METRIC.match(text)
+        if m:
+            self._metric(m)
+            return
+
+        m = _CHECK_COUNTS.match(text)
+        if m and self.checks:
+            self.checks[-1]['passes'] = int(m.group('passes'))
+            self.checks[-1]['fails'] = int(m.group('fails'))
+            return
+
+        if self._section == 'THRESHOLDS':
+            m = _THRESHOLD.match(text)
+            if m and self._threshold_metric:
+                metric = self.metrics.setdefault(self._threshold_metric, {})
+                metric.setdefault('thresholds', {})[m.group('expr')] = {'ok': m.group('mark') == '✓'}
+            elif not m and ' ' not in text:
+                self._threshold_metric = text
+            return
+
+        m = _CHECK.match(text)
+        if m:
+            # A ✓ check passed every time; counts follow only on failures
+            self.checks.append({'name': m.group('name'),
+                                'passes': None if m.group('mark') == '✓' else 0, 'fails': 0})
+
+    def _metric(self, m):
+        name = re.sub(r'\s+', '', m.group('name'))
+        if name.startswith('{') and self._parent_metric:
+            # Submetric line under its parent: { expected_response:true }...:
+            name = f"{self._parent_metric}{name}"
+        else:
+            self._parent_metric = name
+        kind, values = parse_metric_value(m.group('value'))
+        metric = self.metrics.setdefault(name, {})
+        metric['type'] = kind
+        metric['values'] = values
+        if kind == 'trend':
+            metric['contains'] = 'time'
+        if m.group('mark'):
+            # Classic layout: thresholds are only marked on the metric line
+            metric.setdefault('thresholds', {})['(script)'] = {'ok': m.group('mark') == '✓'}
+
+    def result(self):
+        """Summary-export style dict of everything parsed so far"""
+        stages = []
+        previous_elapsed = previous_complete = 0
+        for i, stage in enumerate(self.stages):
+            progress = self.stage_progress.get(i, {})
+            # Counted from the last progress line of the stage before
+            elapsed = progress.get('last_elapsed_s', previous_elapsed) - previous_elapsed
+            iterations = progress.get('last_complete', previous_complete) - previous_complete
+            if progress:
+                previous_elapsed = progress['last_elapsed_s']
+                previous_complete = progress['last_complete']
+            stages.append({
+                'stage': i + 1,
+                'start_s': stage.start_s,
+                'end_s': stage.end_s,
+                'target_vus': stage.target,
+                'max_vus': progress.get('max_vus'),
+                'iterations': iterations if progress else None,
+                'iterations_per_sec': iterations / elapsed if elapsed > 0 else None,
+                'events': {level: n for (s, level), n in self.event_counts.items() if s == i},
+            })
+
+        return {
+            'options': {'script': self.script, 'scenarios': self.scenarios,
+                        'execution': self.scenario_summary},
+            'state': {'testRunDurationMs': self.elapsed_ms,
+                      'completed': bool(self.metrics)},
+            'metrics': self.metrics,
+            'root_group': {'name': '', 'path': '', 'groups': [], 'checks': self.checks},
+            'stages': stages,
+            'events': self.events,
+            'event_counts': {level: sum(n for (_, lvl), n in self.event_counts.items() if lvl == level)
+                             for level in sorted({lvl for _, lvl in self.event_counts})},
+        }
+
+def _scenario_config(description):
+    """Executor settings from a banner line such as
+    'Up to 200 looping VUs for 5m30s over 6 stages (gracefulRampDown: 30s, gracefulStop: 30s)'
+    """
+    config = {'description': description}
+    m = re.search(r'(\d+) (?:looping )?VUs', description)
+    if m:
+        config['vus'] = int(m.group(1))
+    m = re.search(r'for (\S+?)(?: over|\s*\(|$)', description)
+    if m:
+        config['duration_ms'] = to_ms(m.group(1))
+    m = re.search(r'over (\d+) stages', description)
+    if m:
+        config['stages'] = int(m.group(1))
+    m = re.search(r'(\d+) iterations', description)
+    if m:
+        config['iterations'] = int(m.group(1))
+    for key, value in re.findall(r'(\w+): (\d[\dhms.]*)', description):
+        config[f'{key}_ms'] = to_ms(value)
+    return config
+
+def _resolve_script(script, log_path):
+    """Find a script named in the banner relative to the log or the repo"""
+    here = os.path.dirname(os.path.abspath(__file__))
+    for base in (os.getcwd(), os.path.dirname(os.path.abspath(log_path)),
+                 os.path.join(here, '..', '..')):
+        path = os.path.join(base, script)
+        if os.path.exists(path):
+            return path
+    return None
+
+def parse_console_log(path, script=None):
+    """Parse a k6 console capture; stages come from `script` or the banner"""
+    stages = stages_from_script(script) if script else None
+    parser = K6ConsoleParser(stages)
+    with open_text(path) as f:
+        for line in f:
+            parser.feed(line)
+            if stages is None and parser.script:
+                resolved = _resolve_script(parser.script, path)
+                stages = stages_from_script(resolved) if resolved else []
+                parser.stages = stages
+    result = parser.result()
+    result['source'] = os.path.basename(path)
+    return result
+
+def main():
+    parser = argparse.ArgumentParser(description="Parse k6 console captures into summary records")
+    parser.add_argument('paths', nargs='+')
+    parser.add_argument('--script', help="k6 script for stage mapping (default: from the banner)")
+    parser.add_argument('--output', '-o', help="write the records as JSON (a list for several logs)")
+    args = parser.parse_args()
+
+    results = []
+    for path in args.paths:
+        result = parse_console_log(path, args.script)
+        results.append(result)
+        print(f"{path}:")
+        print(f"  script {result['options']['script']}, "
+              f"{result['state']['testRunDurationMs'] / 1000:.1f}s run, "
+              f"{'end-of-test summary' if result['state']['completed'] else 'no end-of-test summary'}")
+        for stage in result['stages']:
+            if stage['max_vus'] is None:
+                continue
+            rate = stage['iterations_per_sec']
+            print(f"  stage {stage['stage']} -> {stage['target_vus']} VUs: max {stage['max_vus']} VUs, "
+                  f"{stage['iterations']} iterations"
+                  f"{'' if rate is None else f' ({rate:.1f}/s)'}")
+        for name, metric in sorted(result['metrics'].items()):
+            print(f"  {name}: {metric['type']} {metric['values']}")
+        for check in result['root_group']['checks']:
+            print(f"  check {check['name']}: passes={check['passes']} fails={check['fails']}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results[0] if len(results) == 1 else results, f, indent=2, ensure_ascii=False)
+        print(f"Records saved to: {args.output}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+"""Streaming ingester for k6 `--out json` NDJSON output.
+
+k6 writes one JSON object per line, one Point per sample of every metric.
+Points are read line by line and grouped by the tags the benchmark/k6-*.js
+scripts set (runtime, endpoint, and the scenario tag k6 adds itself).
+Each group keeps a LatencyHistogram of http_req_duration plus counters,
+so memory is bounded by the number of groups whatever the run length, and
+groups merge exactly into per-runtime and per-endpoint roll-ups.
+
+Lines for metrics that are not aggregated are skipped before being
+decoded as JSON; on a typical run that is most of the file.
+
+Looping VUs are a closed loop, so each group also reports percentiles
+corrected for coordinated omission. The expected interval is the median
+iteration_duration of the group's scenario: the request plus the
+script's sleep, which is how often an unstalled VU sends.
+
+Usage: python3 k6_stream.py <k6-output.json[.gz]> [...] [--group-by runtime endpoint scenario]
+                            [--output summary.json]
+"""
+
+import argparse
+import gzip
+import json
+import re
+import sys
+from datetime import datetime
+
+from hdr_histogram import LatencyHistogram, closed_loop_interval_us
+
+DEFAULT_GROUP_BY = ('runtime', 'endpoint', 'scenario')
+MISSING_TAG = '-'
+PERCENTILES = (50, 90, 95, 99, 99.9)
+
+CORRECTED_PERCENTILES = (50, 99, 99.9)
+
+DURATION_METRIC = 'http_req_duration'
+ITERATION_METRIC = 'iteration_duration'
+RATE_METRICS = ('http_req_failed', 'checks')
+
+METRIC_NAME = re.compile(r'"metric":\s*"([^"]+)"')
+_WANTED = frozenset((DURATION_METRIC, ITERATION_METRIC) + RATE_METRICS)
+
+class GroupStats:
+    """Bounded-memory aggregate of the points of one tag group"""
+
+    def __init__(self):
+        self.durations = LatencyHistogram()
+        self.duration_sum_ms = 0.0
+        self.requests = 0
+        self.rates = {name: [0, 0] for name in RATE_METRICS}  # [true, total]
+        self.first_time = None
+        self.last_time = None
+
+    def add_duration(self, value_ms, time):
+        self.durations.record(round(value_ms * 1000))
+        self.duration_sum_ms += value_ms
+        self.requests += 1
+        # k6 timestamps share one RFC 3339 format, so they order as strings
+        if self.first_time is None or time < self.first_time:
+            self.first_time = time
+        if self.last_time is None or time > self.last_time:
+            self.last_time = time
+
+    def add_rate(self, metric, value):
+        counts = self.rates[metric]
+        counts[0] += value != 0
+        counts[1] += 1
+
+    def merge(self, other):
+        self.durations.merge(other.durations)
+        self.duration_sum_ms += other.duration_sum_ms
+        self.requests += other.requests
+        for name, (true, total) in other.rates.items():
+            self.rates[name][0] += true
+            self.rates[name][1] += total
+        for time in (other.first_time, other.last_time):
+            if time is not None:
+                self.first_time = time if self.first_time is None else min(self.first_time, time)
+                self.last_time = time if self.last_time is None else max(self.last_time, time)
+        return self
+
+    def to_dict(self, expected_interval_us=None):
+        """JSON-ready statistics; corrected percentiles need the expected interval"""
+        result = {'requests': self.requests}
+        if self.requests:
+            elapsed = (_parse_time(self.last_time) - _parse_time(self.first_time)).total_seconds()
+            if elapsed > 0:
+                result['requests_per_sec'] = self.requests / elapsed
+            result['duration_avg_ms'] = self.duration_sum_ms / self.requests
+            for p in PERCENTILES:
+                result[f'duration_p{p:g}_ms'.replace('.', '_')] = self.durations.percentile(p) / 1000
+            result['duration_max_ms'] = self.durations.max / 1000
+            if expected_interval_us:
+                corrected = self.durations.corrected(expected_interval_us)
+                result['expected_interval_ms'] = expected_interval_us / 1000
+                for p in CORRECTED_PERCENTILES:
+                    key = f'duration_corrected_p{p:g}_ms'.replace('.', '_')
+                    result[key] = corrected.percentile(p) / 1000
+        for name, (true, total) in self.rates.items():
+            if total:
+                result[f'{name}_rate'] = true / total
+        return result
+
+def _parse_time(text):
+    return datetime.fromisoformat(text.replace('Z', '+00:00'))
+
+def open_text(path):
+    if path.endswith('.gz'):
+        return gzip.open(path, 'rt', errors='replace')
+    return open(path, 'r', errors='replace')
+
+class K6StreamIngester:
+    """Group k6 NDJSON points by tag values"""
+
+    def __init__(self, group_by=DEFAULT_GROUP_BY):
+        self.group_by = tuple(group_by)
+        self.groups = {}
+        self.iterations = {}  # scenario -> LatencyHistogram of iteration_duration
+        self.lines = 0
+        self.points = 0
+
+    def feed(self, line):
+        """Consume one NDJSON line"""
+        self.lines += 1
+        match = METRIC_NAME.search(line)
+        if match is None or match.group(1) not in _WANTED or '"Point"' not in line:
+            return
+        point = json.loads(line)
+        if point.get('type') != 'Point':
+            return
+        metric = point['metric']
+        data = point['data']
+        tags = data.get('tags') or {}
+        if metric == ITERATION_METRIC:
+            # Iterations carry no runtime/endpoint tags, only their scenario
+            scenario = str(tags.get('scenario', MISSING_TAG))
+            iterations = self.iterations.get(scenario)
+            if iterations is None:
+                iterations = self.iterations[scenario] = LatencyHistogram()
+            iterations.record(round(float(data['value']) * 1000))
+            self.points += 1
+            return
+        key = tuple(str(tags.get(tag, MISSING_TAG)) for tag in self.group_by)
+        group = self.groups.get(key)
+        if group is None:
+            group = self.groups[key] = GroupStats()
+        if metric == DURATION_METRIC:
+            group.add_duration(float(data['value']), data['time'])
+        else:
+            group.add_rate(metric, data['value'])
+        self.points += 1
+
+    def ingest(self, path):
+        with open_text(path) as f:
+            for line in f:
+                self.feed(line)
+        return self
+
+    def rollup(self, *tags):
+        """Groups merged down to the given subset of group_by tags"""
+        positions = [self.group_by.index(tag) for tag in tags]
+        merged = {}
+        for key, group in self.groups.items():
+            subkey = tuple(key[i] for i in positions)
+            merged.setdefault(subkey, GroupStats()).merge(group)
+        return merged
+
+    def expected_interval_us(self, key=(), tags=()):
+        """Median iteration time of the scenario in key, or of all scenarios"""
+        if 'scenario' in tags and key[tags.index('scenario')] in self.iterations:
+            iterations = self.iterations[key[tags.index('scenario')]]
+        else:
+            iterations = LatencyHistogram.merged(self.iterations.values())
+        return closed_loop_interval_us(iterations)
+
+    def summary(self):
+        """JSON-ready summary: per group plus per-tag roll-ups"""
+        def table(groups, tags):
+            return [dict(zip(tags, key), **group.to_dict(self.expected_interval_us(key, tags)))
+                    for key, group in sorted(groups.items())]
+
+        return {
+            'group_by': list(self.group_by),
+            'groups': table(self.groups, self.group_by),
+            'rollups': {tag: table(self.rollup(tag), (tag,)) for tag in self.group_by},
+            'total': (self.rollup()[()].to_dict(self.expected_interval_us())
+                      if self.groups else GroupStats().to_dict()),
+        }
+
+def print_groups(groups, tags, ingester=None):
+    """One row per group; with the ingester, p99 corrected for coordinated omission too"""
+    header = ' '.join(f"{tag:<16}" for tag in tags)
+    print(f"{header} {'requests':>10} {'rps':>9} {'avg':>8} {'p50':>8} {'p95':>8} {'p99':>8} "
+          f"{'p99 co':>8} {'failed':>7}")
+    for key, group in sorted(groups.items()):
+        d = group.to_dict(ingester.expected_interval_us(key, tags) if ingester else None)
+        if not group.requests:
+            continue
+        labels = ' '.join(f"{value:<16}" for value in key)
+        print(f"{labels} {d['requests']:>10} {d.get('requests_per_sec', 0):>9.1f} "
+              f"{d['duration_avg_ms']:>8.2f} {d['duration_p50_ms']:>8.2f} "
+              f"{d['duration_p95_ms']:>8.2f} {d['duration_p99_ms']:>8.2f} "
+              f"{d.get('duration_corrected_p99_ms', d['duration_p99_ms']):>8.2f} "
+              f"{d.get('http_req_failed_rate', 0):>7.2%}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Aggregate k6 --out json output per tag group")
+    parser.add_argument('paths', nargs='+')
+    parser.add_argument('--group-by', nargs='+', default=list(DEFAULT_GROUP_BY),
+                        help="tags to group points by (default: runtime endpoint scenario)")
+    parser.add_argument('--output', '-o', help="write the summary as JSON")
+    args = parser.parse_args()
+
+    ingester = K6StreamIngester(args.group_by)
+    for path in args.paths:
+        ingester.ingest(path)
+    print(f"{ingester.lines} lines, {ingester.points} points aggregated into "
+          f"{len(ingester.groups)} groups")
+
+    print()
+    print_groups(ingester.groups, ingester.group_by, ingester)
+    for tag in ingester.group_by[:2]:
+        print()
+        print_groups(ingester.rollup(tag), (tag,), ingester)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(ingester.summary(), f, indent=2)
+        print(f"\nSummary saved to: {args.output}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
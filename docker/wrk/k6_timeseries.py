@@ -0,0 +1,339 @@
+#!/usr/bin/env python3
+"""Per-window time series of k6 per-request samples.
+
+Samples from k6 `--out json` are loaded into NumPy arrays once, then binned
+into fixed windows per runtime: requests per second, error rate and
+p50/p95/p99 latency for every window come out of one bincount and one sort,
+with no Python loop over samples. Windows are mapped onto the `stages` of
+the k6 script that produced the run, so each point carries its stage and
+the VU target k6 was ramping to at that moment.
+
+Loading, not binning, sets the pace. Lines are still read one at a time
+in Python: other metrics are skipped with a substring test, points are
+read with regexes (json only for escapes), and all timestamps are parsed
+in one vectorized pass. `bench.py samples` measures about 140 MiB/s, or
+roughly 50k requests/s with k6's 12 metrics per request, so 10M requests
+take minutes to load. Binning them takes seconds (`bench.py timeseries`).
+
+Usage: python3 k6_timeseries.py <k6-results.json> [--script benchmark/k6-*.js]
+                                [--window 1] [--tag runtime] [--csv out.csv]
+"""
+
+import argparse
+import json
+import re
+import sys
+from collections import namedtuple
+
+import numpy as np
+
+from k6_stream import DURATION_METRIC, METRIC_NAME, open_text
+
+PERCENTILES = (50, 95, 99)
+FAILED_METRIC = 'http_req_failed'
+MISSING_TAG = '-'
+
+# Sort-key packing: 2**40 us is ~12 days, leaving 23 bits for window keys
+VALUE_BITS = 40
+VALUE_MASK = (1 << VALUE_BITS) - 1
+
+_TIME = re.compile(r'"time":\s*"([^"]*)"')
+_VALUE = re.compile(r'"value":\s*([-+.\deE]+)[,}\s]')
+_STAGE = re.compile(r'''\{\s*duration:\s*['"]([^'"]+)['"]\s*,\s*target:\s*(\d+)\s*\}''')
+_DURATION_PART = re.compile(r'(\d+(?:\.\d+)?)(ms|s|m|h)')
+_DURATION_SECONDS = {'ms': 0.001, 's': 1.0, 'm': 60.0, 'h': 3600.0}
+
+# Arrays over every sample; times are seconds since the first sample, which
+# k6 stamped origin_ns (ns since the epoch, UTC)
+Samples = namedtuple('Samples', ['labels', 'time', 'duration_ms', 'group',
+                                 'failed_time', 'failed', 'failed_group', 'origin_ns'],
+                     defaults=(0,))
+
+# 'YYYY-MM-DDTHH:MM:SS.fffffffff': field columns, separators, full width
+_STAMP_FIELDS = ((0, 4), (5, 7), (8, 10), (11, 13), (14, 16), (17, 19))
+_STAMP_SEPARATORS = {4: '-', 7: '-', 10: 'T', 13: ':', 16: ':'}
+_STAMP_COLUMNS = 29
+
+Stage = namedtuple('Stage', ['start_s', 'end_s', 'start_target', 'target'])
+
+SERIES_DTYPE = np.dtype(
+    [('runtime', 'U16'), ('window', 'i4'), ('start_s', 'f8'), ('requests', 'i8'),
+     ('rps', 'f8'), ('error_rate', 'f8')]
+    + [(f'p{p}_ms', 'f8') for p in PERCENTILES]
+    + [('stage', 'i4'), ('target_vus', 'f8')]
+)
+
+def parse_duration(text):
+    """Seconds in a k6 duration string such as '1m30s'"""
+    parts = _DURATION_PART.findall(text)
+    if not parts:
+        raise ValueError(f"not a k6 duration: {text!r}")
+    return sum(float(value) * _DURATION_SECONDS[unit] for value, unit in parts)
+
+def stages_from_script(path):
+    """Stages of the `stages: [...]` option of a k6 script"""
+    with open(path) as f:
+        source = f.read()
+    start = source.find('stages:')
+    if start < 0:
+        return []
+    end = source.find(']', start)
+    stages = []
+    elapsed = 0.0
+    previous = 0
+    for duration, target in _STAGE.findall(source[start:end]):
+        seconds = parse_duration(duration)
+        stages.append(Stage(elapsed, elapsed + seconds, previous, int(target)))
+        elapsed += seconds
+        previous = int(target)
+    return stages
+
+def _days_from_civil(year, month, day):
+    """Days since 1970-01-01 of proleptic Gregorian dates (H. Hinnant's algorithm)"""
+    year = year - (month <= 2)
+    era = year // 400
+    year_of_era = year - era * 400
+    day_of_year = (153 * (month + np.where(month > 2, -3, 9)) + 2) // 5 + day - 1
+    day_of_era = year_of_era * 365 + year_of_era // 4 - year_of_era // 100 + day_of_year
+    return era * 146097 + day_of_era - 719468
+
+def _to_ns(times):
+    """ns since the epoch (UTC) of k6 RFC 3339 stamps, each shifted by its zone offset
+
+    All stamps are converted at once from the bytes of one fixed-width
+    array: the 'Z' or '+hh:mm' suffix and every field of
+    'YYYY-MM-DDTHH:MM:SS[.fffffffff]' sit at known columns. Stamps in any
+    other layout are handed to numpy's parser.
+    """
+    stamps = np.array(times, dtype=bytes)
+    n = len(stamps)
+    if n == 0:
+        return np.zeros(0, dtype=np.int64)
+    width = stamps.dtype.itemsize
+    matrix = stamps.view(np.uint8).reshape(n, width)
+    rows = np.arange(n)
+    ends = np.char.str_len(stamps)
+
+    def back(k):
+        return matrix[rows, np.maximum(ends - k, 0)].astype(np.int64)
+
+    last, sign_byte = back(1), back(6)
+    zulu = (last == ord('Z')) | (last == ord('z'))
+    sign = np.where(sign_byte == ord('+'), 1, np.where(sign_byte == ord('-'), -1, 0))
+    zoned = ~zulu & (sign != 0) & (back(3) == ord(':'))
+    hours = (back(5) - 48) * 10 + back(4) - 48
+    minutes = (back(2) - 48) * 10 + last - 48
+    offset_minutes = np.where(zoned, sign * (hours * 60 + minutes), 0)
+    cut = np.where(zulu, ends - 1, np.where(zoned, ends - 6, ends))
+
+    # One contiguous row per column; bytes that are not digits wrap above 9
+    columns = np.zeros((_STAMP_COLUMNS, n), dtype=np.uint8)
+    columns[:min(width, _STAMP_COLUMNS)] = matrix[:, :_STAMP_COLUMNS].T
+    digits = columns - np.uint8(ord('0'))
+
+    bad = cut < 19
+    for column, separator in _STAMP_SEPARATORS.items():
+        bad |= columns[column] != ord(separator)
+    fields = []
+    for first, last in _STAMP_FIELDS:
+        bad |= (digits[first:last] > 9).any(axis=0)
+        value = np.zeros(n, dtype=np.int64)
+        for column in range(first, last):
+            value = value * 10 + digits[column]
+        fields.append(value)
+    # Up to nine fraction digits after a '.' in column 19
+    dotted = columns[19] == ord('.')
+    bad |= np.where(dotted, (cut < 21) | (cut > _STAMP_COLUMNS), cut != 19)
+    fraction = np.zeros(n, dtype=np.int64)
+    for column in range(20, _STAMP_COLUMNS):
+        present = dotted & (column < cut)
+        bad |= present & (digits[column] > 9)
+        fraction += np.where(present, digits[column], 0).astype(np.int64) * 10 ** (_STAMP_COLUMNS - 1 - column)
+
+    year, month, day, hour, minute, second = fields
+    seconds = (_days_from_civil(year, month, day) * 86400 + hour * 3600 + minute * 60 + second
+               - offset_minutes * 60)
+    ns = seconds * 10 ** 9 + fraction
+    if bad.any():
+        naive = [stamp[:c].decode() for stamp, c in zip(stamps[bad].tolist(), cut[bad].tolist())]
+        ns[bad] = (np.array(naive, dtype='datetime64[ns]').astype(np.int64)
+                   - offset_minutes[bad] * 60 * 10 ** 9)
+    return ns
+
+def _point_fields(line, tag_pattern):
+    """(time, value, tag) of a Point line read with regexes, or Nones when it does not fit"""
+    time = _TIME.search(line)
+    value = _VALUE.search(line)
+    if time is None or value is None or '"type":"Point"' not in line:
+        return None, None, None
+    label = tag_pattern.search(line)
+    return time.group(1), float(value.group(1)), label.group(1) if label else MISSING_TAG
+
+def load_samples(paths, tag='runtime'):
+    """Samples of http_req_duration and http_req_failed, grouped by one tag"""
+    labels = {}
+    columns = {DURATION_METRIC: ([], [], []), FAILED_METRIC: ([], [], [])}
+    tag_pattern = re.compile(r'"tags":\s*\{[^{}]*?"' + re.escape(tag) + r'":\s*"([^"]*)"')
+    for path in paths:
+        with open_text(path) as f:
+            for line in f:
+                # Most lines are other metrics: a substring test skips them
+                # before any regex or JSON decoding
+                if '"Point"' not in line or (DURATION_METRIC not in line and FAILED_METRIC not in line):
+                    continue
+                match = METRIC_NAME.search(line)
+                if match is None or match.group(1) not in columns:
+                    continue
+                time, value, label = _point_fields(line, tag_pattern) if '\\' not in line else (None,) * 3
+                if time is None:
+                    # Escapes or an unexpected layout: decode the line properly
+                    point = json.loads(line)
+                    if point.get('type') != 'Point':
+                        continue
+                    data = point['data']
+                    time, value = data['time'], data['value']
+                    label = str((data.get('tags') or {}).get(tag, MISSING_TAG))
+                times, values, groups = columns[match.group(1)]
+                times.append(time)
+                values.append(value)
+                groups.append(labels.setdefault(label, len(labels)))
+
+    d_times, d_values, d_groups = columns[DURATION_METRIC]
+    f_times, f_values, f_groups = columns[FAILED_METRIC]
+    d_ns = _to_ns(d_times)
+    f_ns = _to_ns(f_times)
+    origin = min((x.min() for x in (d_ns, f_ns) if len(x)), default=0)
+    return Samples(
+        labels=np.array(sorted(labels, key=labels.get), dtype=str),
+        time=(d_ns - origin) / 1e9,
+        duration_ms=np.asarray(d_values, dtype=float),
+        group=np.asarray(d_groups, dtype=np.int64),
+        failed_time=(f_ns - origin) / 1e9,
+        failed=np.asarray(f_values, dtype=float),
+        failed_group=np.asarray(f_groups, dtype=np.int64),
+        origin_ns=int(origin),
+    )
+
+def binned_percentiles(keys, values_ms, size, percentiles=PERCENTILES):
+    """(counts[size], {p: nearest-rank percentile[size]}) of values per integer key
+
+    One integer sort replaces a two-key lexsort: the key goes in the high
+    bits and the value, at microsecond resolution, in the low VALUE_BITS.
+    """
+    counts = np.bincount(keys, minlength=size)
+    micros = np.clip(np.rint(values_ms * 1000), 0, VALUE_MASK).astype(np.int64)
+    ordered = (np.sort((keys.astype(np.int64) << VALUE_BITS) | micros) & VALUE_MASK) / 1000
+    starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+    result = {}
+    for p in percentiles:
+        rank = np.maximum(np.ceil(counts * p / 100).astype(np.int64) - 1, 0)
+        index = np.minimum(starts + rank, max(len(ordered) - 1, 0))
+        picked = ordered[index] if len(ordered) else np.zeros(size)
+        result[p] = np.where(counts > 0, picked, np.nan)
+    return counts, result
+
+def stage_at(seconds, stages):
+    """(stage index, interpolated VU target) at each time; index -1 past the end"""
+    seconds = np.asarray(seconds, dtype=float)
+    if not stages:
+        return np.full(seconds.shape, -1), np.full(seconds.shape, np.nan)
+    ends = np.array([s.end_s for s in stages])
+    index = np.searchsorted(ends, seconds, side='right')
+    inside = index < len(stages)
+    clipped = np.minimum(index, len(stages) - 1)
+    start = np.array([s.start_s for s in stages])[clipped]
+    begin = np.array([s.start_target for s in stages], dtype=float)[clipped]
+    target = np.array([s.target for s in stages], dtype=float)[clipped]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        progress = np.clip((seconds - start) / (ends[clipped] - start), 0, 1)
+    return np.where(inside, clipped, -1), np.where(inside, begin + (target - begin) * progress, np.nan)
+
+def _aggregate(samples, duration_bins, failed_bins, n_bins, spans):
+    """Structured rows per (group, bin); spans[bin] is the bin length in seconds"""
+    n_groups = len(samples.labels)
+    size = n_groups * n_bins
+    counts, percentiles = binned_percentiles(samples.group * n_bins + duration_bins,
+                                             samples.duration_ms, size)
+    failed_keys = samples.failed_group * n_bins + failed_bins
+    failed_total = np.bincount(failed_keys, minlength=size)
+    failed_true = np.bincount(failed_keys, weights=samples.failed != 0, minlength=size)
+
+    rows = np.zeros(size, dtype=SERIES_DTYPE)
+    rows['runtime'] = np.repeat(samples.labels, n_bins)
+    rows['window'] = np.tile(np.arange(n_bins), n_groups)
+    rows['requests'] = counts
+    rows['rps'] = counts / np.tile(spans, n_groups)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        rows['error_rate'] = failed_true / failed_total
+    for p in PERCENTILES:
+        rows[f'p{p}_ms'] = percentiles[p]
+    return rows
+
+def window_series(samples, window_s=1.0, stages=None):
+    """RPS, error rate and latency percentiles per runtime per window"""
+    last = max((t.max() for t in (samples.time, samples.failed_time) if len(t)), default=0.0)
+    n_bins = int(last // window_s) + 1
+    rows = _aggregate(samples, (samples.time // window_s).astype(np.int64),
+                      (samples.failed_time // window_s).astype(np.int64),
+                      n_bins, np.full(n_bins, window_s))
+    rows['start_s'] = rows['window'] * window_s
+    rows['stage'], rows['target_vus'] = stage_at(rows['start_s'] + window_s / 2, stages or [])
+    return rows
+
+def stage_series(samples, stages):
+    """The same statistics per runtime per script stage (-1 collects overrun)"""
+    n_bins = len(stages) + 1
+    overrun = max(float(samples.time.max()) - stages[-1].end_s if len(samples.time) else 0.0, 1.0)
+    spans = np.array([s.end_s - s.start_s for s in stages] + [overrun])
+    duration_stage, _ = stage_at(samples.time, stages)
+    failed_stage, _ = stage_at(samples.failed_time, stages)
+    # Stage -1 goes to the last bin
+    rows = _aggregate(samples, np.where(duration_stage < 0, n_bins - 1, duration_stage),
+                      np.where(failed_stage < 0, n_bins - 1, failed_stage), n_bins, spans)
+    rows['stage'] = np.where(rows['window'] == n_bins - 1, -1, rows['window'])
+    rows['start_s'] = np.array([s.start_s for s in stages] + [stages[-1].end_s])[rows['window']]
+    rows['target_vus'] = np.array([s.target for s in stages] + [np.nan])[rows['window']]
+    return rows[rows['requests'] > 0]
+
+def print_stages(rows, stages):
+    print(f"{'runtime':<12} {'stage':>5} {'target':>6} {'requests':>9} {'rps':>8} "
+          f"{'errors':>7} {'p50':>8} {'p95':>8} {'p99':>8}")
+    for row in rows:
+        stage = 'after' if row['stage'] < 0 else str(row['stage'] + 1)
+        target = '' if np.isnan(row['target_vus']) else f"{row['target_vus']:.0f}"
+        print(f"{row['runtime']:<12} {stage:>5} {target:>6} {row['requests']:>9} {row['rps']:>8.1f} "
+              f"{row['error_rate']:>7.2%} {row['p50_ms']:>8.1f} {row['p95_ms']:>8.1f} {row['p99_ms']:>8.1f}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-window time series of k6 --out json samples")
+    parser.add_argument('paths', nargs='+')
+    parser.add_argument('--script', help="k6 script whose stages the run followed")
+    parser.add_argument('--window', type=float, default=1.0, help="window length in seconds")
+    parser.add_argument('--tag', default='runtime', help="tag to split series by (default: runtime)")
+    parser.add_argument('--csv', help="write the per-window series here")
+    args = parser.parse_args()
+
+    samples = load_samples(args.paths, args.tag)
+    if len(samples.time) == 0:
+        print("No http_req_duration samples found")
+        return 1
+    stages = stages_from_script(args.script) if args.script else []
+
+    series = window_series(samples, args.window, stages)
+    print(f"{len(samples.time)} samples, {len(samples.labels)} {args.tag} groups, "
+          f"{len(series) // len(samples.labels)} windows of {args.window:g}s")
+    if stages:
+        print()
+        print_stages(stage_series(samples, stages), stages)
+
+    if args.csv:
+        with open(args.csv, 'w') as f:
+            f.write(','.join(series.dtype.names) + '\n')
+            for row in series:
+                f.write(','.join('' if isinstance(v, float) and np.isnan(v) else str(v)
+                                 for v in row.tolist()) + '\n')
+        print(f"\nTime series saved to: {args.csv}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,461 @@
+#!/usr/bin/env python3
+"""Open-loop HTTP load generator for the BenchmarkController /api/* routes.
+
+wrk and looping-VU k6 are closed loops. A stalled response holds back the
+next request on its connection, so the load drops exactly when the server
+is slow. This generator sends on a schedule instead: arrivals come at a
+fixed rate (constant) or as a Poisson process with that mean rate
+(poisson), whatever the responses do. Latency is measured from the
+scheduled arrival, so time spent waiting for a free connection counts
+against the server as it would for a real client. A second histogram
+keeps the service time from the write alone.
+
+Each target has a pool of up to --connections keep-alive HTTP/1.1
+connections, driven by asyncio Protocol callbacks. There is no task or
+stream per request: a response completes in data_received and the
+connection takes the next queued request. Endpoints follow a weighted mix,
+either read from the k6 script's `endpoints` and `weights` objects or
+given with --endpoint PATH=WEIGHT. Targets are picked uniformly, as in
+k6-bateria-3-comprehensive.js.
+
+Latencies go into hdr_histogram.LatencyHistogram per (runtime, endpoint).
+--output writes them in the histograms-<ts>.json layout, so
+hdr_histogram.py merges them with wrk runs. The loop is uvloop when it is
+installed (--loop auto).
+
+--stub-server PORT serves a fixed 200 response with keep-alive, to test
+the generator on its own (bench.py loadgen).
+
+Usage: python3 loadgen.py [--target swoole=http://localhost:8001 ...] [--rate 1000] [--duration 30]
+                          [--arrival constant|poisson] [--script benchmark/k6-*.js | --endpoint /api/health=1]
+                          [--connections 64] [--loop auto|uvloop|asyncio] [--output histograms-TS.json]
+       python3 loadgen.py --stub-server 8080 [--stub-delay-ms MS]
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import re
+import sys
+import time
+from collections import deque, namedtuple
+from itertools import accumulate
+from urllib.parse import urlsplit
+
+from hdr_histogram import REPORT_PERCENTILES, LatencyHistogram
+
+# Ports of k6-bateria-3-comprehensive.js
+RUNTIMES = (('swoole', 'http://localhost:8001'), ('php_fpm', 'http://localhost:8002'),
+            ('frankenphp', 'http://localhost:8003'))
+ARRIVALS = ('constant', 'poisson')
+LOOPS = ('auto', 'uvloop', 'asyncio')
+DEFAULT_CONNECTIONS = 64
+STUB_BODY = b'{"status":"ok"}'
+
+Target = namedtuple('Target', ['name', 'host', 'port'])
+MixEntry = namedtuple('MixEntry', ['path', 'category', 'weight'])
+# One scheduled request: wire bytes, (runtime, endpoint) key, scheduled loop time
+Request = namedtuple('Request', ['data', 'key', 'scheduled'])
+
+_BLOCK = r'const\s+{}\s*=\s*\{{(.*?)\}};'
+_CATEGORY = re.compile(r'(\w+)\s*:\s*\[([^\]]*)\]', re.S)
+_WEIGHT = re.compile(r'(\w+)\s*:\s*([\d.]+)')
+_PATH = re.compile(r"""['"]([^'"]+)['"]""")
+
+def parse_target(text):
+    """Target from 'name=http://host:port' or a bare URL"""
+    name, _, url = text.rpartition('=')
+    parts = urlsplit(url if '//' in url else f'http://{url}')
+    return Target(name or parts.netloc, parts.hostname or 'localhost', parts.port or 80)
+
+def parse_endpoint(text):
+    """MixEntry from '/api/health' or '/api/health=3'"""
+    path, _, weight = text.partition('=')
+    return MixEntry(path, path, float(weight or 1))
+
+def mix_from_script(path):
+    """Weighted endpoints of a k6 script's `endpoints` and `weights` objects
+
+    A category's weight is shared evenly by its endpoints, as the script
+    picks one of them uniformly.
+    """
+    with open(path) as f:
+        source = f.read()
+    endpoints = re.search(_BLOCK.format('endpoints'), source, re.S)
+    weights = re.search(_BLOCK.format('weights'), source, re.S)
+    if endpoints is None or weights is None:
+        raise ValueError(f"{path}: no `endpoints` and `weights` objects")
+    shares = {category: float(weight) for category, weight in _WEIGHT.findall(weights.group(1))}
+    mix = []
+    for category, body in _CATEGORY.findall(endpoints.group(1)):
+        paths = _PATH.findall(body)
+        for endpoint in paths:
+            mix.append(MixEntry(endpoint, category, shares.get(category, 0.0) / len(paths)))
+    return [entry for entry in mix if entry.weight > 0]
+
+def arrival_times(rate, duration_s, kind='constant', rng=None):
+    """Scheduled send offsets in seconds: every 1/rate, or exponential gaps"""
+    if kind == 'constant':
+        for i in range(int(rate * duration_s)):
+            yield i / rate
+        return
+    rng = rng or random.Random()
+    t = rng.expovariate(rate)
+    while t < duration_s:
+        yield t
+        t += rng.expovariate(rate)
+
+class Stats:
+    """Latency histograms and counters per (runtime, endpoint)"""
+
+    def __init__(self):
+        self.latency = {}
+        self.service = {}
+        self.statuses = {}
+        self.errors = {}
+        self.lag = LatencyHistogram()
+        self.completed = 0
+
+    def record(self, key, latency_s, service_s, status):
+        histogram = self.latency.get(key)
+        if histogram is None:
+            histogram = self.latency[key] = LatencyHistogram()
+            self.service[key] = LatencyHistogram()
+        histogram.record(latency_s * 1e6)
+        self.service[key].record(service_s * 1e6)
+        statuses = self.statuses.setdefault(key, {})
+        statuses[status] = statuses.get(status, 0) + 1
+        self.completed += 1
+
+    def error(self, key):
+        self.errors[key] = self.errors.get(key, 0) + 1
+        self.completed += 1
+
+class Connection(asyncio.Protocol):
+    """One keep-alive HTTP/1.1 connection; one request in flight at a time"""
+
+    def __init__(self, pool):
+        self.pool = pool
+        self.transport = None
+        self.request = None
+        self.sent = 0.0
+        self.buffer = bytearray()
+        self.need = None
+        self.chunked = False
+        self.close_after = False
+        self.status = 0
+
+    def connection_made(self, transport):
+        self.transport = transport
+        self.pool.connected(self)
+
+    def send(self, request):
+        self.request = request
+        self.sent = self.pool.loop.time()
+        self.transport.write(request.data)
+
+    def data_received(self, data):
+        buffer = self.buffer
+        buffer += data
+        while self.request is not None:
+            if self.need is None:
+                end = buffer.find(b'\r\n\r\n')
+                if end < 0:
+                    return
+                head = bytes(buffer[:end]).lower()
+                try:
+                    self.status = int(buffer[9:12])
+                except ValueError:
+                    # Not HTTP: drop the connection, the request counts as an error
+                    self.transport.close()
+                    return
+                self.close_after = b'\nconnection: close' in head
+                self.chunked = b'\ntransfer-encoding: chunked' in head
+                at = head.find(b'\ncontent-length:')
+                length = int(head[at + 16:].split(b'\r', 1)[0]) if at >= 0 else 0
+                self.need = end + 4 + (0 if self.chunked else length)
+            if self.chunked:
+                # Done at the last chunk; bodies here are JSON, not binary
+                end = buffer.find(b'\r\n0\r\n\r\n', self.need - 2)
+                if end < 0:
+                    return
+                size = end + 7
+            elif len(buffer) >= self.need:
+                size = self.need
+            else:
+                return
+            del buffer[:size]
+            self.need = None
+            self._finish()
+
+    def _finish(self):
+        request, self.request = self.request, None
+        now = self.pool.loop.time()
+        self.pool.stats.record(request.key, now - request.scheduled, now - self.sent, self.status)
+        if self.close_after:
+            self.transport.close()
+        else:
+            self.pool.release(self)
+
+    def connection_lost(self, exc):
+        request, self.request = self.request, None
+        self.pool.lost(self, request)
+
+class Pool:
+    """Up to size connections to one target, opened on demand"""
+
+    def __init__(self, loop, target, size, stats):
+        self.loop = loop
+        self.target = target
+        self.size = size
+        self.stats = stats
+        self.idle = []
+        self.pending = deque()
+        self.open = 0
+        self.opening = 0
+        self.failures = 0
+
+    def submit(self, request):
+        if self.idle:
+            self.idle.pop().send(request)
+            return
+        self.pending.append(request)
+        if self.open + self.opening < self.size:
+            self._connect()
+
+    def _connect(self):
+        self.opening += 1
+        task = self.loop.create_task(self.loop.create_connection(
+            lambda: Connection(self), self.target.host, self.target.port))
+        task.add_done_callback(self._connect_done)
+
+    def _connect_done(self, task):
+        if task.cancelled() or task.exception() is None:
+            return
+        self.opening -= 1
+        self.failures += 1
+        # Nothing will ever take the queue when no connection can be opened
+        if self.open + self.opening == 0:
+            while self.pending:
+                self.stats.error(self.pending.popleft().key)
+
+    def connected(self, connection):
+        self.opening -= 1
+        self.open += 1
+        self.release(connection)
+
+    def release(self, connection):
+        if self.pending:
+            connection.send(self.pending.popleft())
+        else:
+            self.idle.append(connection)
+
+    def lost(self, connection, request):
+        self.open -= 1
+        if connection in self.idle:
+            self.idle.remove(connection)
+        if request is not None:
+            self.stats.error(request.key)
+        if self.pending and self.open + self.opening < self.size:
+            self._connect()
+
+    def close(self):
+        for connection in self.idle:
+            connection.transport.close()
+
+def request_bytes(target, path):
+    return (f"GET {path} HTTP/1.1\r\nHost: {target.host}:{target.port}\r\n"
+            f"User-Agent: loadgen\r\nAccept: */*\r\n\r\n").encode()
+
+async def generate(targets, mix, rate, duration_s, arrival='constant', connections=DEFAULT_CONNECTIONS,
+                   seed=None, drain_s=10.0):
+    """Run one open-loop schedule; returns (stats, sent, elapsed_s)"""
+    loop = asyncio.get_running_loop()
+    stats = Stats()
+    pools = [Pool(loop, target, connections, stats) for target in targets]
+    # Every (target, endpoint) with its wire bytes and weight
+    choices = [(pool, request_bytes(pool.target, entry.path), (pool.target.name, entry.path))
+               for pool in pools for entry in mix]
+    cumulative = list(accumulate(entry.weight for _ in pools for entry in mix))
+    rng = random.Random(seed)
+    schedule = arrival_times(rate, duration_s, arrival, random.Random(rng.random()))
+
+    start = loop.time() + 0.05
+    sent = 0
+    offset = next(schedule, None)
+    while offset is not None:
+        now = loop.time() - start
+        if offset > now:
+            await asyncio.sleep(offset - now)
+            now = loop.time() - start
+        # Everything due by now goes out in one batch
+        due = []
+        while offset is not None and offset <= now:
+            due.append(offset)
+            offset = next(schedule, None)
+        picks = rng.choices(choices, cum_weights=cumulative, k=len(due))
+        for scheduled, (pool, data, key) in zip(due, picks):
+            stats.lag.record((now - scheduled) * 1e6)
+            pool.submit(Request(data, key, start + scheduled))
+        sent += len(due)
+        # Let responses in between batches when the schedule is behind
+        if len(due) > 1:
+            await asyncio.sleep(0)
+
+    deadline = loop.time() + drain_s
+    while stats.completed < sent and loop.time() < deadline:
+        await asyncio.sleep(0.01)
+    elapsed = loop.time() - start
+    for pool in pools:
+        pool.close()
+    return stats, sent, elapsed
+
+def new_loop(kind='auto'):
+    """(event loop, name): uvloop when installed, unless asyncio is asked for"""
+    if kind != 'asyncio':
+        try:
+            import uvloop
+            return uvloop.new_event_loop(), 'uvloop'
+        except ImportError:
+            if kind == 'uvloop':
+                raise
+    return asyncio.new_event_loop(), 'asyncio'
+
+def run(coroutine, kind='auto'):
+    loop, name = new_loop(kind)
+    asyncio.set_event_loop(loop)
+    try:
+        return loop.run_until_complete(coroutine), name
+    finally:
+        loop.close()
+
+class StubServer(asyncio.Protocol):
+    """Answers every request on a connection with the same small 200"""
+
+    response = (b'HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n'
+                b'Content-Length: %d\r\n\r\n%s' % (len(STUB_BODY), STUB_BODY))
+
+    def __init__(self, delay_s=0.0):
+        self.delay_s = delay_s
+        self.transport = None
+        self.buffer = b''
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def data_received(self, data):
+        # GET requests only: a request ends at its blank line
+        self.buffer += data
+        n = self.buffer.count(b'\r\n\r\n')
+        if n:
+            self.buffer = self.buffer[self.buffer.rfind(b'\r\n\r\n') + 4:]
+            if self.delay_s:
+                asyncio.get_running_loop().call_later(self.delay_s, self._reply, n)
+            else:
+                self._reply(n)
+
+    def _reply(self, n):
+        if not self.transport.is_closing():
+            self.transport.write(self.response * n)
+
+async def serve_stub(port, delay_s=0.0, ready=None):
+    """Serve StubServer on 127.0.0.1 until cancelled; ready(port) gets the bound port (port 0 picks one)"""
+    loop = asyncio.get_running_loop()
+    server = await loop.create_server(lambda: StubServer(delay_s), '127.0.0.1', port, backlog=1024)
+    if ready is not None:
+        ready(server.sockets[0].getsockname()[1])
+    async with server:
+        await server.serve_forever()
+
+def summary_rows(stats, elapsed_s):
+    """(runtime, endpoint, requests, errors, rps, {pN: ms}, max ms) per key, then per runtime"""
+    rows = []
+    keys = sorted(set(stats.latency) | set(stats.errors))
+    runtimes = {}
+    for key in keys:
+        runtimes.setdefault(key[0], []).append(key)
+    for runtime, members in runtimes.items():
+        for endpoint_keys, endpoint in [([key], key[1]) for key in members] + [(members, '*')]:
+            histogram = LatencyHistogram.merged(stats.latency[k] for k in endpoint_keys if k in stats.latency)
+            errors = sum(stats.errors.get(k, 0) for k in endpoint_keys)
+            failed = sum(count for k in endpoint_keys for status, count in stats.statuses.get(k, {}).items()
+                         if status >= 400)
+            rows.append((runtime, endpoint, histogram.total, errors + failed, histogram.total / elapsed_s,
+                         {p: (histogram.percentile(p) or 0) / 1000 for p in REPORT_PERCENTILES},
+                         (histogram.max or 0) / 1000))
+    return rows
+
+def write_histograms(path, stats, label):
+    """histograms-<ts>.json layout: {runtime: {endpoint: {label: encoded}}}"""
+    data = {}
+    for (runtime, endpoint), histogram in sorted(stats.latency.items()):
+        data.setdefault(runtime, {}).setdefault(endpoint, {})[label] = histogram.encode()
+    with open(path, 'w') as f:
+        json.dump(data, f)
+
+def main():
+    parser = argparse.ArgumentParser(description="Open-loop HTTP load generator (constant or Poisson arrivals)")
+    parser.add_argument('--target', action='append', metavar='NAME=URL',
+                        help="repeatable; default: the three runtimes on ports 8001-8003")
+    parser.add_argument('--rate', type=float, default=1000.0, help="arrivals per second, all targets together")
+    parser.add_argument('--duration', type=float, default=30.0, help="seconds of arrivals")
+    parser.add_argument('--arrival', choices=ARRIVALS, default='constant')
+    parser.add_argument('--script', help="k6 script whose endpoints/weights mix to use")
+    parser.add_argument('--endpoint', action='append', metavar='PATH[=WEIGHT]',
+                        help="repeatable; default: /api/health")
+    parser.add_argument('--connections', type=int, default=DEFAULT_CONNECTIONS, help="per target")
+    parser.add_argument('--loop', choices=LOOPS, default='auto')
+    parser.add_argument('--seed', type=int, help="for the endpoint picks and Poisson gaps")
+    parser.add_argument('--drain', type=float, default=10.0, help="seconds to wait for late responses")
+    parser.add_argument('--output', '-o', help="write histograms-<ts>.json for hdr_histogram.py")
+    parser.add_argument('--stub-server', type=int, metavar='PORT', help="serve a stub instead of generating (0: any free port)")
+    parser.add_argument('--stub-delay-ms', type=float, default=0.0)
+    args = parser.parse_args()
+
+    if args.stub_server is not None:
+        try:
+            run(serve_stub(args.stub_server, args.stub_delay_ms / 1000,
+                           lambda port: print(f"Stub server on 127.0.0.1:{port}", flush=True)), args.loop)
+        except KeyboardInterrupt:
+            pass
+        return 0
+
+    targets = [parse_target(t) for t in args.target] if args.target else [parse_target(f'{n}={u}')
+                                                                           for n, u in RUNTIMES]
+    try:
+        mix = (mix_from_script(args.script) if args.script
+               else [parse_endpoint(e) for e in args.endpoint or ['/api/health']])
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}")
+        return 1
+    print(f"{args.arrival} arrivals at {args.rate:g}/s for {args.duration:g}s over "
+          f"{', '.join(t.name for t in targets)}; {len(mix)} endpoints, {args.connections} connections each")
+
+    cpu_start = time.process_time()
+    (stats, sent, elapsed), loop_name = run(
+        generate(targets, mix, args.rate, args.duration, args.arrival, args.connections, args.seed, args.drain),
+        args.loop)
+    cpu = time.process_time() - cpu_start
+
+    percentiles = ' '.join(f"{'p' + format(p, 'g'):>8}" for p in REPORT_PERCENTILES)
+    print(f"\n{'runtime':<12} {'endpoint':<26} {'requests':>9} {'errors':>7} {'rps':>9} {percentiles} {'max':>9}")
+    for runtime, endpoint, requests, errors, rps, values, peak in summary_rows(stats, elapsed):
+        print(f"{runtime:<12} {endpoint:<26} {requests:>9} {errors:>7} {rps:>9.1f} "
+              + ' '.join(f"{values[p]:>6.2f}ms" for p in REPORT_PERCENTILES) + f" {peak:>7.1f}ms")
+    unanswered = sent - stats.completed
+    print(f"\n{sent} sent, {stats.completed - sum(stats.errors.values())} answered, "
+          f"{sum(stats.errors.values())} connection errors, {unanswered} unanswered after {args.drain:g}s")
+    print(f"Generator: {loop_name}, {cpu:.2f}s CPU for {elapsed:.2f}s ({100 * cpu / elapsed:.0f}% of one core); "
+          f"schedule lag p99 {stats.lag.percentile(99) / 1000:.2f}ms, max {stats.lag.max / 1000:.2f}ms"
+          if sent else f"Generator: {loop_name}, nothing sent")
+    if sent and stats.lag.percentile(99) > 5000:
+        print("Warning: the generator fell behind its schedule; latencies include its own queueing")
+
+    if args.output:
+        write_histograms(args.output, stats, f"{args.rate:g}rps-{args.arrival}")
+        print(f"Histograms saved to: {args.output}")
+    return 0 if stats.completed else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""Content-addressed on-disk cache of parsed benchmark files.
+
+Parsed results are stored under the SHA-256 of the file contents plus the
+parser version, so a result is reused only for byte-identical input parsed
+by the same parser. An index of (size, mtime) per path lets unchanged files
+skip hashing entirely; only new or modified files are read.
+
+Layout:
+    <cache_dir>/index.json                      path -> size, mtime_ns, sha256
+    <cache_dir>/objects/<sha[:2]>/<sha>-<version>.json
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+
+HASH_CHUNK = 1024 * 1024
+
+def file_digest(path):
+    """SHA-256 of a file, read in fixed-size chunks"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def write_json_atomic(path, data):
+    """Write JSON via a temp file and rename so readers never see partial files"""
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w') as f:
+            json.dump(data, f, separators=(',', ':'))
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+class ParseCache:
+    """Cache of parse results keyed by file content hash and parser version"""
+
+    def __init__(self, cache_dir, parser_version):
+        self.cache_dir = cache_dir
+        self.parser_version = str(parser_version)
+        self.index_path = os.path.join(cache_dir, 'index.json')
+        self.hits = 0
+        self.misses = 0
+        self._dirty = False
+        try:
+            with open(self.index_path) as f:
+                self._index = json.load(f)
+        except (OSError, ValueError):
+            self._index = {}
+
+    def _object_path(self, digest):
+        return os.path.join(self.cache_dir, 'objects', digest[:2],
+                            f"{digest}-{self.parser_version}.json")
+
+    def digest(self, path):
+        """Content hash of path, taken from the index when size and mtime match"""
+        st = os.stat(path)
+        key = os.path.abspath(path)
+        entry = self._index.get(key)
+        if entry and entry['size'] == st.st_size and entry['mtime_ns'] == st.st_mtime_ns:
+            return entry['sha256']
+        digest = file_digest(path)
+        self._index[key] = {'size': st.st_size, 'mtime_ns': st.st_mtime_ns, 'sha256': digest}
+        self._dirty = True
+        return digest
+
+    def get(self, path):
+        """Cached result for path, or None when it has to be parsed"""
+        try:
+            with open(self._object_path(self.digest(path))) as f:
+                result = json.load(f)
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return result
+
+    def put(self, path, result):
+        """Store the parse result of path"""
+        write_json_atomic(self._object_path(self.digest(path)), result)
+
+    def get_or_parse(self, path, parse):
+        """Cached result for path, running parse(path) on a miss"""
+        result = self.get(path)
+        if result is None:
+            result = parse(path)
+            self.put(path, result)
+        return result
+
+    def prune(self):
+        """Forget index entries whose files no longer exist"""
+        for key in [k for k in self._index if not os.path.exists(k)]:
+            del self._index[key]
+            self._dirty = True
+
+    def save(self):
+        """Persist the index if it changed"""
+        if self._dirty:
+            write_json_atomic(self.index_path, self._index)
+            self._dirty = False
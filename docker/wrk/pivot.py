@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""Runtime x endpoint x concurrency heatmaps over the wrk results store.
+
+pivot() turns store rows into one matrix per facet with a single group-by.
+Every dimension is dictionary-encoded with np.unique, and the codes are
+packed into one integer cell key. The field is then aggregated per key,
+either with bincount (mean, count) or with one sort (median, min, max,
+latest run). Thousands of cells cost a few array passes instead of a
+Python loop per cell. Heatmaps are drawn with chart_engine, one panel per
+facet, on a shared colour scale.
+
+Dimensions are the store's key columns plus values derived from run_time:
+    runtime, endpoint, connections, run (timestamp), date, month
+Rows, columns and facets may combine several ('runtime,connections').
+
+Usage: python3 pivot.py <store_dir> [--rows runtime,connections] [--cols endpoint]
+                        [--facet date] [--field latency_p99_ms] [--agg median]
+                        [--last N] [--output heatmap.png] [--csv pivot.csv]
+"""
+
+import argparse
+import math
+import os
+import sys
+import time
+from collections import namedtuple
+
+import numpy as np
+
+from chart_engine import Chart, Panel, pyplot, render
+from results_store import METRIC_COLUMNS, ResultsStore
+
+DIMENSIONS = ('runtime', 'endpoint', 'connections', 'run', 'date', 'month')
+AGGREGATES = ('median', 'mean', 'min', 'max', 'latest', 'count')
+# Drawn green when high; every other metric is green when low
+HIGHER_IS_BETTER = frozenset(('requests_per_sec', 'transfer_mb_per_sec', 'total_requests', 'read_mb'))
+
+# values and counts are [facet, row, col]; values are NaN where no run has the cell
+Pivot = namedtuple('Pivot', ['field', 'agg', 'facets', 'rows', 'cols', 'values', 'counts'])
+
+def dimension(rows, name):
+    """Column of store rows for one dimension"""
+    if name == 'run':
+        return rows['timestamp']
+    if name == 'date':
+        return rows['run_time'].astype('datetime64[D]')
+    if name == 'month':
+        return rows['run_time'].astype('datetime64[M]')
+    if name in ('runtime', 'endpoint', 'connections'):
+        return rows[name]
+    raise ValueError(f"unknown dimension {name!r} (one of {', '.join(DIMENSIONS)})")
+
+def encode(rows, names):
+    """(labels, codes[len(rows)]) of the combinations of dimensions that occur"""
+    if not names:
+        return ['all'], np.zeros(len(rows), dtype=np.int64)
+    packed = np.zeros(len(rows), dtype=np.int64)
+    categories = []
+    for name in names:
+        values, inverse = np.unique(dimension(rows, name), return_inverse=True)
+        packed = packed * len(values) + inverse.ravel()
+        categories.append(values)
+    used, codes = np.unique(packed, return_inverse=True)
+    # One label per combination, unpacked from its code
+    labels = []
+    for code in used.tolist():
+        parts = []
+        for values in reversed(categories):
+            code, i = divmod(code, len(values))
+            parts.append(str(values[i]))
+        labels.append(' @ '.join(reversed(parts)))
+    return labels, codes.ravel()
+
+def aggregate(keys, values, size, agg='median', order_by=None):
+    """(aggregate[size], counts[size]) of values per integer key; NaN for empty keys
+
+    latest picks the value with the largest order_by (the newest run).
+    """
+    counts = np.bincount(keys, minlength=size)
+    if agg == 'count':
+        return counts.astype(float), counts
+    with np.errstate(invalid='ignore', divide='ignore'):
+        if agg == 'mean':
+            return np.bincount(keys, weights=values, minlength=size) / counts, counts
+    if agg not in AGGREGATES:
+        raise ValueError(f"unknown aggregate {agg!r} (one of {', '.join(AGGREGATES)})")
+    order = np.lexsort((order_by if agg == 'latest' else values, keys))
+    ordered = values[order]
+    starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+    last = max(len(ordered) - 1, 0)
+    if agg == 'min':
+        result = ordered[np.minimum(starts, last)] if len(ordered) else np.zeros(size)
+    elif agg in ('max', 'latest'):
+        result = ordered[np.maximum(starts + counts - 1, 0)] if len(ordered) else np.zeros(size)
+    else:
+        # Mean of the two middle values, as np.median
+        lower = np.minimum(starts + (counts - 1) // 2, last)
+        upper = np.minimum(starts + counts // 2, last)
+        result = (ordered[lower] + ordered[upper]) / 2 if len(ordered) else np.zeros(size)
+    return np.where(counts > 0, result, np.nan), counts
+
+def pivot(rows, field='latency_p99_ms', index=('runtime', 'connections'), columns=('endpoint',),
+          facet=(), agg='median'):
+    """Pivot of field over store rows: index x columns, one matrix per facet"""
+    missing = np.isnan(rows[field])
+    if missing.any():
+        rows = rows[~missing]
+    facets, facet_codes = encode(rows, facet)
+    row_labels, row_codes = encode(rows, index)
+    col_labels, col_codes = encode(rows, columns)
+    shape = (len(facets), len(row_labels), len(col_labels))
+    keys = (facet_codes * shape[1] + row_codes) * shape[2] + col_codes
+    values, counts = aggregate(keys, rows[field], math.prod(shape), agg,
+                               rows['run_time'].astype(np.int64))
+    return Pivot(field, agg, facets, row_labels, col_labels,
+                 values.reshape(shape), counts.reshape(shape))
+
+def select_facet(index):
+    """chart_engine select() of one facet of a Pivot"""
+    def select(table, inputs):
+        options = {'title': table.facets[index]} if len(table.facets) > 1 else {}
+        return {'rows': table.rows, 'cols': table.cols, 'matrix': table.values[index], 'options': options}
+    return select
+
+def heatmap_chart(table, filename='heatmap.png', facet_columns=2):
+    """Chart with one heatmap panel per facet of table, on one colour scale"""
+    n = len(table.facets)
+    grid_cols = min(n, facet_columns)
+    grid_rows = math.ceil(n / grid_cols)
+    present = table.values[~np.isnan(table.values)]
+    cells = len(table.rows) * len(table.cols)
+    options = {
+        'cmap': 'RdYlGn' if table.field in HIGHER_IS_BETTER else 'RdYlGn_r',
+        'vmin': float(present.min()) if len(present) else None,
+        'vmax': float(present.max()) if len(present) else None,
+        'fmt': '{:.0f}' if table.field == 'requests_per_sec' else '{:.1f}',
+        'colorbar': f"{table.field} ({table.agg})",
+        'tick_size': 6 if cells > 200 else None,
+        'label_size': 5 if cells > 100 else None,
+    }
+    panels = [Panel('heatmap', select_facet(i), options, (i // grid_cols, i % grid_cols))
+              for i in range(n)]
+    width = min(3 + 0.4 * len(table.cols), 14) * grid_cols
+    height = min(1.5 + 0.35 * len(table.rows), 10) * grid_rows
+    return Chart(filename, f"{table.field} heatmap", panels, (width, height), (grid_rows, grid_cols),
+                 title=f"{table.field} ({table.agg})")
+
+def write_csv(table, path):
+    """Wide CSV: one line per facet and row, one column per pivot column"""
+    with open(path, 'w') as f:
+        f.write(','.join(['facet', 'row'] + table.cols) + '\n')
+        for facet, matrix in zip(table.facets, table.values):
+            for label, values in zip(table.rows, matrix):
+                f.write(','.join([facet, label] + ['' if np.isnan(v) else f"{v:g}" for v in values.tolist()])
+                        + '\n')
+
+def _names(text):
+    return tuple(name for name in (text or '').split(',') if name)
+
+def main():
+    parser = argparse.ArgumentParser(description="Heatmaps of the wrk results store via vectorized pivots")
+    parser.add_argument('store_dir')
+    parser.add_argument('--rows', default='runtime,connections', help="dimensions, comma separated")
+    parser.add_argument('--cols', default='endpoint', help="dimensions, comma separated")
+    parser.add_argument('--facet', default='', help="one heatmap per value, e.g. date or runtime")
+    parser.add_argument('--field', default='latency_p99_ms', choices=METRIC_COLUMNS)
+    parser.add_argument('--agg', default='median', choices=AGGREGATES, help="over repeated runs")
+    parser.add_argument('--runtime', action='append', help="repeatable; default: all")
+    parser.add_argument('--last', type=int, dest='last_runs', help="most recent N runs")
+    parser.add_argument('--since', help="ISO date or time")
+    parser.add_argument('--until', help="ISO date or time")
+    parser.add_argument('--facet-columns', type=int, default=2)
+    parser.add_argument('--output', '-o', help="PNG path (default: print the shape only)")
+    parser.add_argument('--csv', help="also write the pivot as CSV")
+    args = parser.parse_args()
+    if args.last_runs is not None and args.last_runs < 0:
+        parser.error("--last must be 0 or more")
+
+    rows = ResultsStore(args.store_dir).query(since=args.since, until=args.until, last_runs=args.last_runs)
+    if args.runtime:
+        rows = rows[np.isin(rows['runtime'], args.runtime)]
+    if len(rows) == 0:
+        print("No matching rows in the store")
+        return 1
+
+    start = time.perf_counter()
+    try:
+        table = pivot(rows, args.field, _names(args.rows), _names(args.cols), _names(args.facet), args.agg)
+    except ValueError as e:
+        print(f"Error: {e}")
+        return 1
+    elapsed = time.perf_counter() - start
+    filled = int((table.counts > 0).sum())
+    print(f"{len(rows)} rows -> {len(table.facets)} x {len(table.rows)} x {len(table.cols)} cells "
+          f"({filled} with data) in {elapsed * 1000:.1f} ms")
+
+    if args.csv:
+        write_csv(table, args.csv)
+        print(f"Pivot saved to: {args.csv}")
+    if args.output:
+        pyplot(headless=True)
+        chart = heatmap_chart(table, os.path.basename(args.output), args.facet_columns)
+        start = time.perf_counter()
+        render(chart, table, os.path.dirname(os.path.abspath(args.output)))
+        print(f"Heatmap saved to: {args.output} ({time.perf_counter() - start:.1f}s)")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""Statistical regression detector over the wrk results store.
+
+The most recent run(s) are compared with a rolling baseline of the runs
+before them, per (runtime, endpoint, connections). A slowdown is reported
+only when a one-sided Mann-Whitney U test rejects "no change" and the
+bootstrap confidence interval of the relative median change lies entirely
+on the bad side of the minimum effect size. Both are computed for every
+group at once with NumPy.
+
+Exits 1 when a significant regression is found, so it can gate upgrades.
+
+Usage: python3 regression.py <store_dir> [--candidate-runs K] [--baseline-runs N]
+"""
+
+import argparse
+import json
+import math
+import sys
+from functools import lru_cache
+
+import numpy as np
+
+from results_store import ResultsStore
+
+# metric -> +1 when higher is worse, -1 when lower is worse
+METRIC_DIRECTIONS = {
+    'requests_per_sec': -1,
+    'latency_p99_ms': +1,
+    'latency_ms': +1,
+}
+
+def padded_groups(rows, field, run_times):
+    """(keys, values[G, n_max], counts[G]) of `field` for rows in run_times
+
+    One row per (runtime, endpoint, connections); missing samples are NaN.
+    """
+    rows = rows[np.isin(rows['run_time'], run_times) & ~np.isnan(rows[field])]
+    keys, inverse, counts = np.unique(rows[['runtime', 'endpoint', 'connections']],
+                                      return_inverse=True, return_counts=True)
+    values = np.full((len(keys), counts.max() if len(counts) else 0), np.nan)
+    order = np.argsort(inverse, kind='stable')
+    starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+    columns = np.arange(len(order)) - np.repeat(starts, counts)
+    values[inverse[order], columns] = rows[field][order]
+    return keys, values, counts
+
+def align(keys, values, counts, target_keys):
+    """Reorder padded groups to target_keys; absent groups get zero counts"""
+    lookup = {tuple(k): i for i, k in enumerate(keys.tolist())}
+    index = np.array([lookup.get(tuple(k), -1) for k in target_keys.tolist()], dtype=int)
+    present = index >= 0
+    out = np.full((len(target_keys), values.shape[1]), np.nan)
+    out[present] = values[index[present]]
+    out_counts = np.zeros(len(target_keys), dtype=int)
+    out_counts[present] = counts[index[present]]
+    return out, out_counts
+
+@lru_cache(maxsize=None)
+def _u_null_cdf(n1, n2):
+    """Exact CDF of the Mann-Whitney U statistic under H0 (no ties)"""
+    # counts[n1][n2][u]: arrangements of n1 + n2 items giving statistic u
+    @lru_cache(maxsize=None)
+    def freq(a, b):
+        if a == 0 or b == 0:
+            return (1,)
+        with_a = (0,) * b + freq(a - 1, b)  # largest item from sample 1 beats all b
+        without = freq(a, b - 1)
+        size = max(len(with_a), len(without))
+        return tuple((with_a[i] if i < len(with_a) else 0) + (without[i] if i < len(without) else 0)
+                     for i in range(size))
+    f = np.array(freq(n1, n2), dtype=float)
+    return np.cumsum(f) / f.sum()
+
+def mann_whitney_greater(x, nx, y, ny):
+    """One-sided p-values for "x tends to be greater than y", per group
+
+    x[G, kx] and y[G, ky] are NaN-padded; nx and ny give the valid counts.
+    Exact for small tie-free groups, normal approximation with tie and
+    continuity correction otherwise.
+    """
+    diff = x[:, :, None] - y[:, None, :]
+    valid = ~np.isnan(diff)
+    u = np.where(valid, (diff > 0) + 0.5 * (diff == 0), 0.0).sum(axis=(1, 2))
+    ties = (valid & (diff == 0)).any(axis=(1, 2))
+
+    n1 = nx.astype(float)
+    n2 = ny.astype(float)
+    n = n1 + n2
+    mean = n1 * n2 / 2
+
+    # Tie correction from the pooled sample
+    pooled = np.concatenate([x, y], axis=1)
+    tie_term = np.zeros(len(x))
+    for g in np.flatnonzero(ties):
+        _, t = np.unique(pooled[g][~np.isnan(pooled[g])], return_counts=True)
+        tie_term[g] = (t ** 3 - t).sum()
+    with np.errstate(invalid='ignore', divide='ignore'):
+        var = n1 * n2 / 12 * ((n + 1) - tie_term / (n * (n - 1)))
+        z = (u - mean - 0.5) / np.sqrt(var)
+    p = 0.5 * np.array([math.erfc(v / math.sqrt(2)) if np.isfinite(v) else 1.0 for v in z])
+
+    for g in np.flatnonzero(~ties & (nx > 0) & (ny > 0) & (nx <= 20) & (ny <= 20)):
+        cdf = _u_null_cdf(int(nx[g]), int(ny[g]))
+        k = int(round(u[g]))
+        p[g] = 1.0 - (cdf[k - 1] if k > 0 else 0.0)
+    return p
+
+def bootstrap_relative_change(candidate, nc, baseline, nb, n_boot=2000, confidence=0.95, seed=0):
+    """Bootstrap CI of median(candidate) / median(baseline) - 1, per group"""
+    rng = np.random.default_rng(seed)
+
+    def resampled_medians(values, counts):
+        groups, width = values.shape
+        picks = (rng.random((n_boot, groups, width)) * counts[None, :, None]).astype(int)
+        samples = np.take_along_axis(np.broadcast_to(values, (n_boot, groups, width)), picks, axis=2)
+        samples = np.where(np.arange(width)[None, None, :] < counts[None, :, None], samples, np.nan)
+        with np.errstate(all='ignore'):
+            return np.nanmedian(samples, axis=2)
+
+    with np.errstate(all='ignore'):
+        ratio = resampled_medians(candidate, nc) / resampled_medians(baseline, nb) - 1
+    alpha = (1 - confidence) / 2
+    return np.nanquantile(ratio, alpha, axis=0), np.nanquantile(ratio, 1 - alpha, axis=0)
+
+def detect_regressions(table, candidate_runs=3, baseline_runs=10, metrics=None,
+                       alpha=0.05, min_effect=0.05, n_boot=2000, seed=0):
+    """Significant slowdowns of the latest candidate_runs versus the runs before them"""
+    run_times = np.unique(table['run_time'][~np.isnat(table['run_time'])])
+    if len(run_times) < candidate_runs + 2:
+        return [], run_times[-candidate_runs:], run_times[:0]
+    candidate_times = run_times[-candidate_runs:]
+    baseline_times = run_times[:-candidate_runs][-baseline_runs:]
+
+    findings = []
+    for field, direction in (metrics or METRIC_DIRECTIONS).items():
+        keys, cand, nc = padded_groups(table, field, candidate_times)
+        base_keys, base, nb = padded_groups(table, field, baseline_times)
+        if len(keys) == 0 or len(base_keys) == 0:
+            continue
+        base, nb = align(base_keys, base, nb, keys)
+        testable = (nc > 0) & (nb >= 2)
+        if not testable.any():
+            continue
+        keys, cand, nc, base, nb = keys[testable], cand[testable], nc[testable], base[testable], nb[testable]
+
+        # Orient everything so that "greater" means "worse"
+        p = mann_whitney_greater(direction * cand, nc, direction * base, nb)
+        low, high = bootstrap_relative_change(cand, nc, base, nb, n_boot=n_boot, seed=seed)
+        with np.errstate(all='ignore'):
+            change = np.nanmedian(cand, axis=1) / np.nanmedian(base, axis=1) - 1
+        if direction > 0:
+            significant = (p < alpha) & (low > min_effect)
+        else:
+            significant = (p < alpha) & (high < -min_effect)
+
+        for i in np.flatnonzero(significant):
+            runtime, endpoint, connections = keys[i].tolist()
+            findings.append({
+                'runtime': runtime,
+                'endpoint': endpoint,
+                'connections': int(connections),
+                'metric': field,
+                'baseline_median': float(np.nanmedian(base[i])),
+                'candidate_median': float(np.nanmedian(cand[i])),
+                'relative_change': float(change[i]),
+                'ci_low': float(low[i]),
+                'ci_high': float(high[i]),
+                'p_value': float(p[i]),
+                'baseline_runs': int(nb[i]),
+                'candidate_runs': int(nc[i]),
+            })
+
+    findings.sort(key=lambda f: (f['runtime'], f['endpoint'], f['connections'], f['metric']))
+    return findings, candidate_times, baseline_times
+
+def main():
+    parser = argparse.ArgumentParser(description="Detect significant slowdowns against history")
+    parser.add_argument('store_dir')
+    parser.add_argument('--candidate-runs', type=int, default=3,
+                        help="latest runs under test (default: 3)")
+    parser.add_argument('--baseline-runs', type=int, default=10,
+                        help="rolling baseline size in runs (default: 10)")
+    parser.add_argument('--alpha', type=float, default=0.05)
+    parser.add_argument('--min-effect', type=float, default=0.05,
+                        help="smallest relative change worth reporting (default: 0.05)")
+    parser.add_argument('--bootstrap', type=int, default=2000)
+    parser.add_argument('--json', dest='json_path', help="also write the findings here")
+    args = parser.parse_args()
+
+    table = ResultsStore(args.store_dir).table
+    findings, candidate_times, baseline_times = detect_regressions(
+        table, args.candidate_runs, args.baseline_runs,
+        alpha=args.alpha, min_effect=args.min_effect, n_boot=args.bootstrap)
+
+    if len(baseline_times) == 0:
+        print(f"Not enough history: need more than {args.candidate_runs + 1} runs")
+        return 0
+
+    print(f"Candidate runs: {', '.join(str(t) for t in candidate_times)}")
+    print(f"Baseline: {len(baseline_times)} runs, {baseline_times[0]} .. {baseline_times[-1]}")
+    print()
+    if not findings:
+        print("No significant regressions.")
+    for f in findings:
+        print(f"REGRESSION {f['runtime']} {f['endpoint']} @ {f['connections']} conns: "
+              f"{f['metric']} {f['baseline_median']:.2f} -> {f['candidate_median']:.2f} "
+              f"({f['relative_change']:+.1%}, CI [{f['ci_low']:+.1%}, {f['ci_high']:+.1%}], "
+              f"p={f['p_value']:.4f})")
+
+    if args.json_path:
+        with open(args.json_path, 'w') as fh:
+            json.dump({'candidate_runs': [str(t) for t in candidate_times],
+                       'baseline_runs': [str(t) for t in baseline_times],
+                       'regressions': findings}, fh, indent=2)
+
+    return 1 if findings else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""Skip re-rendering charts whose inputs have not changed.
+
+A chart's key is the SHA-256 of the exact data slice it plots plus its
+code version: the source of the functions that draw it. A PNG is drawn
+again only when its key differs from the one recorded when it was last
+written, or when the file is gone. Scripts that write the same filename
+into one directory share the record, so the last writer wins and the
+other script re-renders on its next run.
+
+Layout:
+    <output_dir>/.render-cache.json     filename -> key
+
+Usage: python3 render_cache.py <output_dir> [...]   (list recorded charts)
+"""
+
+import hashlib
+import inspect
+import json
+import os
+import sys
+from collections.abc import Mapping
+
+from parse_cache import write_json_atomic
+
+CACHE_FILE = '.render-cache.json'
+
+def _plain(value):
+    # Read-only mappings, NumPy arrays and scalars as JSON types
+    if isinstance(value, Mapping):
+        return dict(value)
+    if hasattr(value, 'tolist'):
+        return value.tolist()
+    raise TypeError(f"cannot hash {type(value).__name__} in a chart data slice")
+
+def code_version(*functions):
+    """Digest of the source of the functions that draw a chart"""
+    digest = hashlib.sha256()
+    for function in functions:
+        try:
+            digest.update(inspect.getsource(function).encode())
+        except (OSError, TypeError):
+            digest.update(function.__qualname__.encode())
+    return digest.hexdigest()
+
+def chart_key(data_slice, version):
+    """Key of one chart: its data slice in canonical JSON plus the code version"""
+    canonical = json.dumps(data_slice, sort_keys=True, separators=(',', ':'), default=_plain)
+    return hashlib.sha256(f"{version}\0{canonical}".encode()).hexdigest()
+
+class RenderCache:
+    """Keys of the charts last rendered into one output directory"""
+
+    def __init__(self, output_dir, force=False):
+        self.output_dir = output_dir
+        self.path = os.path.join(output_dir, CACHE_FILE)
+        self.force = force
+        self.skipped = 0
+        self.rendered = 0
+        self._dirty = False
+        try:
+            with open(self.path) as f:
+                self._keys = json.load(f)
+        except (OSError, ValueError):
+            self._keys = {}
+
+    def fresh(self, filename, key):
+        """True when filename exists and was rendered from the same key"""
+        return (not self.force and self._keys.get(filename) == key
+                and os.path.exists(os.path.join(self.output_dir, filename)))
+
+    def record(self, filename, key):
+        """Note that filename was just rendered from key"""
+        self._keys[filename] = key
+        self.rendered += 1
+        self._dirty = True
+
+    def render(self, filename, key, draw):
+        """Run draw() unless filename is fresh; True when it was drawn"""
+        if self.fresh(filename, key):
+            self.skipped += 1
+            return False
+        draw()
+        self.record(filename, key)
+        return True
+
+    def save(self):
+        """Persist the keys if any chart was rendered"""
+        if self._dirty:
+            write_json_atomic(self.path, self._keys)
+            self._dirty = False
+
+def main():
+    if len(sys.argv) < 2:
+        print("Usage: python3 render_cache.py <output_dir> [...]")
+        return 1
+    for output_dir in sys.argv[1:]:
+        cache = RenderCache(output_dir)
+        print(f"{output_dir}: {len(cache._keys)} charts recorded")
+        for filename, key in sorted(cache._keys.items()):
+            state = 'ok' if cache.fresh(filename, key) else 'missing'
+            print(f"  {key[:12]}  {state:<7} {filename}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
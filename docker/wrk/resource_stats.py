@@ -0,0 +1,475 @@
+#!/usr/bin/env python3
+"""Container and host resource series lined up with the latency timeline.
+
+Resource samples come from either monitor:
+
+    container_stats.csv   docker stats strings ('12.3%', '123.4MiB / 2GiB',
+    system_stats.csv      '1.2kB / 3.4MB'). Units are split off numbers in
+                          the raw bytes with numpy, so read_csv's C parser
+                          reads every number; no Python code runs per row
+    resources.cgs         cgroup_sampler.py binary records, read with one
+                          np.frombuffer; CPU % comes from usage_usec deltas
+
+Each sample is assigned to the timeline cell it falls in with an as-of
+join by runtime: k6 windows or stages (k6_timeseries), or wrk cells, which
+start at the `Started:` line run-benchmark.sh writes before each wrk call.
+The cells then carry mean/max CPU and peak memory next to their latency,
+so every load stage shows swoole, php_fpm and frankenphp CPU and memory
+beside p95.
+
+Raw RPS favours whichever runtime burns the most cores (php-fpm runs 50
+children, swoole and frankenphp 4 workers), so each runtime x endpoint x
+concurrency cell (or k6 stage) is also costed: requests per CPU-second,
+RPS per resident MiB and network/disk bytes per request, ranked by CPU
+per request.
+
+Every time is joined in UTC. k6 stamps carry their zone offset, and the
+sampler header holds a unix time. monitor_resources.sh writes docker stats
+in the host's local time, which --tz names (default: this machine's zone),
+so run the join on the monitoring host or pass its zone. --clock-offset is
+only needed for clocks that disagree.
+
+Usage: python3 resource_stats.py <results_dir> [--k6 k6-results.json] [--script benchmark/k6-*.js]
+                                 [--wrk-timestamp TS] [--window 10] [--tz ZONE] [--clock-offset S]
+                                 [--csv windows.csv] [--summary RESOURCE_SUMMARY.md]
+"""
+
+import argparse
+import io
+import json
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+from dateutil.tz import tzlocal
+
+CONTAINER_STATS = 'container_stats.csv'
+SYSTEM_STATS = 'system_stats.csv'
+SAMPLER_FILE = 'resources.cgs'
+SAMPLER_MAGIC = b'CGS1\n'
+CONTAINER_SUFFIX = '_benchmark'
+HOST = 'host'
+
+# docker stats: memory in binary units, network and block IO in decimal ones
+UNITS = {
+    '': 1, 'B': 1,
+    'kB': 1e3, 'KB': 1e3, 'MB': 1e6, 'GB': 1e9, 'TB': 1e12,
+    'KiB': 2 ** 10, 'MiB': 2 ** 20, 'GiB': 2 ** 30, 'TiB': 2 ** 40,
+}
+_PAIR = r'^\s*([\d.]+)\s*([A-Za-z]*)\s*/\s*([\d.]+)\s*([A-Za-z]*)\s*$'
+# Byte lookup tables: is this byte a digit, does a unit start with it
+_DIGITS = np.zeros(256, dtype=bool)
+_DIGITS[list(b'0123456789')] = True
+_UNIT_STARTS = np.zeros(256, dtype=bool)
+_UNIT_STARTS[list(b'%BkKMGT')] = True
+# container_stats.csv once split_units() has run: a (value, unit) pair per number
+_SPLIT_COLUMNS = ['timestamp', 'container', 'cpu_percent', 'cpu_unit',
+                  'memory_bytes', 'memory_unit', 'memory_limit_bytes', 'memory_limit_unit',
+                  'net_rx_bytes', 'net_rx_unit', 'net_tx_bytes', 'net_tx_unit',
+                  'block_read_bytes', 'block_read_unit', 'block_write_bytes', 'block_write_unit']
+
+def runtime_of(name):
+    """Runtime key of a container or runtime name: php_fpm_benchmark, php-fpm -> php_fpm"""
+    name = name.strip().lstrip('/')
+    if name.endswith(CONTAINER_SUFFIX):
+        name = name[:-len(CONTAINER_SUFFIX)]
+    return name.replace('-', '_')
+
+def parse_pair(column):
+    """('used' bytes, 'total' bytes) Series out of docker stats 'A unit / B unit' strings"""
+    parts = column.astype(str).str.extract(_PAIR)
+    first = pd.to_numeric(parts[0], errors='coerce') * parts[1].map(UNITS)
+    second = pd.to_numeric(parts[2], errors='coerce') * parts[3].map(UNITS)
+    return first, second
+
+def parse_percent(column):
+    return pd.to_numeric(column.astype(str).str.rstrip('%').str.strip(), errors='coerce')
+
+def local_zone():
+    """IANA name of this machine's zone (TZ, /etc/localtime), else dateutil's tzlocal"""
+    name = os.environ.get('TZ', '').lstrip(':')
+    if not name and os.path.islink('/etc/localtime'):
+        name = os.path.realpath('/etc/localtime').partition('zoneinfo/')[2]
+    return name or tzlocal()
+
+def to_utc(times, tz=None):
+    """Naive UTC datetimes from naive wall-clock datetimes of zone tz (default: local)"""
+    local = times.dt.tz_localize(tz or local_zone(), ambiguous='NaT', nonexistent='NaT')
+    return local.dt.tz_convert('UTC').dt.tz_localize(None)
+
+def split_units(data):
+    """docker stats CSV bytes with ' / ' and every digit-unit boundary turned into a comma"""
+    buf = np.frombuffer(data.replace(b' / ', b','), dtype=np.uint8)
+    at = np.flatnonzero(_DIGITS[buf[:-1]] & _UNIT_STARTS[buf[1:]]) + 1
+    return np.insert(buf, at, ord(',')).tobytes()
+
+def load_container_stats(path, tz=None):
+    """Samples of monitor_resources.sh container_stats.csv, in bytes and percent; times in UTC"""
+    with open(path, 'rb') as f:
+        f.readline()
+        data = f.read()
+    try:
+        raw = pd.read_csv(io.BytesIO(split_units(data)), names=_SPLIT_COLUMNS, header=None,
+                          skipinitialspace=True, dtype={name: str for name in _SPLIT_COLUMNS[1::2]})
+    except pd.errors.ParserError:
+        raw = None
+    if (raw is not None and raw['cpu_unit'].eq('%').all()
+            and raw[_SPLIT_COLUMNS[5::2]].isin(UNITS.keys()).all().all()):
+        frame = raw[['container', 'cpu_percent']].copy()
+        frame.insert(0, 'time', to_utc(pd.to_datetime(raw['timestamp'], format='%Y-%m-%d %H:%M:%S',
+                                                      errors='coerce'), tz))
+        for value, unit in zip(_SPLIT_COLUMNS[4::2], _SPLIT_COLUMNS[5::2]):
+            frame[value] = pd.to_numeric(raw[value], errors='coerce') * raw[unit].map(UNITS)
+        return _with_runtime(frame)
+    # A value without a unit ('--' while a container starts) shifts the
+    # split columns; such files are parsed string by string instead
+    return _parse_container_stats(pd.read_csv(path, dtype=str, skipinitialspace=True), tz)
+
+def _with_runtime(frame):
+    # A handful of distinct names: strip and map each once
+    names = frame['container'].dropna().unique()
+    frame['container'] = frame['container'].map({name: name.strip() for name in names})
+    frame['runtime'] = frame['container'].map({name.strip(): runtime_of(name) for name in names})
+    return frame.dropna(subset=['time'])
+
+def _parse_container_stats(raw, tz=None):
+    frame = pd.DataFrame({
+        'time': to_utc(pd.to_datetime(raw['timestamp'], errors='coerce'), tz),
+        'container': raw['container'],
+        'cpu_percent': parse_percent(raw['cpu_percent']),
+    })
+    frame['memory_bytes'], frame['memory_limit_bytes'] = parse_pair(raw['memory_usage'])
+    frame['net_rx_bytes'], frame['net_tx_bytes'] = parse_pair(raw['network_io'])
+    frame['block_read_bytes'], frame['block_write_bytes'] = parse_pair(raw['block_io'])
+    return _with_runtime(frame)
+
+def load_system_stats(path, tz=None):
+    """Samples of monitor_resources.sh system_stats.csv (whole machine); times in UTC"""
+    raw = pd.read_csv(path, dtype=str, skipinitialspace=True)
+    mib = 2 ** 20
+    frame = pd.DataFrame({
+        'time': to_utc(pd.to_datetime(raw['timestamp'], errors='coerce'), tz),
+        'container': HOST,
+        # top's field can carry text ('12.5us,'); anything unparsable is NaN
+        'cpu_percent': pd.to_numeric(raw['cpu_percent'].str.extract(r'([\d.]+)')[0], errors='coerce'),
+        'memory_bytes': pd.to_numeric(raw['mem_used_mb'], errors='coerce') * mib,
+        'memory_limit_bytes': pd.to_numeric(raw['mem_total_mb'], errors='coerce') * mib,
+        'load_avg': pd.to_numeric(raw['load_avg'], errors='coerce'),
+    })
+    frame['runtime'] = HOST
+    return frame.dropna(subset=['time'])
+
+def load_sampler(path):
+    """Samples of a cgroup_sampler.py file, with CPU % from usage deltas"""
+    with open(path, 'rb') as f:
+        if f.readline() != SAMPLER_MAGIC:
+            raise ValueError(f"{path}: not a cgroup_sampler file")
+        header = json.loads(f.readline())
+        records = np.frombuffer(f.read(), dtype='<i8')
+    columns, sources = header['columns'], header['sources']
+    stride = 1 + len(columns) * len(sources)
+    records = records[:len(records) - len(records) % stride].reshape(-1, stride)
+    # start_unix is seconds since the epoch: UTC
+    start = np.datetime64(int(header['start_unix'] * 1e9), 'ns')
+    time = start + records[:, 0].astype('timedelta64[ns]')
+    elapsed_us = np.diff(records[:, 0]) / 1000
+
+    frames = []
+    for s, source in enumerate(sources):
+        block = records[:, 1 + s * len(columns):1 + (s + 1) * len(columns)].astype(float)
+        block[block < 0] = np.nan
+        values = dict(zip(columns, block.T))
+        with np.errstate(invalid='ignore', divide='ignore'):
+            cpu = np.concatenate([[np.nan], np.diff(values['cpu_usage_usec']) / elapsed_us * 100])
+        frames.append(pd.DataFrame({
+            'time': time, 'container': source, 'runtime': runtime_of(source), 'cpu_percent': cpu,
+            'memory_bytes': values['memory_current'], 'memory_limit_bytes': np.nan,
+            'net_rx_bytes': values['net_rx_bytes'], 'net_tx_bytes': values['net_tx_bytes'],
+            'block_read_bytes': values['io_rbytes'], 'block_write_bytes': values['io_wbytes'],
+            'cpu_throttled_usec': values['cpu_throttled_usec'], 'cpu_some_usec': values['cpu_some_usec'],
+        }))
+    return pd.concat(frames, ignore_index=True)
+
+def load_resources(results_dir, tz=None, clock_offset_s=0.0):
+    """Every resource sample found in results_dir, sorted by UTC time
+
+    tz is the zone monitor_resources.sh wrote its CSV timestamps in.
+    """
+    frames = []
+    sampler = os.path.join(results_dir, SAMPLER_FILE)
+    if os.path.exists(sampler):
+        frames.append(load_sampler(sampler))
+    for name, loader in ((CONTAINER_STATS, load_container_stats), (SYSTEM_STATS, load_system_stats)):
+        path = os.path.join(results_dir, name)
+        if os.path.exists(path):
+            frames.append(loader(path, tz))
+    if not frames:
+        return None
+    frame = pd.concat(frames, ignore_index=True)
+    frame['time'] = frame['time'].astype('datetime64[ns]') + pd.Timedelta(seconds=clock_offset_s)
+    return frame.sort_values('time', kind='stable').reset_index(drop=True)
+
+def k6_timeline(samples, rows, window_s=None):
+    """Timeline cells from k6_timeseries rows: window_series (window_s) or stage_series"""
+    origin = np.datetime64(samples.origin_ns, 'ns')
+    frame = pd.DataFrame({name: rows[name] for name in rows.dtype.names})
+    frame['runtime'] = frame['runtime'].map(runtime_of)
+    frame['time'] = origin + pd.to_timedelta(frame['start_s'], unit='s')
+    if window_s is not None:
+        span = np.full(len(frame), window_s)
+    else:
+        # A stage runs to the next one; the overrun bin to the last sample
+        starts = np.sort(frame['start_s'].unique())
+        ends = np.append(starts[1:], max(float(samples.time.max()), starts[-1]))
+        span = frame['start_s'].map(dict(zip(starts, ends))) - frame['start_s']
+    frame['end'] = frame['time'] + pd.to_timedelta(np.asarray(span, dtype=float), unit='s')
+    return frame
+
+def wrk_runtime(path):
+    """Runtime key of a <runtime>-benchmark-<ts>.txt file: php-fpm-benchmark-... -> php_fpm"""
+    return runtime_of(os.path.basename(path).split('-benchmark-')[0])
+
+def wrk_timeline(results_dir, timestamp):
+    """Timeline cells of one run-benchmark.sh run, from its `Started:` lines"""
+    from analyze import find_benchmark_files, iter_benchmark_records
+    cells = []
+    for path in find_benchmark_files(results_dir, [timestamp]):
+        # The whole file name prefix, so php-fpm matches the php_fpm_benchmark container
+        runtime = wrk_runtime(path)
+        for record in iter_benchmark_records(path):
+            if record.started is None:
+                continue
+            metrics = record.metrics.to_dict()
+            cells.append({'runtime': runtime, 'endpoint': record.endpoint,
+                          'connections': int(record.connections), 'time': record.started,
+                          'duration_s': metrics.get('duration_s'),
+                          'rps': metrics.get('requests_per_sec'),
+                          'p50_ms': metrics.get('latency_p50_ms'), 'p99_ms': metrics.get('latency_p99_ms')})
+    frame = pd.DataFrame(cells)
+    if frame.empty:
+        return frame
+    # run-benchmark.sh writes UTC with a Z; older logs without a zone are read as UTC too
+    frame['time'] = pd.to_datetime(frame['time'], utc=True, format='ISO8601').dt.tz_localize(None)
+    frame['end'] = frame['time'] + pd.to_timedelta(frame['duration_s'].fillna(0), unit='s')
+    return frame
+
+def join_resources(timeline, resources):
+    """timeline with the CPU and memory of the samples that fall in each cell
+
+    Each sample goes to the latest cell of its runtime starting at or
+    before it (merge_asof by runtime) and is kept when it is before that
+    cell's end. Host samples are joined to every runtime's cells.
+    """
+    cells = timeline[['time', 'end', 'runtime']].astype({'time': 'datetime64[ns]', 'end': 'datetime64[ns]'})
+    cells['cell'] = np.arange(len(cells))
+    cells = cells.sort_values('time', kind='stable')
+
+    def assign(samples):
+        joined = pd.merge_asof(samples, cells, on='time', by='runtime', direction='backward')
+        return joined[joined['time'] < joined['end']]
+
+    samples = assign(resources[resources['runtime'] != HOST])
+    samples = samples.assign(net_bytes=samples['net_rx_bytes'] + samples['net_tx_bytes'],
+                             block_bytes=samples['block_read_bytes'] + samples['block_write_bytes'])
+    own = samples.groupby('cell').agg(
+        cpu_mean=('cpu_percent', 'mean'), cpu_max=('cpu_percent', 'max'),
+        memory_mean_mb=('memory_bytes', 'mean'), memory_max_mb=('memory_bytes', 'max'),
+        resource_samples=('cpu_percent', 'size'),
+        first_time=('time', 'first'), last_time=('time', 'last'),
+        first_net=('net_bytes', 'first'), last_net=('net_bytes', 'last'),
+        first_block=('block_bytes', 'first'), last_block=('block_bytes', 'last'))
+    own[['memory_mean_mb', 'memory_max_mb']] /= 2 ** 20
+    # IO counters are cumulative: rate between the first and last sample of
+    # the cell; a negative delta is a restarted container
+    span = (own['last_time'] - own['first_time']).dt.total_seconds()
+    for name in ('net', 'block'):
+        delta = own[f'last_{name}'] - own[f'first_{name}']
+        own[f'{name}_bytes_per_s'] = (delta / span).where((span > 0) & (delta >= 0))
+    own = own.drop(columns=[c for c in own.columns if c.startswith(('first_', 'last_'))])
+    result = timeline.reset_index(drop=True).join(own)
+
+    host = resources[resources['runtime'] == HOST]
+    if len(host):
+        # The host is shared: its samples go to the cells of every runtime
+        shared = pd.concat([assign(host.assign(runtime=runtime)) for runtime in timeline['runtime'].unique()])
+        result = result.join(shared.groupby('cell').agg(host_cpu_mean=('cpu_percent', 'mean')))
+    return result
+
+def efficiency(joined):
+    """joined with throughput per unit of CPU, memory and IO
+
+    requests_per_cpu_s is requests per CPU-second (rps over the mean cores
+    in use) and cpu_ms_per_request its inverse, the cost per request.
+    rps_per_mib divides by the mean resident memory of the cell.
+    """
+    cores = joined['cpu_mean'] / 100
+    rps = joined['rps'].where(joined['rps'] > 0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return joined.assign(
+            requests_per_cpu_s=rps / cores.where(cores > 0),
+            cpu_ms_per_request=cores * 1000 / rps,
+            rps_per_mib=rps / joined['memory_mean_mb'].where(joined['memory_mean_mb'] > 0),
+            net_bytes_per_request=joined['net_bytes_per_s'] / rps,
+            block_bytes_per_request=joined['block_bytes_per_s'] / rps)
+
+def warn_unjoined(joined, keys):
+    """Print the cells that joined no resource sample; efficiency_table leaves them out"""
+    for row in joined[joined['resource_samples'].isna()].itertuples(index=False):
+        values = row._asdict()
+        print(f"Warning: no resource samples for {row.runtime} "
+              + ' '.join(f"{key}={_key_label(key, values[key])}" for key in keys) + f" at {row.time}")
+
+def efficiency_table(joined, keys):
+    """Efficiency rows per keys + runtime, cheapest CPU per request first in each group
+
+    cost_rank is 1 for the runtime with the lowest cpu_ms_per_request among
+    those sharing the same keys (endpoint and concurrency, or stage).
+    """
+    table = efficiency(joined)
+    table = table[table['cpu_mean'].notna()]
+    table = table.assign(cost_rank=table.groupby(keys, dropna=False)['cpu_ms_per_request'].rank(method='min'))
+    columns = keys + ['runtime', 'rps', 'cpu_mean', 'memory_mean_mb', 'requests_per_cpu_s',
+                      'cpu_ms_per_request', 'rps_per_mib', 'net_bytes_per_request',
+                      'block_bytes_per_request', 'cost_rank']
+    # The stage after the script (-1) goes last
+    table = table.sort_values(keys + ['cost_rank'], kind='stable',
+                              key=lambda c: c.where(c >= 0, np.inf) if c.name == 'stage' else c)
+    return table[columns].reset_index(drop=True)
+
+def print_efficiency(table, keys):
+    print(f"{' '.join(f'{key:>12}' for key in keys)} {'runtime':<12} {'rps':>8} {'cores':>6} "
+          f"{'req/cpu-s':>10} {'cpu ms/req':>10} {'rps/MiB':>8} {'net B/req':>10} {'disk B/req':>10} {'rank':>4}")
+    for row in table.itertuples(index=False):
+        values = row._asdict()
+        print(f"{' '.join(f'{_key_label(key, values[key]):>12}' for key in keys)} {row.runtime:<12} "
+              f"{row.rps:>8.1f} {row.cpu_mean / 100:>6.2f} {row.requests_per_cpu_s:>10.1f} "
+              f"{row.cpu_ms_per_request:>10.3f} {row.rps_per_mib:>8.2f} {row.net_bytes_per_request:>10.0f} "
+              f"{row.block_bytes_per_request:>10.1f} {row.cost_rank:>4.0f}")
+
+def _key_label(key, value):
+    if key == 'stage':
+        return 'after' if value < 0 else str(value + 1)
+    if isinstance(value, float):
+        return '' if np.isnan(value) else f"{value:.0f}"
+    return str(value)
+
+def stage_table(joined):
+    """Rows of (runtime, stage) with throughput, p95 and resources, in stage order"""
+    order = joined['stage'].where(joined['stage'] >= 0, len(joined))
+    table = joined.assign(_order=order).sort_values(['_order', 'runtime'], kind='stable')
+    return table[['runtime', 'stage', 'target_vus', 'rps', 'p95_ms', 'p99_ms', 'cpu_mean', 'cpu_max',
+                  'memory_max_mb', 'resource_samples']]
+
+def print_table(table):
+    print(f"{'runtime':<12} {'stage':>5} {'VUs':>5} {'rps':>8} {'p95':>8} {'p99':>8} "
+          f"{'cpu avg':>8} {'cpu max':>8} {'mem max':>9} {'n':>5}")
+    for row in table.itertuples(index=False):
+        stage = 'after' if row.stage < 0 else str(row.stage + 1)
+        vus = '' if np.isnan(row.target_vus) else f"{row.target_vus:.0f}"
+        print(f"{row.runtime:<12} {stage:>5} {vus:>5} {row.rps:>8.1f} {row.p95_ms:>6.1f}ms {row.p99_ms:>6.1f}ms "
+              f"{row.cpu_mean:>7.1f}% {row.cpu_max:>7.1f}% {row.memory_max_mb:>7.1f}Mi "
+              f"{0 if np.isnan(row.resource_samples) else int(row.resource_samples):>5}")
+
+_KEY_HEADERS = {'stage': 'Stage', 'target_vus': 'VUs', 'endpoint': 'Endpoint', 'connections': 'Conexões'}
+
+def write_summary(path, resources, source, table=None, efficiency=None, keys=()):
+    """RESOURCE_SUMMARY.md from the joined tables instead of by hand"""
+    lines = ['# Relatório de Recursos', '',
+             f"**Fonte:** {source}  ", f"**Amostras:** {len(resources)}  ",
+             f"**Período:** {resources['time'].min()} .. {resources['time'].max()}", '']
+    if table is not None:
+        lines += ['| Runtime | Stage | VUs | req/s | p95 (ms) | p99 (ms) | CPU média (%) | CPU máx (%) | Memória máx (MiB) |',
+                  '|---|---:|---:|---:|---:|---:|---:|---:|---:|']
+        for row in table.itertuples(index=False):
+            stage = 'após' if row.stage < 0 else str(row.stage + 1)
+            vus = '' if np.isnan(row.target_vus) else f"{row.target_vus:.0f}"
+            lines.append(f"| {row.runtime} | {stage} | {vus} | {row.rps:.1f} | {row.p95_ms:.1f} | {row.p99_ms:.1f} "
+                         f"| {row.cpu_mean:.1f} | {row.cpu_max:.1f} | {row.memory_max_mb:.1f} |")
+        lines.append('')
+    if efficiency is not None:
+        lines += ['## Eficiência', '',
+                  'Custo por requisição em vez de pico de vazão: req/s por CPU-segundo, req/s por MiB '
+                  'residente (média) e bytes de IO por requisição. Posição 1 = menor CPU por requisição.', '',
+                  '| ' + ' | '.join(_KEY_HEADERS.get(key, key) for key in keys)
+                  + ' | Runtime | req/s | Cores | req/CPU-s | CPU ms/req | req/s/MiB | Rede B/req | Disco B/req | Posição |',
+                  '|' + '---:|' * len(keys) + '---|' + '---:|' * 8]
+        for row in efficiency.itertuples(index=False):
+            values = row._asdict()
+            stage_keys = [_key_label(key, values[key]).replace('after', 'após') for key in keys]
+            lines.append('| ' + ' | '.join(stage_keys)
+                         + f" | {row.runtime} | {row.rps:.1f} | {row.cpu_mean / 100:.2f} "
+                         f"| {row.requests_per_cpu_s:.1f} | {row.cpu_ms_per_request:.3f} | {row.rps_per_mib:.2f} "
+                         f"| {row.net_bytes_per_request:.0f} | {row.block_bytes_per_request:.1f} "
+                         f"| {row.cost_rank:.0f} |")
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('\n'.join(lines) + '\n')
+
+def main():
+    parser = argparse.ArgumentParser(description="Join resource samples onto the k6 or wrk latency timeline")
+    parser.add_argument('results_dir')
+    parser.add_argument('--k6', help="k6 --out json samples (default: <results_dir>/k6-results.json)")
+    parser.add_argument('--script', help="k6 script whose stages the run followed")
+    parser.add_argument('--wrk-timestamp', help="join a run-benchmark.sh run instead of k6")
+    parser.add_argument('--window', type=float, default=10.0, help="k6 window length in seconds")
+    parser.add_argument('--tz', help="zone of the docker stats CSV timestamps (default: this machine's)")
+    parser.add_argument('--clock-offset', type=float, default=0.0,
+                        help="seconds to add to resource timestamps, for skewed clocks")
+    parser.add_argument('--csv', help="write the per-window (or per-cell) join here")
+    parser.add_argument('--summary', help="write a RESOURCE_SUMMARY.md with the per-stage table")
+    args = parser.parse_args()
+
+    resources = load_resources(args.results_dir, args.tz, args.clock_offset)
+    if resources is None:
+        print(f"No {SAMPLER_FILE}, {CONTAINER_STATS} or {SYSTEM_STATS} in {args.results_dir}")
+        return 1
+    print(f"{len(resources)} resource samples from {resources['container'].nunique()} sources, "
+          f"{resources['time'].min()} .. {resources['time'].max()}")
+
+    if args.wrk_timestamp:
+        timeline = wrk_timeline(args.results_dir, args.wrk_timestamp)
+        if timeline.empty:
+            print("No wrk cells with a Started: line")
+            return 1
+        joined = join_resources(timeline, resources)
+        warn_unjoined(joined, ['endpoint', 'connections'])
+        print(joined[['runtime', 'endpoint', 'connections', 'rps', 'p99_ms', 'cpu_mean', 'cpu_max',
+                      'memory_max_mb']].to_string(index=False, float_format=lambda v: f"{v:.1f}"))
+        keys = ['endpoint', 'connections']
+        table = efficiency_table(joined, keys)
+        print()
+        print_efficiency(table, keys)
+        if args.summary:
+            write_summary(args.summary, resources, f"wrk {args.wrk_timestamp}", efficiency=table, keys=keys)
+            print(f"\nSummary saved to: {args.summary}")
+    else:
+        from k6_timeseries import load_samples, stage_series, stages_from_script, window_series
+        samples = load_samples([args.k6 or os.path.join(args.results_dir, 'k6-results.json')])
+        if len(samples.time) == 0:
+            print("No http_req_duration samples found")
+            return 1
+        stages = stages_from_script(args.script) if args.script else []
+        joined = join_resources(k6_timeline(samples, window_series(samples, args.window, stages),
+                                            args.window), resources)
+        if stages:
+            by_stage = join_resources(k6_timeline(samples, stage_series(samples, stages)), resources)
+            warn_unjoined(by_stage, ['stage'])
+            table = stage_table(by_stage)
+            keys = ['stage', 'target_vus']
+            costs = efficiency_table(by_stage, keys)
+            print()
+            print_table(table)
+            print()
+            print_efficiency(costs, keys)
+            if args.summary:
+                write_summary(args.summary, resources, ', '.join(sorted(resources['container'].unique())),
+                              table, costs, keys)
+                print(f"\nSummary saved to: {args.summary}")
+
+    if args.csv:
+        joined.to_csv(args.csv, index=False)
+        print(f"Joined series saved to: {args.csv}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+"""Columnar store of wrk results across every analyzed run.
+
+One row per (runtime, endpoint, connections, timestamp) held in NumPy
+structured arrays on disk. Each append writes a new segment; loading
+concatenates the segments, drops rows superseded by a later re-analysis
+of the same run and sorts by the index key, so every query is a
+vectorized mask over contiguous columns.
+
+Usage: python3 results_store.py <store_dir> [--runtime R] [--endpoint E]
+                                [--connections N] [--last N] [--field F]
+"""
+
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+SCHEMA_VERSION = 1
+MAX_SEGMENTS = 16
+
+METRIC_COLUMNS = [
+    'requests_per_sec', 'latency_ms', 'latency_stdev_ms', 'latency_max_ms',
+    'latency_p50_ms', 'latency_p75_ms', 'latency_p90_ms', 'latency_p99_ms',
+    'transfer_mb_per_sec', 'total_requests', 'duration_s', 'read_mb',
+    'errors_connect', 'errors_read', 'errors_write', 'errors_timeout', 'non_2xx_3xx',
+]
+
+KEY_COLUMNS = ['runtime', 'endpoint', 'connections', 'run_time']
+
+DTYPE = np.dtype(
+    [('runtime', 'U16'), ('endpoint', 'U48'), ('connections', 'i4'),
+     ('run_time', 'datetime64[s]'), ('timestamp', 'U32')]
+    + [(name, 'f8') for name in METRIC_COLUMNS]
+)
+
+def normalize_endpoint(endpoint):
+    """'/api/database' and 'database' name the same endpoint"""
+    endpoint = endpoint.strip()
+    if endpoint.startswith('/api/'):
+        endpoint = endpoint[len('/api/'):]
+    return endpoint.strip('/') or '/'
+
+def parse_run_time(timestamp):
+    """datetime64 for a run-benchmark.sh YYYYmmdd_HHMMSS timestamp (NaT otherwise)"""
+    try:
+        return np.datetime64(f"{timestamp[0:4]}-{timestamp[4:6]}-{timestamp[6:8]}T"
+                             f"{timestamp[9:11]}:{timestamp[11:13]}:{timestamp[13:15]}", 's')
+    except ValueError:
+        return np.datetime64('NaT', 's')
+
+def _fit(name, value):
+    """value, or ValueError if it would be truncated to the width of DTYPE[name]"""
+    width = DTYPE[name].itemsize // np.dtype('U1').itemsize
+    if len(value) > width:
+        raise ValueError(f"{name} {value!r} is longer than the {width} characters "
+                         f"the results store keeps")
+    return value
+
+def rows_from_results(timestamp, results):
+    """Structured rows from analyze_benchmark_file() results of one run
+
+    Raises ValueError when a runtime, endpoint or timestamp does not fit its
+    column; truncating it could make two keys collide.
+    """
+    flat = []
+    for result in results:
+        for endpoint, by_connections in result['endpoints'].items():
+            for connections, metrics in by_connections.items():
+                flat.append((_fit('runtime', result['runtime']),
+                             _fit('endpoint', normalize_endpoint(endpoint)),
+                             int(connections), metrics))
+
+    rows = np.zeros(len(flat), dtype=DTYPE)
+    rows['run_time'] = parse_run_time(timestamp)
+    rows['timestamp'] = _fit('timestamp', timestamp)
+    for name in METRIC_COLUMNS:
+        rows[name] = np.nan
+    for i, (runtime, endpoint, connections, metrics) in enumerate(flat):
+        row = rows[i]
+        row['runtime'] = runtime
+        row['endpoint'] = endpoint
+        row['connections'] = connections
+        for name in METRIC_COLUMNS:
+            value = metrics.get(name)
+            if value is not None:
+                row[name] = value
+    return rows
+
+class ResultsStore:
+    """Append-only segments of structured rows, queried as one sorted table"""
+
+    def __init__(self, store_dir):
+        self.store_dir = store_dir
+        self._table = None
+
+    def _segments(self):
+        # A *.npy.tmp left by an interrupted write is not a segment
+        return sorted(glob.glob(os.path.join(self.store_dir, 'part-*.npy')))
+
+    def _write_segment(self, segments, rows):
+        """Durably write rows as the segment after the last of segments"""
+        number = int(os.path.basename(segments[-1])[5:-4]) + 1 if segments else 0
+        path = os.path.join(self.store_dir, f"part-{number:06d}.npy")
+        tmp = path + '.tmp'
+        with open(tmp, 'wb') as f:
+            np.save(f, rows)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+
+    def append(self, rows):
+        """Write rows as a new segment"""
+        if len(rows) == 0:
+            return
+        os.makedirs(self.store_dir, exist_ok=True)
+        with open(os.path.join(self.store_dir, 'meta.json'), 'w') as f:
+            json.dump({'schema_version': SCHEMA_VERSION, 'dtype': DTYPE.descr}, f)
+
+        segments = self._segments()
+        self._write_segment(segments, np.asarray(rows, dtype=DTYPE))
+        self._table = None
+
+        if len(segments) + 1 > MAX_SEGMENTS:
+            self.compact()
+
+    def append_results(self, timestamp, results):
+        """Append the per-runtime results of one analyzed run"""
+        self.append(rows_from_results(timestamp, results))
+
+    @property
+    def table(self):
+        """Every row, latest analysis of each key only, sorted by the index key"""
+        if self._table is None:
+            segments = [np.load(path, mmap_mode='r') for path in self._segments()]
+            if not segments:
+                table = np.zeros(0, dtype=DTYPE)
+            else:
+                table = self._index(np.concatenate(segments))
+            self._build_key_index(table)
+            self._table = table
+        return self._table
+
+    def _build_key_index(self, table):
+        # Dictionary-encode the key columns; because the table is sorted by
+        # (runtime, endpoint, connections, run_time) the composite code is
+        # sorted too and an exact key lookup is a binary search.
+        self._runtimes, runtime_codes = np.unique(table['runtime'], return_inverse=True)
+        self._endpoints, endpoint_codes = np.unique(table['endpoint'], return_inverse=True)
+        self._connections, connection_codes = np.unique(table['connections'], return_inverse=True)
+        self._codes = {'runtime': runtime_codes, 'endpoint': endpoint_codes,
+                       'connections': connection_codes}
+        self._key = ((runtime_codes.astype(np.int64) * len(self._endpoints) + endpoint_codes)
+                     * len(self._connections) + connection_codes)
+        self._run_time = np.ascontiguousarray(table['run_time'])
+
+    @staticmethod
+    def _code(categories, value):
+        i = np.searchsorted(categories, value)
+        return int(i) if i < len(categories) and categories[i] == value else None
+
+    @staticmethod
+    def _index(rows):
+        # Later segments win: dedupe on the reversed rows, then sort by the key
+        rows = rows[::-1]
+        _, first = np.unique(rows[['runtime', 'endpoint', 'connections', 'timestamp']],
+                             return_index=True)
+        rows = rows[first]
+        order = np.lexsort([rows[name] for name in reversed(KEY_COLUMNS)])
+        return rows[order]
+
+    def compact(self):
+        """Rewrite all segments as a single deduplicated, sorted segment"""
+        segments = self._segments()
+        if len(segments) <= 1:
+            return
+        table = self._index(np.concatenate([np.load(path) for path in segments]))
+        # The merged segment is in place before any old one goes; until then
+        # a crash leaves duplicates that loading dedupes, never a lost row
+        self._write_segment(segments, table)
+        for segment in segments:
+            os.unlink(segment)
+        self._build_key_index(table)
+        self._table = table
+
+    def query(self, runtime=None, endpoint=None, connections=None,
+              since=None, until=None, last_runs=None):
+        """Rows matching every given filter, sorted by the index key
+
+        last_runs keeps the most recent N runs (by run_time) among the rows
+        that match the other filters; 0 keeps none.
+        """
+        if last_runs is not None and last_runs < 0:
+            raise ValueError(f"last_runs must be 0 or more, not {last_runs}")
+        table = self.table
+        codes = {}
+        for name, categories, value in (
+                ('runtime', self._runtimes, runtime),
+                ('endpoint', self._endpoints, None if endpoint is None else normalize_endpoint(endpoint)),
+                ('connections', self._connections, None if connections is None else int(connections))):
+            if value is not None:
+                codes[name] = self._code(categories, value)
+                if codes[name] is None:
+                    return table[:0]
+
+        if len(codes) == 3:
+            key = ((codes['runtime'] * len(self._endpoints) + codes['endpoint'])
+                   * len(self._connections) + codes['connections'])
+            lo, hi = np.searchsorted(self._key, [key, key + 1])
+            index = np.arange(lo, hi)
+        else:
+            mask = np.ones(len(table), dtype=bool)
+            for name, code in codes.items():
+                mask &= self._codes[name] == code
+            index = np.flatnonzero(mask)
+
+        run_time = self._run_time[index]
+        if since is not None:
+            keep = run_time >= np.datetime64(since, 's')
+            index, run_time = index[keep], run_time[keep]
+        if until is not None:
+            keep = run_time <= np.datetime64(until, 's')
+            index, run_time = index[keep], run_time[keep]
+        if last_runs is not None and len(index):
+            runs = np.unique(run_time)
+            index = index[run_time >= runs[-last_runs:][0]] if last_runs else index[:0]
+        return table[index]
+
+def main():
+    parser = argparse.ArgumentParser(description="Query the columnar wrk results store")
+    parser.add_argument('store_dir')
+    parser.add_argument('--runtime')
+    parser.add_argument('--endpoint')
+    parser.add_argument('--connections', type=int)
+    parser.add_argument('--last', type=int, dest='last_runs', help="most recent N runs")
+    parser.add_argument('--field', default='latency_p99_ms', choices=METRIC_COLUMNS)
+    parser.add_argument('--compact', action='store_true', help="merge segments first")
+    args = parser.parse_args()
+    if args.last_runs is not None and args.last_runs < 0:
+        parser.error("--last must be 0 or more")
+
+    store = ResultsStore(args.store_dir)
+    if args.compact:
+        store.compact()
+    store.table
+
+    start = time.perf_counter()
+    rows = store.query(args.runtime, args.endpoint, args.connections, last_runs=args.last_runs)
+    elapsed = time.perf_counter() - start
+
+    for row in rows:
+        print(f"{row['timestamp']:<16} {row['runtime']:<12} {row['endpoint']:<16} "
+              f"{row['connections']:>5}  {args.field}={row[args.field]:.3f}")
+    values = rows[args.field]
+    values = values[~np.isnan(values)]
+    if len(values):
+        print(f"\n{len(rows)} rows of {len(store.table)}: {args.field} "
+              f"median={np.median(values):.3f} min={values.min():.3f} max={values.max():.3f}")
+    print(f"Query time: {elapsed * 1000:.2f} ms")
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -29,6 +29,7 @@ ENDPOINTS=(
 
 echo "Starting Laravel PHP Runtime Benchmark - $TIMESTAMP"
 echo "=============================================="
+echo "Live summary: python3 $BENCHMARK_DIR/analyze.py $RESULTS_DIR $TIMESTAMP --follow"
 
 # Create results directory
 mkdir -p "$RESULTS_DIR"
@@ -41,8 +42,11 @@ run_benchmark() {
     local output_file=$4
     
     echo "Testing $runtime - $endpoint with $connections connections..."
+    # Wall clock of the cell in UTC, to line it up with the resource samples
+    echo "Started: $(date -u '+%Y-%m-%dT%H:%M:%SZ')" >> "$output_file"
     
     wrk -t$THREADS -c$connections -d$DURATION --latency \
+        -s "$BENCHMARK_DIR/latency-histogram.lua" \
         "http://$runtime/api/$endpoint" \
         >> "$output_file" 2>&1
     
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""Universal Scalability Law fits of the wrk connection sweep.
+
+For each runtime x endpoint, throughput over the swept concurrency N is
+fitted to
+
+    X(N) = lambda * N / (1 + sigma * (N - 1) + kappa * N * (N - 1))
+
+where sigma is contention (serialisation) and kappa coherency (crosstalk)
+cost. The fit is a non-negative least squares on the linearised form
+N / X = (1 + sigma (N-1) + kappa N (N-1)) / lambda.
+
+From the model:
+  * peak concurrency N* = sqrt((1 - sigma) / kappa) and peak throughput X(N*)
+    (lambda / sigma as a ceiling when there is no coherency cost)
+  * latency R(N) = N / X(N) by Little's law for the closed wrk loop
+  * the latency knee, where Kleinrock's power X / R peaks: beyond it each
+    extra connection buys less throughput than it costs in latency
+
+Usage: python3 scalability.py <summary-<ts>.json> [...]
+"""
+
+import itertools
+import json
+import math
+import sys
+
+import numpy as np
+
+MIN_POINTS = 3
+# Coefficients below these are least-squares noise, not real costs
+SIGMA_EPSILON = 1e-9
+KAPPA_EPSILON = 1e-12
+
+def fit_usl(concurrency, throughput):
+    """(lambda, sigma, kappa, r2) for throughput measured at each concurrency"""
+    n = np.asarray(concurrency, dtype=float)
+    x = np.asarray(throughput, dtype=float)
+    design = np.column_stack([np.ones_like(n), n - 1, n * (n - 1)])
+    target = n / x
+
+    # NNLS over three columns: try every active set, keep the best feasible
+    best = None
+    for active in itertools.chain.from_iterable(
+            itertools.combinations(range(1, 3), k) for k in range(3)):
+        columns = [0, *active]
+        coef = np.zeros(3)
+        coef[columns], *_ = np.linalg.lstsq(design[:, columns], target, rcond=None)
+        if coef[0] <= 0 or (coef[1:] < 0).any():
+            continue
+        residual = ((design @ coef - target) ** 2).sum()
+        if best is None or residual < best[0]:
+            best = (residual, coef)
+    if best is None:
+        return None
+
+    a, b, c = best[1]
+    lam, sigma, kappa = 1 / a, b / a, c / a
+    sigma = 0.0 if sigma < SIGMA_EPSILON else float(sigma)
+    kappa = 0.0 if kappa < KAPPA_EPSILON else float(kappa)
+    predicted = usl_throughput(n, lam, sigma, kappa)
+    ss_res = ((x - predicted) ** 2).sum()
+    ss_tot = ((x - x.mean()) ** 2).sum()
+    r2 = 1 - ss_res / ss_tot if ss_tot > 0 else 1.0
+    return float(lam), sigma, kappa, float(r2)
+
+def usl_throughput(n, lam, sigma, kappa):
+    n = np.asarray(n, dtype=float)
+    return lam * n / (1 + sigma * (n - 1) + kappa * n * (n - 1))
+
+def peak_concurrency(sigma, kappa):
+    """N where USL throughput peaks (inf when there is no retrograde region)"""
+    if kappa <= 0 or sigma >= 1:
+        return math.inf
+    return math.sqrt((1 - sigma) / kappa)
+
+def peak_throughput(lam, sigma, kappa):
+    """X(N*), or the lambda / sigma ceiling approached when kappa is zero"""
+    n_peak = peak_concurrency(sigma, kappa)
+    if not math.isinf(n_peak):
+        return float(usl_throughput(n_peak, lam, sigma, kappa))
+    return lam / sigma if sigma > 0 else math.inf
+
+def latency_knee(sigma, kappa):
+    """N maximising power X/R; solves 3k N^2 + (s - k) N - (1 - s) = 0
+
+    Never below one connection: sigma >= 1 means the runtime is saturated
+    from the start.
+    """
+    if sigma >= 1:
+        return 1.0
+    if kappa > 0:
+        b = sigma - kappa
+        return max(1.0, (-b + math.sqrt(b * b + 12 * kappa * (1 - sigma))) / (6 * kappa))
+    if sigma > 0:
+        return max(1.0, (1 - sigma) / sigma)
+    return math.inf
+
+def _finite(value):
+    return None if math.isinf(value) else value
+
+def analyze_scalability(points, latencies=None):
+    """USL model summary for one runtime x endpoint
+
+    points: {concurrency: requests_per_sec}; latencies optionally
+    {concurrency: measured mean latency in ms} to compare with the model.
+    """
+    pairs = sorted((int(n), float(x)) for n, x in points.items() if x and x > 0)
+    if len({n for n, _ in pairs}) < MIN_POINTS:
+        return None
+    n, x = (np.array(v) for v in zip(*pairs))
+    fit = fit_usl(n, x)
+    if fit is None:
+        return None
+    lam, sigma, kappa, r2 = fit
+
+    n_peak = peak_concurrency(sigma, kappa)
+    n_knee = latency_knee(sigma, kappa)
+    result = {
+        'lambda_rps_per_connection': lam,
+        'sigma_contention': sigma,
+        'kappa_coherency': kappa,
+        'r2': r2,
+        'peak_concurrency': _finite(n_peak),
+        'peak_rps': _finite(peak_throughput(lam, sigma, kappa)),
+        'latency_knee_concurrency': _finite(n_knee),
+        'latency_at_knee_ms': (None if math.isinf(n_knee) else
+                               n_knee / float(usl_throughput(n_knee, lam, sigma, kappa)) * 1000),
+        'points': {str(int(c)): {'rps': float(v),
+                                 'model_rps': float(usl_throughput(c, lam, sigma, kappa)),
+                                 'model_latency_ms': float(c / usl_throughput(c, lam, sigma, kappa) * 1000)}
+                   for c, v in zip(n, x)},
+    }
+    for c, latency in (latencies or {}).items():
+        if str(int(c)) in result['points'] and latency is not None:
+            result['points'][str(int(c))]['latency_ms'] = latency
+    return result
+
+def summary_scalability(summary):
+    """{runtime: {endpoint: model}} for an analyze.py summary"""
+    models = {}
+    for runtime, result in summary['runtimes'].items():
+        for endpoint, by_connections in result['endpoints'].items():
+            points = {c: m.get('requests_per_sec') for c, m in by_connections.items()}
+            latencies = {c: m.get('latency_ms') for c, m in by_connections.items()}
+            model = analyze_scalability(points, latencies)
+            if model is not None:
+                models.setdefault(runtime, {})[endpoint] = model
+    return models
+
+def print_scalability(models):
+    print("\nScalability (USL fit):")
+    print("======================")
+    for runtime in sorted(models):
+        for endpoint, m in sorted(models[runtime].items()):
+            if m['peak_rps'] is None:
+                peak = "unbounded"
+            elif m['peak_concurrency'] is None:
+                peak = f"ceiling {m['peak_rps']:.0f} rps"
+            else:
+                peak = f"{m['peak_rps']:.0f} rps @ N={m['peak_concurrency']:.0f}"
+            knee = m['latency_knee_concurrency']
+            knee = "none" if knee is None else f"N={knee:.0f}"
+            print(f"{runtime:<12} {endpoint:<14} sigma={m['sigma_contention']:.4f} "
+                  f"kappa={m['kappa_coherency']:.2e} r2={m['r2']:.3f}  peak={peak}  knee={knee}")
+
+def main():
+    if len(sys.argv) < 2:
+        print("Usage: python3 scalability.py <summary-<ts>.json> [...]")
+        return 1
+    for path in sys.argv[1:]:
+        with open(path) as f:
+            summary = json.load(f)
+        print(f"{path}:")
+        print_scalability(summary.get('scalability') or summary_scalability(summary))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
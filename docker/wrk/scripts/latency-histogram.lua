@@ -0,0 +1,63 @@
+-- wrk done() hook: dump the full latency histogram after each run.
+--
+-- wrk only prints a few fixed percentiles; this writes every non-empty
+-- bucket (value in microseconds : count) on one line so analyze.py can
+-- keep a mergeable HDR histogram per run (see hdr_histogram.py).
+--
+-- wrk's latency(i) and latency:percentile(p) both scan the histogram from
+-- its minimum on every call, so walking latency(i) over every bucket is
+-- quadratic in the number of distinct values. Up to one call per step of
+-- the percentile grid below, buckets are dumped exactly; past that the
+-- histogram is sampled at the grid (1% steps, ten times finer for each
+-- nine of the tail) and each step counts its share of summary.requests.
+--
+-- Usage: wrk --latency -s latency-histogram.lua http://host/path
+
+local function percentile_grid()
+   local grid = {}
+   for p = 1, 90 do
+      grid[#grid + 1] = p
+   end
+   -- 90-99, 99-99.9, 99.9-99.99 and 99.99-99.999 in 90 steps each
+   local base, step = 90, 0.1
+   for _ = 1, 4 do
+      for k = 1, 90 do
+         grid[#grid + 1] = base + k * step
+      end
+      base, step = base + 90 * step, step / 10
+   end
+   grid[#grid + 1] = 100
+   return grid
+end
+
+local GRID = percentile_grid()
+
+done = function(summary, latency, requests)
+   local buckets = {}
+   local distinct = #latency
+   if distinct <= #GRID then
+      for i = 1, distinct do
+         local value, count = latency(i)
+         buckets[#buckets + 1] = string.format("%d:%d", value, count)
+      end
+   else
+      -- Requests ranked in (below, rank] get the value at p; equal values merge
+      local value, count, below = nil, 0, 0
+      for _, p in ipairs(GRID) do
+         local rank = math.floor(p / 100 * summary.requests + 0.5)
+         local at = latency:percentile(p)
+         if at ~= value then
+            if count > 0 then
+               buckets[#buckets + 1] = string.format("%d:%d", value, count)
+            end
+            value, count = at, 0
+         end
+         count = count + rank - below
+         below = rank
+      end
+      if count > 0 then
+         buckets[#buckets + 1] = string.format("%d:%d", value, count)
+      end
+   end
+   io.write("Latency Histogram (us): ", table.concat(buckets, ","), "\n")
+end
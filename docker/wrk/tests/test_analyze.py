@@ -0,0 +1,38 @@
+from analyze import analyze_benchmark_file, analyze_files, open_cache
+from parse_cache import ParseCache
+
+BLOCK = """Connections: {connections}
+Running 30s test @ http://swoole:8000/api/health
+  12 threads and {connections} connections
+  {requests} requests in 30.01s, 1.00MB read
+Requests/sec:   {rps}
+Transfer/sec:      1.00MB
+Latency Histogram (us): {histogram}
+---
+
+"""
+
+def write_log(tmp_path):
+    path = tmp_path / 'swoole-benchmark-20250101_000000.txt'
+    path.write_text("Laravel PHP Runtime Benchmark - swoole\nTimestamp: 20250101_000000\n\n"
+                    "Endpoint: health\n-------------------\n"
+                    + BLOCK.format(connections=100, requests=0, rps='0.00', histogram='')
+                    + BLOCK.format(connections=200, requests=2, rps='0.07', histogram='900:1,1100:1'))
+    return str(path)
+
+def test_empty_histograms_are_dropped(tmp_path):
+    result = analyze_benchmark_file(write_log(tmp_path))
+    assert set(result['endpoints']['health']) == {'100', '200'}
+    assert set(result['histograms']['health']) == {'200'}
+
+def test_cached_parse_matches_a_fresh_one(tmp_path):
+    path = write_log(tmp_path)
+    cache_dir = str(tmp_path / 'cache')
+    # A result cached by the parser version before empty histograms were dropped
+    ParseCache(cache_dir, 'wrk-3').put(path, {'runtime': 'swoole', 'endpoints': {},
+                                              'histograms': {'health': {'100': ''}}})
+    first = analyze_files([path], cache=open_cache(str(tmp_path), cache_dir))
+    cache = open_cache(str(tmp_path), cache_dir)
+    second = analyze_files([path], cache=cache)
+    assert cache.hits == 1
+    assert second == first == [analyze_benchmark_file(path)]
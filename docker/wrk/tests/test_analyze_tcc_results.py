@@ -0,0 +1,56 @@
+import json
+import os
+import shutil
+import sys
+
+import pytest
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                           '..', '..', '..', 'results', 'bateria_1_20250930_225457')
+sys.path.insert(0, RESULTS_DIR)
+
+import analyze_tcc_results
+from chart_engine import pyplot
+
+def k6_summary(tagged):
+    """Minimal --summary-export with http_reqs submetrics for the given tags"""
+    metrics = {
+        'http_req_duration': {'values': {'avg': 10.0, 'p(95)': 20.0, 'max': 30.0}},
+        'http_reqs': {'values': {'count': sum(tagged.values()), 'rate': 50.0}},
+        'data_received': {'values': {'count': 1048576}},
+        'data_sent': {'values': {'count': 1048576}},
+    }
+    for name, count in tagged.items():
+        metrics[f'http_reqs{{{name}}}'] = {'values': {'count': count}}
+        metrics[f'http_req_duration{{{name}}}'] = {'values': {'avg': 10.0}}
+    return {'metrics': metrics, 'state': {'testRunDurationMs': 60000}}
+
+@pytest.fixture
+def untagged_in_csvs(tmp_path):
+    for name in ('test_scenarios.csv', 'endpoint_analysis.csv', 'runtime_comparison.csv'):
+        shutil.copy(os.path.join(RESULTS_DIR, name), tmp_path)
+    (tmp_path / 'k6-summary.json').write_text(json.dumps(k6_summary({
+        'test_type:light_load': 100, 'test_type:soak_test': 50,
+        'endpoint:/api/': 100, 'endpoint:/api/unknown': 50})))
+    return str(tmp_path)
+
+def test_tags_missing_from_the_csvs_get_default_fields(untagged_in_csvs):
+    data = analyze_tcc_results.load_benchmark_data(untagged_in_csvs)
+    soak = data['scenarios'][-1]
+    assert (soak['name'], soak['vus'], soak['duration_min'], soak['requests']) == ('soak_test', 0, 0, 50)
+    unknown = data['endpoints'][-1]
+    assert (unknown['path'], unknown['category'], unknown['weight'], unknown['requests']) == \
+        ('/api/unknown', 'outros', 0, 50)
+    assert data['scenarios'][0]['requests'] == 100
+    assert data['endpoints'][0]['requests'] == 100
+
+def test_charts_draw_tags_missing_from_the_csvs(untagged_in_csvs, tmp_path, monkeypatch):
+    # seaborn only sets the palette; the charts themselves are plain matplotlib
+    monkeypatch.setattr(analyze_tcc_results, '_pyplot', lambda: pyplot(headless=True))
+    data = analyze_tcc_results.load_benchmark_data(untagged_in_csvs)
+    output_dir = str(tmp_path / 'charts')
+    os.makedirs(output_dir)
+    for filename, _, create, data_slice in analyze_tcc_results.CHARTS:
+        data_slice(data)
+        create(data, output_dir)
+        assert os.path.exists(os.path.join(output_dir, filename))
@@ -0,0 +1,16 @@
+from hdr_histogram import WRK_HISTOGRAM_PREFIX, LatencyHistogram, omission_report
+
+def test_omission_report_of_empty_histogram():
+    histogram = LatencyHistogram.from_wrk_line(WRK_HISTOGRAM_PREFIX)
+    report = omission_report(histogram)
+    assert report['requests'] == 0
+    assert report['backfilled'] == 0
+    assert set(report['raw'].values()) == {None}
+    assert set(report['corrected'].values()) == {None}
+
+def test_omission_report_in_ms():
+    histogram = LatencyHistogram.from_wrk_line(WRK_HISTOGRAM_PREFIX + '1000:99,50000:1')
+    report = omission_report(histogram, expected_interval_us=1000)
+    assert report['raw']['p50'] == 1.0
+    assert report['backfilled'] == 49
+    assert report['corrected']['p99.9'] > report['raw']['p99']
@@ -0,0 +1,38 @@
+import json
+
+import numpy as np
+
+from k6_timeseries import _to_ns, load_samples
+
+def test_stamps_are_converted_to_utc():
+    stamps = _to_ns(['2025-10-01T08:51:26.5-03:00', '2025-10-01T11:51:26.5Z', '2025-10-01T17:21:26.5+05:30'])
+    assert set(stamps.tolist()) == {int(np.datetime64('2025-10-01T11:51:26.5', 'ns').astype(np.int64))}
+
+def test_stamps_outside_the_fixed_layout_are_parsed_too():
+    stamps = ['2025-10-01T11:51:26.123456789Z', '2025-10-01T11:51:26Z', '2025-10-01T08:51:26-03:00',
+              '2025-10-01 11:51:26Z', '2025-10-01T11:51Z', '2024-02-29T00:00:00.5+00:00']
+    expected = np.array(['2025-10-01T11:51:26.123456789', '2025-10-01T11:51:26', '2025-10-01T11:51:26',
+                         '2025-10-01T11:51:26', '2025-10-01T11:51', '2024-02-29T00:00:00.5'],
+                        dtype='datetime64[ns]').astype(np.int64)
+    np.testing.assert_array_equal(_to_ns(stamps), expected)
+
+def test_load_samples_reads_points_with_and_without_escapes(tmp_path):
+    lines = [
+        {'type': 'Metric', 'data': {'name': 'http_req_duration'}, 'metric': 'http_req_duration'},
+        {'metric': 'http_req_duration', 'type': 'Point',
+         'data': {'time': '2025-10-01T11:51:26Z', 'value': 12.5, 'tags': {'runtime': 'swoole'}}},
+        {'type': 'Point', 'metric': 'http_req_duration',
+         'data': {'time': '2025-10-01T08:51:27-03:00', 'value': 3, 'tags': {'name': 'a"b', 'runtime': 'php_fpm'}}},
+        {'metric': 'http_req_failed', 'type': 'Point',
+         'data': {'time': '2025-10-01T11:51:28Z', 'value': 1, 'tags': None}},
+        {'metric': 'http_reqs', 'type': 'Point',
+         'data': {'time': '2025-10-01T11:51:28Z', 'value': 1, 'tags': {'runtime': 'swoole'}}},
+    ]
+    path = tmp_path / 'k6.json'
+    path.write_text(''.join(json.dumps(line, separators=(',', ':')) + '\n' for line in lines))
+    samples = load_samples([str(path)])
+    assert samples.labels[samples.group].tolist() == ['swoole', 'php_fpm']
+    assert samples.time.tolist() == [0.0, 1.0]
+    assert samples.duration_ms.tolist() == [12.5, 3.0]
+    assert samples.failed_time.tolist() == [2.0]
+    assert samples.labels[samples.failed_group].tolist() == ['-']
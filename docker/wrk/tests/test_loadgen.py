@@ -0,0 +1,39 @@
+import asyncio
+
+from hdr_histogram import LatencyHistogram
+from loadgen import MixEntry, Target, generate, run, serve_stub
+
+MIX = [MixEntry('/api/health', 'static', 1.0)]
+
+async def against_stub(rate, duration_s, delay_s=0.0, connections=8):
+    """generate() against serve_stub on an ephemeral port"""
+    port = asyncio.get_running_loop().create_future()
+    server = asyncio.ensure_future(serve_stub(0, delay_s, port.set_result))
+    try:
+        targets = [Target('stub', '127.0.0.1', await port)]
+        return await generate(targets, MIX, rate, duration_s, connections=connections, seed=0, drain_s=5.0)
+    finally:
+        server.cancel()
+
+def test_every_scheduled_request_completes():
+    (stats, sent, elapsed), _ = run(against_stub(200, 0.5), 'asyncio')
+    key = ('stub', '/api/health')
+    assert sent == 100
+    assert stats.latency[key].total == 100
+    assert stats.statuses[key] == {200: 100}
+    assert stats.errors == {}
+    # Latency counts from the scheduled arrival, so it includes the service time
+    assert stats.lag.total == sent
+    assert stats.latency[key].percentile(50) >= stats.service[key].percentile(50)
+
+def test_open_loop_latency_includes_queueing_behind_a_slow_server():
+    # One connection to a 20 ms server serves 50 req/s; 200 req/s are offered
+    (stats, sent, elapsed), _ = run(against_stub(200, 0.25, delay_s=0.02, connections=1), 'asyncio')
+    latency = LatencyHistogram.merged(stats.latency.values())
+    service = LatencyHistogram.merged(stats.service.values())
+    assert latency.total == sent == 50
+    # A closed loop would only see the service time of each request...
+    assert service.percentile(99) < 100_000
+    # ...the open loop also sees the wait for the connection, up to ~0.75 s
+    assert latency.percentile(99) > 500_000
+    assert latency.total / elapsed < 100
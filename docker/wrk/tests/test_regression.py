@@ -0,0 +1,78 @@
+import math
+from itertools import combinations
+
+import numpy as np
+import pytest
+
+from regression import _u_null_cdf, bootstrap_relative_change, mann_whitney_greater
+
+def one_group(x, y):
+    return (np.array([x], dtype=float), np.array([len(x)]),
+            np.array([y], dtype=float), np.array([len(y)]))
+
+def enumerated_p(x, y):
+    """P(U >= observed) over every way to split the pooled ranks"""
+    pooled = sorted(x + y)
+    def u(sample):
+        return sum(a > b for a in sample for b in pooled if b not in sample)
+    observed = u(x)
+    splits = [u(list(c)) for c in combinations(pooled, len(x))]
+    return sum(s >= observed for s in splits) / len(splits)
+
+def normal_p(x, y):
+    """Normal approximation with tie and continuity correction, by hand"""
+    n1, n2 = len(x), len(y)
+    u = sum((a > b) + 0.5 * (a == b) for a in x for b in y)
+    _, t = np.unique(x + y, return_counts=True)
+    n = n1 + n2
+    var = n1 * n2 / 12 * ((n + 1) - (t ** 3 - t).sum() / (n * (n - 1)))
+    return 0.5 * math.erfc((u - n1 * n2 / 2 - 0.5) / math.sqrt(var) / math.sqrt(2))
+
+@pytest.mark.parametrize('x, y', [
+    ([3.0, 5.0, 9.0], [1.0, 2.0, 4.0, 6.0]),
+    ([10.0, 11.0, 12.0, 13.0, 14.0], [1.0, 2.0]),
+    ([1.5, 2.5, 7.0, 8.0], [1.0, 3.0, 4.0, 5.0]),
+    ([1.0], [2.0, 3.0]),
+])
+def test_exact_p_value_matches_enumeration(x, y):
+    assert mann_whitney_greater(*one_group(x, y))[0] == pytest.approx(enumerated_p(x, y))
+
+def test_exact_up_to_20_then_normal():
+    rng = np.random.default_rng(1)
+    for n in (20, 21):
+        x = list(rng.normal(1.0, 1.0, n))
+        y = list(rng.normal(0.0, 1.0, n))
+        p = mann_whitney_greater(*one_group(x, y))[0]
+        u = sum(a > b for a in x for b in y)
+        if n == 20:
+            assert p == pytest.approx(1.0 - _u_null_cdf(n, n)[u - 1])
+            assert p != pytest.approx(normal_p(x, y), rel=1e-6)
+        else:
+            assert p == pytest.approx(normal_p(x, y))
+
+def test_tied_samples_use_the_tie_corrected_normal():
+    x = [3.0, 3.0, 4.0, 5.0, 5.0]
+    y = [1.0, 2.0, 3.0, 3.0]
+    assert mann_whitney_greater(*one_group(x, y))[0] == pytest.approx(normal_p(x, y))
+
+def test_groups_are_independent():
+    x, nx, y, ny = one_group([3.0, 5.0, 9.0], [1.0, 2.0, 4.0, 6.0])
+    padded = np.full((1, 4), np.nan)
+    padded[0, :3] = x[0]
+    p = mann_whitney_greater(np.vstack([padded, y]), np.array([3, 4]),
+                             np.vstack([y, padded]), np.array([4, 3]))
+    assert p[0] == pytest.approx(enumerated_p([3.0, 5.0, 9.0], [1.0, 2.0, 4.0, 6.0]))
+    assert p[1] == pytest.approx(enumerated_p([1.0, 2.0, 4.0, 6.0], [3.0, 5.0, 9.0]))
+
+def test_bootstrap_ci_covers_the_true_change():
+    rng = np.random.default_rng(7)
+    groups, n = 200, 30
+    baseline = rng.lognormal(0.0, 0.3, (groups, n))
+    candidate = 1.2 * rng.lognormal(0.0, 0.3, (groups, n))
+    counts = np.full(groups, n)
+    low, high = bootstrap_relative_change(candidate, counts, baseline, counts, n_boot=1000, seed=3)
+    coverage = ((low <= 0.2) & (0.2 <= high)).mean()
+    assert 0.85 <= coverage <= 1.0
+    again = bootstrap_relative_change(candidate, counts, baseline, counts, n_boot=1000, seed=3)
+    np.testing.assert_array_equal(low, again[0])
+    np.testing.assert_array_equal(high, again[1])
@@ -0,0 +1,60 @@
+import pandas as pd
+
+from resource_stats import efficiency_table, join_resources, load_container_stats, load_resources, wrk_timeline
+
+def test_docker_stats_local_time_becomes_utc(tmp_path):
+    path = tmp_path / 'container_stats.csv'
+    path.write_text("timestamp,container,cpu_percent,memory_usage,network_io,block_io\n"
+                    "2025-10-01 08:51:26,swoole_benchmark,12.50%,1.5MiB / 2GiB,1kB / 2MB,0B / 3kB\n")
+    frame = load_container_stats(str(path), tz='America/Sao_Paulo')
+    assert frame['time'].iloc[0] == pd.Timestamp('2025-10-01 11:51:26')
+    assert frame['memory_bytes'].iloc[0] == 1.5 * 2 ** 20
+    assert frame['runtime'].iloc[0] == 'swoole'
+
+WRK_LOG = """Laravel PHP Runtime Benchmark - {runtime}
+Timestamp: 20251001_115100
+
+Endpoint: health
+-------------------
+Connections: 100
+Started: 2025-10-01T11:51:20Z
+Running 30s test @ http://{runtime}:8000/api/health
+  12 threads and 100 connections
+  30000 requests in 30.00s, 1.00MB read
+Requests/sec:   1000.00
+Transfer/sec:      1.00MB
+---
+
+"""
+
+def write_run(tmp_path, runtimes):
+    """wrk logs and docker stats (local time, 2 samples per cell) for one run"""
+    stats = ["timestamp,container,cpu_percent,memory_usage,network_io,block_io"]
+    for i, runtime in enumerate(runtimes):
+        (tmp_path / f'{runtime}-benchmark-20251001_115100.txt').write_text(WRK_LOG.format(runtime=runtime))
+        container = runtime.replace('-', '_') + '_benchmark'
+        for second in ('26', '36'):
+            stats.append(f"2025-10-01 08:51:{second},{container},{50 * (i + 1)}.00%,"
+                         f"{64 * (i + 1)}MiB / 2GiB,1kB / 2kB,0B / 0B")
+    (tmp_path / 'container_stats.csv').write_text('\n'.join(stats) + '\n')
+
+def test_php_fpm_wrk_cells_join_their_container(tmp_path):
+    write_run(tmp_path, ['php-fpm', 'swoole'])
+    timeline = wrk_timeline(str(tmp_path), '20251001_115100')
+    assert sorted(timeline['runtime']) == ['php_fpm', 'swoole']
+    resources = load_resources(str(tmp_path), tz='America/Sao_Paulo')
+    joined = join_resources(timeline, resources).set_index('runtime')
+    assert joined.loc['php_fpm', 'resource_samples'] == 2
+    assert joined.loc['php_fpm', 'cpu_mean'] == 50.0
+    assert joined.loc['swoole', 'cpu_mean'] == 100.0
+
+def test_efficiency_table_costs_every_runtime(tmp_path):
+    write_run(tmp_path, ['php-fpm', 'swoole', 'frankenphp'])
+    joined = join_resources(wrk_timeline(str(tmp_path), '20251001_115100'),
+                            load_resources(str(tmp_path), tz='America/Sao_Paulo'))
+    table = efficiency_table(joined, ['endpoint', 'connections']).set_index('runtime')
+    assert sorted(table.index) == ['frankenphp', 'php_fpm', 'swoole']
+    # Same 1000 req/s on 0.5, 1 and 1.5 cores: php-fpm is the cheapest
+    assert table.loc['php_fpm', 'requests_per_cpu_s'] == 2000.0
+    assert table.loc['php_fpm', 'cost_rank'] == 1
+    assert table.loc['frankenphp', 'cost_rank'] == 3
@@ -0,0 +1,71 @@
+import os
+
+import pytest
+
+from results_store import ResultsStore, rows_from_results
+
+
+def _results(runtime, endpoint):
+    return [{'runtime': runtime,
+             'endpoints': {endpoint: {'10': {'requests_per_sec': 100.0}}}}]
+
+
+def test_rows_keep_names_that_fit(tmp_path):
+    endpoint = '/api/' + 'e' * 48
+    store = ResultsStore(str(tmp_path))
+    store.append_results('20250930_225457', _results('r' * 16, endpoint))
+    rows = store.query(runtime='r' * 16, endpoint=endpoint)
+    assert len(rows) == 1
+    assert rows[0]['endpoint'] == 'e' * 48
+
+
+@pytest.mark.parametrize('runtime, endpoint', [
+    ('r' * 17, 'database'),
+    ('swoole', '/api/' + 'e' * 49),
+])
+def test_rows_reject_names_longer_than_their_column(runtime, endpoint):
+    with pytest.raises(ValueError):
+        rows_from_results('20250930_225457', _results(runtime, endpoint))
+
+
+def _store_with_runs(tmp_path, count):
+    store = ResultsStore(str(tmp_path))
+    for run in range(count):
+        store.append_results(f'2025092{run}_225457', _results('swoole', 'database'))
+    return store
+
+
+def test_compact_keeps_rows_when_interrupted(tmp_path, monkeypatch):
+    _store_with_runs(tmp_path, 3)
+
+    # The first old segment goes, then the process dies
+    unlink = os.unlink
+    unlinked = []
+
+    def crash(path):
+        if unlinked:
+            raise OSError('crash')
+        unlinked.append(path)
+        unlink(path)
+    monkeypatch.setattr(os, 'unlink', crash)
+    with pytest.raises(OSError):
+        ResultsStore(str(tmp_path)).compact()
+    monkeypatch.undo()
+
+    (tmp_path / 'part-999999.npy.tmp').write_bytes(b'partial')
+    assert len(ResultsStore(str(tmp_path)).query(runtime='swoole')) == 3
+    store = ResultsStore(str(tmp_path))
+    store.compact()
+    assert [p.name for p in sorted(tmp_path.glob('part-*.npy'))] == ['part-000004.npy']
+    assert len(ResultsStore(str(tmp_path)).query(runtime='swoole')) == 3
+
+
+@pytest.mark.parametrize('last_runs, count', [(None, 3), (0, 0), (2, 2), (5, 3)])
+def test_query_last_runs(tmp_path, last_runs, count):
+    store = _store_with_runs(tmp_path, 3)
+    assert len(store.query(last_runs=last_runs)) == count
+
+
+def test_query_rejects_negative_last_runs(tmp_path):
+    with pytest.raises(ValueError):
+        _store_with_runs(tmp_path, 1).query(last_runs=-1)
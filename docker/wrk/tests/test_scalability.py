@@ -0,0 +1,51 @@
+import math
+
+import pytest
+
+from scalability import analyze_scalability, fit_usl, latency_knee, usl_throughput
+
+SWEEP = [1, 10, 50, 100, 200, 400, 800]
+
+def sweep(lam, sigma, kappa):
+    return {n: float(usl_throughput(n, lam, sigma, kappa)) for n in SWEEP}
+
+def test_fit_recovers_known_coefficients():
+    points = sweep(1000.0, 0.05, 0.0002)
+    lam, sigma, kappa, r2 = fit_usl(list(points), list(points.values()))
+    assert lam == pytest.approx(1000.0)
+    assert sigma == pytest.approx(0.05)
+    assert kappa == pytest.approx(0.0002)
+    assert r2 == pytest.approx(1.0)
+
+def test_peak_and_knee_follow_the_model():
+    model = analyze_scalability(sweep(1000.0, 0.05, 0.0002))
+    n_peak = math.sqrt((1 - 0.05) / 0.0002)
+    assert model['peak_concurrency'] == pytest.approx(n_peak)
+    assert model['peak_rps'] == pytest.approx(float(usl_throughput(n_peak, 1000.0, 0.05, 0.0002)))
+    # The knee maximises X / R = X(N)^2 / N, before the throughput peak
+    knee = model['latency_knee_concurrency']
+
+    def power(n):
+        return float(usl_throughput(n, 1000.0, 0.05, 0.0002)) ** 2 / n
+    assert 1 < knee < n_peak
+    assert power(knee) >= max(power(knee * 0.99), power(knee * 1.01))
+
+def test_no_coherency_cost_has_no_peak():
+    model = analyze_scalability(sweep(1000.0, 0.1, 0.0))
+    assert model['kappa_coherency'] == 0.0
+    assert model['peak_concurrency'] is None
+    # Throughput only approaches the lambda / sigma ceiling
+    assert model['peak_rps'] == pytest.approx(1000.0 / 0.1)
+    assert model['latency_knee_concurrency'] == pytest.approx((1 - 0.1) / 0.1)
+
+def test_linear_scaling_has_no_peak_or_knee():
+    model = analyze_scalability(sweep(1000.0, 0.0, 0.0))
+    assert model['peak_concurrency'] is None
+    assert model['peak_rps'] is None
+    assert model['latency_knee_concurrency'] is None
+    assert latency_knee(0.0, 0.0) == math.inf
+
+def test_fewer_than_three_concurrency_levels_are_not_fitted():
+    assert analyze_scalability({10: 900.0, 100: 5000.0}) is None
+    # Levels with no throughput do not count
+    assert analyze_scalability({10: 900.0, 100: 5000.0, 200: 0.0}) is None
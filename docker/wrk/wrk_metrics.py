@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""Shared wrk output parser.
+
+Every field wrk prints is extracted in one finditer pass over the text
+using a single precompiled pattern, and all unit conversions live here:
+latencies are normalised to milliseconds, sizes to megabytes. The first
+occurrence of each field wins, matching what a re.search per field did.
+"""
+
+import re
+from dataclasses import dataclass, asdict
+from typing import Optional
+
+TIME_UNITS_MS = {'us': 0.001, 'ms': 1.0, 's': 1000.0, 'm': 60000.0, 'h': 3600000.0}
+SIZE_UNITS_MB = {'B': 1 / 1048576, 'KB': 1 / 1024, 'MB': 1.0, 'GB': 1024.0, 'TB': 1048576.0}
+
+_NUM = r'\d+(?:\.\d+)?'
+
+def _time(name):
+    return rf'(?P<{name}>{_NUM})(?P<{name}_unit>us|ms|s|m|h)'
+
+def _size(name):
+    return rf'(?P<{name}>{_NUM})(?P<{name}_unit>B|KB|MB|GB|TB)'
+
+# One anchor shared by every alternative: positions that are not at the
+# start of a line are rejected before any branch is tried.
+WRK_PATTERN = re.compile(rf'''
+    ^[ \t]*(?:
+        (?P<latency>Latency[ \t]+{_time('lat_avg')}
+            (?:[ \t]+{_time('lat_stdev')}[ \t]+{_time('lat_max')})?)
+      | (?P<percentile>(?P<pct>50|75|90|99)(?:\.0+)?%[ \t]+{_time('pct_value')})
+      | (?P<requests>(?P<total>\d+)[ ]requests[ ]in[ ]{_time('duration')}
+            (?:,[ \t]+{_size('read')}[ ]read)?)
+      | (?P<socket_errors>Socket[ ]errors:[ ]connect[ ](?P<e_connect>\d+),[ ]read[ ](?P<e_read>\d+),
+            [ ]write[ ](?P<e_write>\d+),[ ]timeout[ ](?P<e_timeout>\d+))
+      | (?P<non_2xx>Non-2xx[ ]or[ ]3xx[ ]responses:[ ](?P<non_2xx_count>\d+))
+      | (?P<rps>Requests/sec:[ \t]+(?P<rps_value>{_NUM}))
+      | (?P<transfer>Transfer/sec:[ \t]+{_size('transfer_value')})
+    )
+''', re.MULTILINE | re.VERBOSE)
+
+@dataclass
+class WrkMetrics:
+    """Everything wrk --latency reports for a single run"""
+    requests_per_sec: Optional[float] = None
+    latency_ms: Optional[float] = None
+    latency_stdev_ms: Optional[float] = None
+    latency_max_ms: Optional[float] = None
+    latency_p50_ms: Optional[float] = None
+    latency_p75_ms: Optional[float] = None
+    latency_p90_ms: Optional[float] = None
+    latency_p99_ms: Optional[float] = None
+    transfer_mb_per_sec: Optional[float] = None
+    total_requests: Optional[int] = None
+    duration_s: Optional[float] = None
+    read_mb: Optional[float] = None
+    errors_connect: int = 0
+    errors_read: int = 0
+    errors_write: int = 0
+    errors_timeout: int = 0
+    non_2xx_3xx: int = 0
+
+    @property
+    def socket_errors(self):
+        return self.errors_connect + self.errors_read + self.errors_write + self.errors_timeout
+
+    @property
+    def tail_latency_ms(self):
+        """p99 when the distribution was captured, the mean otherwise"""
+        return self.latency_p99_ms if self.latency_p99_ms is not None else self.latency_ms
+
+    def to_dict(self):
+        return {k: v for k, v in asdict(self).items() if v is not None}
+
+def to_ms(value, unit):
+    return float(value) * TIME_UNITS_MS[unit]
+
+def to_mb(value, unit):
+    return float(value) * SIZE_UNITS_MB[unit]
+
+# Group positions in match.groups(), resolved once from the group names
+_G = {name: index - 1 for name, index in WRK_PATTERN.groupindex.items()}
+
+def _ms(g, name):
+    return float(g[_G[name]]) * TIME_UNITS_MS[g[_G[name + '_unit']]]
+
+def _mb(g, name):
+    return float(g[_G[name]]) * SIZE_UNITS_MB[g[_G[name + '_unit']]]
+
+def parse_wrk_output(content):
+    """Parse wrk output into a WrkMetrics record in a single pass"""
+    metrics = WrkMetrics()
+    seen = set()
+
+    for match in WRK_PATTERN.finditer(content):
+        g = match.groups()
+        kind = match.lastgroup
+        if kind == 'percentile':
+            kind = 'p' + g[_G['pct']]
+        if kind in seen:
+            continue
+        seen.add(kind)
+
+        if kind == 'latency':
+            metrics.latency_ms = _ms(g, 'lat_avg')
+            if g[_G['lat_stdev']] is not None:
+                metrics.latency_stdev_ms = _ms(g, 'lat_stdev')
+                metrics.latency_max_ms = _ms(g, 'lat_max')
+        elif kind in ('p50', 'p75', 'p90', 'p99'):
+            setattr(metrics, f'latency_{kind}_ms', _ms(g, 'pct_value'))
+        elif kind == 'requests':
+            metrics.total_requests = int(g[_G['total']])
+            metrics.duration_s = _ms(g, 'duration') / 1000
+            if g[_G['read']] is not None:
+                metrics.read_mb = _mb(g, 'read')
+        elif kind == 'socket_errors':
+            metrics.errors_connect = int(g[_G['e_connect']])
+            metrics.errors_read = int(g[_G['e_read']])
+            metrics.errors_write = int(g[_G['e_write']])
+            metrics.errors_timeout = int(g[_G['e_timeout']])
+        elif kind == 'non_2xx':
+            metrics.non_2xx_3xx = int(g[_G['non_2xx_count']])
+        elif kind == 'rps':
+            metrics.requests_per_sec = float(g[_G['rps_value']])
+        elif kind == 'transfer':
+            metrics.transfer_mb_per_sec = _mb(g, 'transfer_value')
+
+    return metrics
@@ -3,56 +3,23 @@
 import json
 import os
 import glob
-import re
+import sys
 from datetime import datetime
 import statistics
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'docker', 'wrk'))
+from parse_cache import ParseCache
+from wrk_metrics import parse_wrk_output
+
+# Bump whenever parse_wrk_file output changes so cached results are not reused
+PARSER_VERSION = 'bateria1-2'
+
 def parse_wrk_file(filepath):
     """Parse a wrk output file and extract metrics"""
     with open(filepath, 'r') as f:
         content = f.read()
     
-    metrics = {}
-    
-    # Extract requests per second
-    rps_match = re.search(r'Requests/sec:\s+(\d+\.?\d*)', content)
-    if rps_match:
-        metrics['requests_per_sec'] = float(rps_match.group(1))
-    
-    # Extract latency
-    latency_match = re.search(r'Latency\s+(\d+\.?\d*)(us|ms|s)', content)
-    if latency_match:
-        latency_value = float(latency_match.group(1))
-        latency_unit = latency_match.group(2)
-        
-        # Convert to milliseconds
-        if latency_unit == 'us':
-            latency_value = latency_value / 1000
-        elif latency_unit == 's':
-            latency_value = latency_value * 1000
-        
-        metrics['latency_ms'] = latency_value
-    
-    # Extract total requests
-    requests_match = re.search(r'(\d+) requests in', content)
-    if requests_match:
-        metrics['total_requests'] = int(requests_match.group(1))
-    
-    # Extract transfer rate
-    transfer_match = re.search(r'Transfer/sec:\s+(\d+\.?\d*)(KB|MB|GB)', content)
-    if transfer_match:
-        transfer_value = float(transfer_match.group(1))
-        transfer_unit = transfer_match.group(2)
-        
-        # Convert to MB/s
-        if transfer_unit == 'KB':
-            transfer_value = transfer_value / 1024
-        elif transfer_unit == 'GB':
-            transfer_value = transfer_value * 1024
-        
-        metrics['transfer_mb_per_sec'] = transfer_value
-    
-    return metrics
+    return parse_wrk_output(content).to_dict()
 
 def analyze_results():
     """Analyze all benchmark results"""
@@ -64,15 +31,18 @@ def analyze_results():
         return
     
     results = {}
+    cache = ParseCache('.analyze-cache', PARSER_VERSION)
     
-    for filepath in result_files:
+    for filepath in sorted(result_files):
         # Extract runtime name from filename
         runtime = filepath.split('-')[0]
         
-        metrics = parse_wrk_file(filepath)
+        metrics = cache.get_or_parse(filepath, parse_wrk_file)
         if metrics:
             results[runtime] = metrics
     
+    cache.save()
+    
     if not results:
         print("No valid results found!")
         return
@@ -5,80 +5,221 @@ Runtime PHP Comparison: Swoole vs PHP-FPM vs FrankenPHP
 
 Este script analisa os resultados do benchmark K6 e gera visualizações
 para inclusão no Trabalho de Conclusão de Curso (TCC).
+
+matplotlib, seaborn e pandas só são importados quando um gráfico ou uma
+tabela é gerada; --data apenas imprime os dados carregados.
 """
 
+import csv
+import fnmatch
+import glob
 import json
-import matplotlib.pyplot as plt
-import pandas as pd
-import numpy as np
-from datetime import datetime
-import seaborn as sns
 import os
+import sys
+from types import MappingProxyType
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'docker', 'wrk'))
+
+from chart_engine import pyplot
+from render_cache import RenderCache, chart_key, code_version
+
+RESULTS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Arquivos lidos de cada diretório de resultados
+K6_SUMMARY_PATTERN = 'k6-*.json'
+SCENARIOS_CSV = 'test_scenarios.csv'
+ENDPOINTS_CSV = 'endpoint_analysis.csv'
+RUNTIMES_CSV = 'runtime_comparison.csv'
+
+# Tabelas geradas; nunca sobrescrevem as entradas acima
+RUNTIMES_TABLE = 'tabela_runtimes.csv'
+SCENARIOS_TABLE = 'tabela_cenarios.csv'
+ENDPOINTS_TABLE = 'tabela_endpoints.csv'
+
+# Campos de cenários e endpoints que só existem nos CSVs; tags do k6 sem
+# linha no CSV recebem estes valores
+SCENARIO_DEFAULTS = {'vus': 0, 'duration_min': 0}
+ENDPOINT_DEFAULTS = {'weight': 0, 'category': 'outros'}
+
+RUNTIME_LABELS = {'swoole': 'Swoole', 'phpfpm': 'PHP-FPM', 'frankenphp': 'FrankenPHP'}
+
+# Cache do processo: diretório -> (assinatura dos arquivos, dados congelados)
+_DATA_CACHE = {}
+
+def _source_files(results_dir):
+    """Arquivos de entrada presentes em um diretório de resultados"""
+    paths = sorted(glob.glob(os.path.join(results_dir, K6_SUMMARY_PATTERN)))
+    for name in (SCENARIOS_CSV, ENDPOINTS_CSV, RUNTIMES_CSV):
+        path = os.path.join(results_dir, name)
+        if os.path.exists(path):
+            paths.append(path)
+    return paths
+
+def _signature(paths):
+    """(caminho, mtime, tamanho) de cada arquivo; muda quando algum arquivo muda"""
+    signature = []
+    for path in paths:
+        st = os.stat(path)
+        signature.append((path, st.st_mtime_ns, st.st_size))
+    return tuple(signature)
+
+def _freeze(value):
+    """Cópia somente leitura: dicts viram MappingProxyType e listas viram tuplas"""
+    if isinstance(value, dict):
+        return MappingProxyType({k: _freeze(v) for k, v in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    return value
 
-# Configuração de estilo para gráficos acadêmicos
-plt.style.use('seaborn-v0_8')
-sns.set_palette("husl")
-
-def load_benchmark_data():
-    """Carrega dados do benchmark a partir dos resultados"""
-    
-    # Dados do benchmark estável executado
-    data = {
-        'summary': {
-            'total_requests': 6652,
-            'duration_seconds': 595,
-            'avg_response_time_ms': 37,
-            'p95_response_time_ms': 136,
-            'max_response_time_ms': 470,
-            'error_rate': 0.0,
-            'requests_per_second': 11.18,
-            'data_received_mb': 2.35,
-            'data_sent_mb': 1.01
-        },
-        'scenarios': [
-            {'name': 'Light Load', 'vus': 5, 'duration_min': 3, 'requests': 1663},
-            {'name': 'Medium Load', 'vus': 10, 'duration_min': 3, 'requests': 1997},
-            {'name': 'Heavy Load', 'vus': 20, 'duration_min': 2, 'requests': 1327},
-            {'name': 'Spike Test', 'vus': 30, 'duration_min': 1, 'requests': 1665}
-        ],
-        'runtimes': {
-            'swoole': {
-                'port': 8001,
-                'requests': 2217,
-                'avg_response_time': 35,
-                'architecture': 'Assíncrono'
-            },
-            'phpfpm': {
-                'port': 8002, 
-                'requests': 2217,
-                'avg_response_time': 39,
-                'architecture': 'Tradicional'
-            },
-            'frankenphp': {
-                'port': 8003,
-                'requests': 2218,
-                'avg_response_time': 37,
-                'architecture': 'Moderno'
-            }
-        },
-        'endpoints': [
-            {'path': '/api/', 'weight': 25, 'category': 'basic', 'requests': 2163},
-            {'path': '/api/health', 'weight': 20, 'category': 'basic', 'requests': 1730},
-            {'path': '/api/static', 'weight': 20, 'category': 'basic', 'requests': 1730},
-            {'path': '/api/cpu-intensive', 'weight': 10, 'category': 'cpu', 'requests': 865},
-            {'path': '/api/memory-test', 'weight': 8, 'category': 'cpu', 'requests': 692},
-            {'path': '/api/json-encode', 'weight': 8, 'category': 'json', 'requests': 692},
-            {'path': '/api/json-decode', 'weight': 8, 'category': 'json', 'requests': 692},
-            {'path': '/api/runtime-info', 'weight': 1, 'category': 'info', 'requests': 86}
-        ]
+def _number(text):
+    """Valor de uma célula do CSV com o tipo que o pandas inferiria"""
+    for kind in (int, float):
+        try:
+            return kind(text)
+        except ValueError:
+            pass
+    return text
+
+def _read_csv(results_dir, name):
+    path = os.path.join(results_dir, name)
+    if not os.path.exists(path):
+        return []
+    with open(path, newline='', encoding='utf-8') as f:
+        return [{k: _number(v) for k, v in row.items()} for row in csv.DictReader(f)]
+
+def _pyplot():
+    """pyplot com o estilo acadêmico, importado só quando há o que desenhar"""
+    plt = pyplot(style='seaborn-v0_8')
+    import seaborn as sns
+    sns.set_palette("husl")
+    return plt
+
+def _runtime_key(name):
+    """'PHP-FPM' -> 'phpfpm', como nas tags dos scripts k6"""
+    return name.lower().replace('-', '').replace('_', '')
+
+def _summary_from_k6(k6):
+    """Métricas gerais a partir do resumo JSON do k6 (--summary-export)"""
+    metrics = k6['metrics']
+    duration = metrics['http_req_duration']['values']
+    http_reqs = metrics['http_reqs']['values']
+    return {
+        'total_requests': int(http_reqs['count']),
+        'duration_seconds': k6['state']['testRunDurationMs'] / 1000,
+        'avg_response_time_ms': round(duration['avg'], 2),
+        'p95_response_time_ms': round(duration['p(95)'], 2),
+        'max_response_time_ms': round(duration['max'], 2),
+        'error_rate': metrics.get('http_req_failed', {}).get('values', {}).get('rate', 0.0),
+        'requests_per_second': round(http_reqs['rate'], 2),
+        'data_received_mb': round(metrics['data_received']['values']['count'] / 1048576, 2),
+        'data_sent_mb': round(metrics['data_sent']['values']['count'] / 1048576, 2)
     }
-    
+
+def _tagged_submetrics(k6, tag):
+    """{valor da tag: {'requests', 'avg_response_time'}} das submétricas do k6"""
+    values = {}
+    for name, metric in k6['metrics'].items():
+        for base, field, stat in (('http_reqs', 'requests', 'count'),
+                                  ('http_req_duration', 'avg_response_time', 'avg')):
+            prefix = base + '{' + tag + ':'
+            if name.startswith(prefix) and name.endswith('}'):
+                values.setdefault(name[len(prefix):-1], {})[field] = metric['values'][stat]
+    return values
+
+def _scenario_key(name):
+    """'Light Load' -> 'light_load', como na tag test_type dos cenários k6"""
+    return name.lower().replace(' ', '_').replace('-', '_')
+
+def _merge_tagged(rows, key_field, key, tagged, defaults):
+    """Linhas do CSV com os requests das submétricas k6 de mesma chave
+
+    Valores da tag sem linha no CSV viram linhas novas, com os campos que
+    os gráficos leem preenchidos por defaults.
+    """
+    rows = [dict(row) for row in rows]
+    by_key = {key(str(row[key_field])): row for row in rows}
+    for value, metrics in tagged.items():
+        row = by_key.get(key(value))
+        if row is None:
+            row = {**defaults, key_field: value, 'requests': 0}
+            rows.append(row)
+        if 'requests' in metrics:
+            row['requests'] = int(metrics['requests'])
+    return rows
+
+def _request_warnings(total, tables):
+    """Avisos para as tabelas cuja soma de requests difere do resumo k6"""
+    warnings = []
+    for name, requests in tables:
+        count = sum(int(r) for r in requests if r is not None)
+        if requests and count != total:
+            warnings.append(f"{name} soma {count:,} requests; o resumo k6 tem {total:,}")
+    return warnings
+
+def _read_benchmark_data(results_dir, k6_path):
+    """Lê o resumo k6 e os CSVs de um diretório de resultados"""
+    with open(k6_path) as f:
+        k6 = json.load(f)
+    
+    runtimes = {}
+    for row in _read_csv(results_dir, RUNTIMES_CSV):
+        runtimes[_runtime_key(row['Runtime'])] = {
+            'port': int(row['Porta']),
+            'requests': int(row['Requests']),
+            'avg_response_time': row['Tempo Médio (ms)'],
+            'architecture': row['Arquitetura']
+        }
+    # Submétricas do k6 (tags runtime, test_type e endpoint), quando existem,
+    # prevalecem sobre os CSVs
+    for runtime, values in _tagged_submetrics(k6, 'runtime').items():
+        runtimes.setdefault(_runtime_key(runtime), {}).update(values)
+    scenarios = _merge_tagged(_read_csv(results_dir, SCENARIOS_CSV), 'name', _scenario_key,
+                              _tagged_submetrics(k6, 'test_type'), SCENARIO_DEFAULTS)
+    endpoints = _merge_tagged(_read_csv(results_dir, ENDPOINTS_CSV), 'path', str,
+                              _tagged_submetrics(k6, 'endpoint'), ENDPOINT_DEFAULTS)
+    
+    summary = _summary_from_k6(k6)
+    return {
+        'source': os.path.basename(k6_path),
+        'summary': summary,
+        'checks': [{'name': c['name'], 'passes': c['passes'], 'fails': c['fails']}
+                   for c in k6.get('root_group', {}).get('checks', [])],
+        'scenarios': scenarios,
+        'runtimes': runtimes,
+        'endpoints': endpoints,
+        'warnings': _request_warnings(summary['total_requests'], [
+            (RUNTIMES_CSV, [rt.get('requests') for rt in runtimes.values()]),
+            (SCENARIOS_CSV, [s.get('requests') for s in scenarios]),
+            (ENDPOINTS_CSV, [ep.get('requests') for ep in endpoints]),
+        ])
+    }
+
+def load_benchmark_data(results_dir=RESULTS_DIR):
+    """Carrega dados do benchmark a partir dos resultados
+    
+    Os arquivos são lidos uma vez por processo e recarregados apenas quando
+    algum deles muda. O retorno é uma visão somente leitura compartilhada
+    entre todos os gráficos.
+    """
+    results_dir = os.path.abspath(results_dir)
+    paths = _source_files(results_dir)
+    k6_paths = [p for p in paths if fnmatch.fnmatch(os.path.basename(p), K6_SUMMARY_PATTERN)]
+    if not k6_paths:
+        raise FileNotFoundError(f"Nenhum resumo k6 ({K6_SUMMARY_PATTERN}) em {results_dir}")
+    
+    signature = _signature(paths)
+    cached = _DATA_CACHE.get(results_dir)
+    if cached is not None and cached[0] == signature:
+        return cached[1]
+    
+    # O resumo mais recente do diretório (nomes terminam com o timestamp)
+    data = _freeze(_read_benchmark_data(results_dir, k6_paths[-1]))
+    _DATA_CACHE[results_dir] = (signature, data)
     return data
 
-def create_performance_comparison():
+def create_performance_comparison(data, output_dir=RESULTS_DIR):
     """Cria gráfico comparativo de performance entre runtimes"""
-    data = load_benchmark_data()
-    
+    plt = _pyplot()
     # Dados para o gráfico
     runtimes = list(data['runtimes'].keys())
     response_times = [data['runtimes'][rt]['avg_response_time'] for rt in runtimes]
@@ -111,14 +252,13 @@ def create_performance_comparison():
                 f'{value}', ha='center', va='bottom', fontweight='bold')
     
     plt.tight_layout()
-    plt.savefig('/home/incicle-zona/TCC/project-2/results/runtime_comparison.png', 
+    plt.savefig(os.path.join(output_dir, 'runtime_comparison.png'),
                 dpi=300, bbox_inches='tight')
     plt.close()
 
-def create_load_scenarios_chart():
+def create_load_scenarios_chart(data, output_dir=RESULTS_DIR):
     """Cria gráfico dos cenários de carga testados"""
-    data = load_benchmark_data()
-    
+    plt = _pyplot()
     scenarios = [s['name'] for s in data['scenarios']]
     vus = [s['vus'] for s in data['scenarios']]
     requests = [s['requests'] for s in data['scenarios']]
@@ -147,14 +287,13 @@ def create_load_scenarios_chart():
                 f'{value}', ha='center', va='bottom', fontweight='bold')
     
     plt.tight_layout()
-    plt.savefig('/home/incicle-zona/TCC/project-2/results/load_scenarios.png', 
+    plt.savefig(os.path.join(output_dir, 'load_scenarios.png'),
                 dpi=300, bbox_inches='tight')
     plt.close()
 
-def create_endpoint_distribution():
+def create_endpoint_distribution(data, output_dir=RESULTS_DIR):
     """Cria gráfico de distribuição de endpoints testados"""
-    data = load_benchmark_data()
-    
+    plt = _pyplot()
     # Agrupar por categoria
     categories = {}
     for endpoint in data['endpoints']:
@@ -190,14 +329,13 @@ def create_endpoint_distribution():
                 f'{value}', ha='left', va='center', fontweight='bold')
     
     plt.tight_layout()
-    plt.savefig('/home/incicle-zona/TCC/project-2/results/endpoint_distribution.png', 
+    plt.savefig(os.path.join(output_dir, 'endpoint_distribution.png'),
                 dpi=300, bbox_inches='tight')
     plt.close()
 
-def create_summary_dashboard():
+def create_summary_dashboard(data, output_dir=RESULTS_DIR):
     """Cria dashboard resumo dos resultados"""
-    data = load_benchmark_data()
-    
+    plt = _pyplot()
     fig, ((ax1, ax2), (ax3, ax4)) = plt.subplots(2, 2, figsize=(16, 12))
     
     # Métricas principais
@@ -262,83 +400,128 @@ def create_summary_dashboard():
     ax4.grid(True, alpha=0.3, axis='x')
     
     plt.tight_layout()
-    plt.savefig('/home/incicle-zona/TCC/project-2/results/summary_dashboard.png', 
+    plt.savefig(os.path.join(output_dir, 'summary_dashboard.png'),
                 dpi=300, bbox_inches='tight')
     plt.close()
 
-def generate_data_table():
-    """Gera tabela de dados para inclusão no TCC"""
-    data = load_benchmark_data()
+def generate_data_table(data, output_dir=RESULTS_DIR):
+    """Gera tabela de dados para inclusão no TCC
+    
+    As tabelas vão para arquivos próprios (tabela_*.csv) para que as
+    entradas lidas por load_benchmark_data não mudem a cada execução.
+    """
+    import pandas as pd
     
     # Criar DataFrame dos runtimes
+    runtimes = data['runtimes']
+    total = sum(rt.get('requests', 0) for rt in runtimes.values()) or 1
     runtime_df = pd.DataFrame({
-        'Runtime': ['Swoole', 'PHP-FPM', 'FrankenPHP'],
-        'Porta': [8001, 8002, 8003],
-        'Arquitetura': ['Assíncrona', 'Tradicional', 'Moderna'],
-        'Requests': [2217, 2217, 2218],
-        'Tempo Médio (ms)': [35, 39, 37],
-        'Percentual (%)': [33.3, 33.3, 33.4]
+        'Runtime': [RUNTIME_LABELS.get(name, name) for name in runtimes],
+        'Porta': [rt.get('port') for rt in runtimes.values()],
+        'Arquitetura': [rt.get('architecture') for rt in runtimes.values()],
+        'Requests': [rt.get('requests') for rt in runtimes.values()],
+        'Tempo Médio (ms)': [rt.get('avg_response_time') for rt in runtimes.values()],
+        'Percentual (%)': [round(rt.get('requests', 0) / total * 100, 1) for rt in runtimes.values()]
     })
     
     # Salvar como CSV
-    runtime_df.to_csv('/home/incicle-zona/TCC/project-2/results/runtime_comparison.csv', 
+    runtime_df.to_csv(os.path.join(output_dir, RUNTIMES_TABLE), 
                      index=False, encoding='utf-8')
     
     # Criar DataFrame dos cenários
-    scenario_df = pd.DataFrame(data['scenarios'])
-    scenario_df.to_csv('/home/incicle-zona/TCC/project-2/results/test_scenarios.csv', 
+    scenario_df = pd.DataFrame([dict(s) for s in data['scenarios']])
+    scenario_df.to_csv(os.path.join(output_dir, SCENARIOS_TABLE), 
                       index=False, encoding='utf-8')
     
     # Criar DataFrame dos endpoints
-    endpoint_df = pd.DataFrame(data['endpoints'])
-    endpoint_df.to_csv('/home/incicle-zona/TCC/project-2/results/endpoint_analysis.csv', 
+    endpoint_df = pd.DataFrame([dict(ep) for ep in data['endpoints']])
+    endpoint_df.to_csv(os.path.join(output_dir, ENDPOINTS_TABLE), 
                       index=False, encoding='utf-8')
     
     return runtime_df, scenario_df, endpoint_df
 
-def main():
+# Fatias dos dados que cada gráfico desenha; a chave do cache é o hash delas
+
+def _runtimes_slice(data):
+    return [[name, rt['avg_response_time'], rt['requests']] for name, rt in data['runtimes'].items()]
+
+def _scenarios_slice(data):
+    return [[s['name'], s['vus'], s['requests']] for s in data['scenarios']]
+
+def _endpoints_slice(data):
+    return [[ep['path'], ep['category'], ep['requests']] for ep in data['endpoints']]
+
+def _dashboard_slice(data):
+    return {'summary': data['summary'],
+            'scenarios': [[s['name'], s['duration_min']] for s in data['scenarios']]}
+
+# (arquivo, mensagem, função, fatia dos dados) na ordem do relatório
+CHARTS = [
+    ('runtime_comparison.png', "📊 Gerando gráfico comparativo de runtimes...",
+     create_performance_comparison, _runtimes_slice),
+    ('load_scenarios.png', "📈 Gerando gráfico de cenários de carga...",
+     create_load_scenarios_chart, _scenarios_slice),
+    ('endpoint_distribution.png', "🎯 Gerando análise de distribuição de endpoints...",
+     create_endpoint_distribution, _endpoints_slice),
+    ('summary_dashboard.png', "📋 Gerando dashboard resumo...",
+     create_summary_dashboard, _dashboard_slice),
+]
+
+def analyze_results_dir(results_dir, force=False):
+    """Gera todos os gráficos e tabelas de um diretório de resultados
+    
+    Gráficos cujos dados e código não mudaram desde a última execução não
+    são redesenhados.
+    """
+    # Uma única visão somente leitura é compartilhada por todos os gráficos
+    data = load_benchmark_data(results_dir)
+    output_dir = results_dir
+    cache = RenderCache(output_dir, force)
+    
+    for filename, message, create, data_slice in CHARTS:
+        print(message)
+        key = chart_key(data_slice(data), code_version(create))
+        if not cache.render(filename, key, lambda: create(data, output_dir)):
+            print(f"   ⏭️  {filename} sem mudanças")
+    cache.save()
+    
+    print("📄 Gerando tabelas de dados...")
+    generate_data_table(data, output_dir)
+    
+    return data
+
+def main(results_dirs=None, force=False):
     """Função principal para gerar todas as análises"""
     print("🔬 Iniciando análise dos resultados do benchmark TCC...")
     
-    # Criar diretório de resultados se não existir
-    os.makedirs('/home/incicle-zona/TCC/project-2/results', exist_ok=True)
-    
     try:
-        print("📊 Gerando gráfico comparativo de runtimes...")
-        create_performance_comparison()
-        
-        print("📈 Gerando gráfico de cenários de carga...")
-        create_load_scenarios_chart()
-        
-        print("🎯 Gerando análise de distribuição de endpoints...")
-        create_endpoint_distribution()
-        
-        print("📋 Gerando dashboard resumo...")
-        create_summary_dashboard()
-        
-        print("📄 Gerando tabelas de dados...")
-        runtime_df, scenario_df, endpoint_df = generate_data_table()
+        for results_dir in results_dirs or [RESULTS_DIR]:
+            print(f"\n📂 {results_dir}")
+            data = analyze_results_dir(results_dir, force)
+            
+            # Mostrar resumo dos dados
+            summary = data['summary']
+            print(f"\n📊 RESUMO DOS RESULTADOS ({data['source']}):")
+            print(f"   • Total de Requests: {summary['total_requests']:,}")
+            print(f"   • Taxa de Sucesso: {(1 - summary['error_rate']) * 100:.1f}%")
+            print(f"   • Tempo Médio: {summary['avg_response_time_ms']}ms")
+            print(f"   • P95 Latência: {summary['p95_response_time_ms']}ms")
+            print(f"   • RPS Médio: {summary['requests_per_second']}")
+            for warning in data['warnings']:
+                print(f"   ⚠️  {warning}")
         
         print("\n✅ Análise concluída com sucesso!")
-        print("\n📁 Arquivos gerados:")
+        print("\n📁 Arquivos gerados em cada diretório:")
         print("   📊 runtime_comparison.png - Comparação entre runtimes")
         print("   📈 load_scenarios.png - Cenários de carga testados")
         print("   🎯 endpoint_distribution.png - Distribuição de endpoints")
         print("   📋 summary_dashboard.png - Dashboard completo")
-        print("   📄 runtime_comparison.csv - Dados dos runtimes")
-        print("   📄 test_scenarios.csv - Dados dos cenários")
-        print("   📄 endpoint_analysis.csv - Análise de endpoints")
+        print(f"   📄 {RUNTIMES_TABLE} - Dados dos runtimes")
+        print(f"   📄 {SCENARIOS_TABLE} - Dados dos cenários")
+        print(f"   📄 {ENDPOINTS_TABLE} - Análise de endpoints")
         
         print("\n🎓 Dados prontos para inclusão no TCC!")
         
-        # Mostrar resumo dos dados
-        print("\n📊 RESUMO DOS RESULTADOS:")
-        print(f"   • Total de Requests: 6,652")
-        print(f"   • Taxa de Sucesso: 100%")
-        print(f"   • Tempo Médio: 37ms")
-        print(f"   • P95 Latência: 136ms")
-        print(f"   • RPS Médio: 11.18")
-        
     except Exception as e:
         print(f"❌ Erro durante a análise: {e}")
         return False
@@ -346,5 +529,12 @@ def main():
     return True
 
 if __name__ == "__main__":
-    success = main()
-    exit(0 if success else 1)
\ No newline at end of file
+    # Uso: python3 analyze_tcc_results.py [diretorio_resultados ...] [--force | --data]
+    args = sys.argv[1:]
+    results_dirs = [arg for arg in args if not arg.startswith('--')]
+    if '--data' in args:
+        for results_dir in results_dirs or [RESULTS_DIR]:
+            print(json.dumps(load_benchmark_data(results_dir), default=dict, ensure_ascii=False, indent=2))
+        exit(0)
+    success = main(results_dirs, '--force' in args)
+    exit(0 if success else 1)
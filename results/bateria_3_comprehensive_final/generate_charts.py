@@ -2,330 +2,439 @@
 """
 Gerador de Gráficos - Bateria 3 Comprehensive Load Testing
 TCC - Análise de Performance de Runtimes PHP
+
+Os gráficos são especificações declarativas (docker/wrk/chart_engine.py)
+sobre bateria_3_comprehensive_data.json: cada painel diz o que seleciona
+dos dados e como é desenhado. O matplotlib só é importado quando algum
+gráfico é de fato renderizado, então --list e --data respondem sem ele.
+
+Com --headless o backend Agg é forçado e cada figura é renderizada em um
+processo do pool, para um ou vários diretórios de resultados ao mesmo
+tempo, com o tempo de cada figura no final.
+
+Figuras cujos dados e código não mudaram desde a última renderização são
+puladas (.render-cache.json em cada diretório); --force redesenha todas.
+
+Uso: python3 generate_charts.py [diretório ...] [--headless] [--jobs N]
+                                [--samples k6-results.json] [--force]
+                                [--list | --data]
 """
 
-import matplotlib.pyplot as plt
+import argparse
 import json
-from datetime import datetime
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'docker', 'wrk'))
+
+from chart_engine import Chart, Panel, panel_values, pyplot, render, render_key
+from parse_cache import file_digest
+from render_cache import RenderCache
+
+RESULTS_DIR = os.path.dirname(os.path.abspath(__file__))
+DATA_FILE = 'bateria_3_comprehensive_data.json'
+# Amostras por request (k6 --out json, ver scripts/run_bateria_3_complete.sh)
+K6_SAMPLES = 'k6-results.json'
+K6_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..',
+                         'benchmark', 'k6-bateria-3-comprehensive.js')
+TIMESERIES_WINDOW_S = 10
+
+# (chave nos dados, nome, cor) na ordem dos gráficos
+RUNTIMES = [('swoole', 'Swoole', '#2E8B57'), ('php_fpm', 'PHP-FPM', '#4682B4'),
+            ('frankenphp', 'FrankenPHP', '#CD853F')]
+RUNTIME_COLORS = [color for _, _, color in RUNTIMES]
+CATEGORIES = ['static', 'cache', 'file', 'database', 'cpu', 'mixed', 'memory', 'runtime', 'concurrent']
 
-# Configuração do estilo básico
-plt.rcParams['figure.figsize'] = (12, 8)
-plt.rcParams['font.size'] = 10
-plt.rcParams['axes.grid'] = True
+# Faixa de degradação descrita nos dados, ex.: 'significant_15_22_percent'
+_DEGRADATION = re.compile(r'(\d+)_(\d+)_percent')
 
-# Função para simular numpy se não estiver disponível
 def mean(values):
     return sum(values) / len(values)
 
-def arange(n):
-    return list(range(n))
-
-def load_data():
+def load_data(results_dir=RESULTS_DIR):
     """Carrega os dados do arquivo JSON"""
-    with open('bateria_3_comprehensive_data.json', 'r', encoding='utf-8') as f:
+    with open(os.path.join(results_dir, DATA_FILE), 'r', encoding='utf-8') as f:
         return json.load(f)
 
-def create_runtime_comparison_chart(data):
-    """Gráfico 1: Comparação Geral de Performance por Runtime"""
-    runtimes = ['Swoole', 'PHP-FPM', 'FrankenPHP']
-    
-    # Calcular performance média por runtime
-    swoole_avg = mean([cat['success_rate'] for cat in data['runtime_performance']['swoole']['categories'].values()])
-    phpfpm_avg = mean([cat['success_rate'] for cat in data['runtime_performance']['php_fpm']['categories'].values()])
-    frankenphp_avg = mean([cat['success_rate'] for cat in data['runtime_performance']['frankenphp']['categories'].values()])
-    
-    performance = [swoole_avg * 100, phpfpm_avg * 100, frankenphp_avg * 100]
-    colors = ['#2E8B57', '#4682B4', '#CD853F']
-    
-    fig, ax = plt.subplots(figsize=(10, 6))
-    bars = ax.bar(runtimes, performance, color=colors, alpha=0.8, edgecolor='black', linewidth=1)
-    
-    # Adicionar valores nas barras
-    for bar, value in zip(bars, performance):
-        height = bar.get_height()
-        ax.text(bar.get_x() + bar.get_width()/2., height + 0.5,
-                f'{value:.1f}%', ha='center', va='bottom', fontweight='bold')
-    
-    ax.set_ylabel('Taxa de Sucesso Média (%)', fontweight='bold')
-    ax.set_title('Performance Geral por Runtime\n(Requests com tempo < 2s)', fontsize=14, fontweight='bold')
-    ax.set_ylim(0, 105)
-    
-    # Adicionar grid
-    ax.grid(True, alpha=0.3)
-    ax.set_axisbelow(True)
-    
-    plt.tight_layout()
-    plt.savefig('1_runtime_comparison.png', dpi=300, bbox_inches='tight')
-    plt.show()
-
-def create_category_performance_chart(data):
-    """Gráfico 2: Performance por Categoria de Operação"""
-    categories = ['Static', 'Cache', 'File', 'Database', 'CPU', 'Mixed', 'Memory', 'Runtime', 'Concurrent']
-    
-    swoole_perf = []
-    phpfpm_perf = []
-    frankenphp_perf = []
-    
-    category_mapping = {
-        'Static': 'static', 'Cache': 'cache', 'File': 'file', 'Database': 'database',
-        'CPU': 'cpu', 'Mixed': 'mixed', 'Memory': 'memory', 'Runtime': 'runtime',
-        'Concurrent': 'concurrent'
-    }
-    
-    for cat in categories:
-        key = category_mapping[cat]
-        swoole_perf.append(data['runtime_performance']['swoole']['categories'][key]['success_rate'] * 100)
-        phpfpm_perf.append(data['runtime_performance']['php_fpm']['categories'][key]['success_rate'] * 100)
-        frankenphp_perf.append(data['runtime_performance']['frankenphp']['categories'][key]['success_rate'] * 100)
-    
-    x = arange(len(categories))
-    width = 0.25
-    
-    fig, ax = plt.subplots(figsize=(14, 8))
-    
-    bars1 = ax.bar(x - width, swoole_perf, width, label='Swoole', color='#2E8B57', alpha=0.8)
-    bars2 = ax.bar(x, phpfpm_perf, width, label='PHP-FPM', color='#4682B4', alpha=0.8)
-    bars3 = ax.bar(x + width, frankenphp_perf, width, label='FrankenPHP', color='#CD853F', alpha=0.8)
-    
-    # Adicionar valores nas barras
-    for bars in [bars1, bars2, bars3]:
-        for bar in bars:
-            height = bar.get_height()
-            ax.text(bar.get_x() + bar.get_width()/2., height + 0.5,
-                    f'{height:.0f}%', ha='center', va='bottom', fontsize=8)
-    
-    ax.set_xlabel('Categoria de Operação', fontweight='bold')
-    ax.set_ylabel('Taxa de Sucesso (%)', fontweight='bold')
-    ax.set_title('Performance por Categoria de Operação\n(Requests com tempo < 2s)', fontsize=14, fontweight='bold')
-    ax.set_xticks(x)
-    ax.set_xticklabels(categories, rotation=45, ha='right')
-    ax.legend(loc='lower left')
-    ax.set_ylim(0, 105)
-    
-    plt.tight_layout()
-    plt.savefig('2_category_performance.png', dpi=300, bbox_inches='tight')
-    plt.show()
-
-def create_degradation_chart(data):
-    """Gráfico 3: Padrão de Degradação sob Carga"""
-    runtimes = ['Swoole', 'PHP-FPM', 'FrankenPHP']
-    degradation = [2, 5, 18]  # Degradação média aproximada baseada nos dados
-    colors = ['#2E8B57', '#4682B4', '#CD853F']
-    
-    fig, ax = plt.subplots(figsize=(10, 6))
-    bars = ax.bar(runtimes, degradation, color=colors, alpha=0.8, edgecolor='black', linewidth=1)
-    
-    # Adicionar valores nas barras
-    for bar, value in zip(bars, degradation):
-        height = bar.get_height()
-        ax.text(bar.get_x() + bar.get_width()/2., height + 0.5,
-                f'{value}%', ha='center', va='bottom', fontweight='bold')
-    
-    ax.set_ylabel('Degradação de Performance (%)', fontweight='bold')
-    ax.set_title('Degradação de Performance sob Alta Carga\n(200 VUs concorrentes)', fontsize=14, fontweight='bold')
-    ax.set_ylim(0, 22)
-    
-    # Adicionar linhas de referência
-    ax.axhline(y=5, color='orange', linestyle='--', alpha=0.7, label='Limite Aceitável (5%)')
-    ax.axhline(y=10, color='red', linestyle='--', alpha=0.7, label='Limite Crítico (10%)')
-    ax.legend()
-    
-    plt.tight_layout()
-    plt.savefig('3_degradation_patterns.png', dpi=300, bbox_inches='tight')
-    plt.show()
-
-def create_throughput_metrics_chart(data):
-    """Gráfico 4: Métricas de Throughput"""
-    metrics = ['Throughput\n(req/s)', 'Avg Response\n(ms)', 'P95 Response\n(ms)', 'Max Response\n(s)']
-    values = [
-        data['global_metrics']['throughput_rps'],
-        data['global_metrics']['avg_response_time_ms'],
-        data['global_metrics']['p95_ms'],
-        data['global_metrics']['max_response_time_ms'] / 1000
-    ]
-    
-    fig, ((ax1, ax2), (ax3, ax4)) = plt.subplots(2, 2, figsize=(12, 10))
-    axes = [ax1, ax2, ax3, ax4]
-    colors = ['#FF6B6B', '#4ECDC4', '#45B7D1', '#96CEB4']
-    
-    for i, (ax, metric, value, color) in enumerate(zip(axes, metrics, values, colors)):
-        ax.bar(['Bateria 3'], [value], color=color, alpha=0.8, edgecolor='black', linewidth=1)
-        ax.text(0, value + value*0.05, f'{value:.1f}', ha='center', va='bottom', fontweight='bold', fontsize=12)
-        ax.set_title(metric, fontweight='bold')
-        ax.set_ylim(0, value * 1.2)
-        
-        # Unidades específicas
-        if i == 0:  # Throughput
-            ax.set_ylabel('Requests/segundo')
-        elif i in [1, 2]:  # Response times
-            ax.set_ylabel('Milissegundos')
-        else:  # Max response
-            ax.set_ylabel('Segundos')
-    
-    plt.suptitle('Métricas Globais de Performance - Bateria 3', fontsize=16, fontweight='bold')
-    plt.tight_layout()
-    plt.savefig('4_throughput_metrics.png', dpi=300, bbox_inches='tight')
-    plt.show()
-
-def create_heatmap_chart(data):
-    """Gráfico 5: Heatmap de Performance por Runtime vs Categoria"""
-    categories = ['static', 'cache', 'file', 'database', 'cpu', 'mixed', 'memory', 'runtime', 'concurrent']
-    runtimes = ['Swoole', 'PHP-FPM', 'FrankenPHP']
-    
-    performance_matrix = []
-    
-    for runtime in ['swoole', 'php_fpm', 'frankenphp']:
-        row = []
-        for cat in categories:
-            success_rate = data['runtime_performance'][runtime]['categories'][cat]['success_rate']
-            row.append(success_rate * 100)
-        performance_matrix.append(row)
-    
-    fig, ax = plt.subplots(figsize=(12, 6))
-    
-    # Criar heatmap
-    im = ax.imshow(performance_matrix, cmap='RdYlGn', aspect='auto', vmin=75, vmax=100)
-    
-    # Configurar ticks
-    ax.set_xticks(arange(len(categories)))
-    ax.set_yticks(arange(len(runtimes)))
-    ax.set_xticklabels([cat.title() for cat in categories], rotation=45, ha='right')
-    ax.set_yticklabels(runtimes)
-    
-    # Adicionar valores nas células
-    for i in range(len(runtimes)):
-        for j in range(len(categories)):
-            text = ax.text(j, i, f'{performance_matrix[i][j]:.0f}%',
-                          ha="center", va="center", color="black", fontweight='bold')
-    
-    ax.set_title('Heatmap de Performance: Runtime vs Categoria\n(Taxa de Sucesso %)', fontsize=14, fontweight='bold')
-    
-    # Adicionar colorbar
-    cbar = plt.colorbar(im, ax=ax)
-    cbar.set_label('Taxa de Sucesso (%)', fontweight='bold')
-    
-    plt.tight_layout()
-    plt.savefig('5_performance_heatmap.png', dpi=300, bbox_inches='tight')
-    plt.show()
-
-def create_summary_dashboard(data):
-    """Gráfico 6: Dashboard Resumo"""
-    fig = plt.figure(figsize=(16, 12))
-    
-    # Layout do dashboard
-    gs = fig.add_gridspec(3, 3, hspace=0.3, wspace=0.3)
-    
-    # 1. Ranking Geral (canto superior esquerdo)
-    ax1 = fig.add_subplot(gs[0, 0])
-    runtimes = ['Swoole', 'PHP-FPM', 'FrankenPHP']
-    ranks = [1, 2, 3]
-    colors = ['#FFD700', '#C0C0C0', '#CD7F32']  # Ouro, Prata, Bronze
-    
-    bars = ax1.barh(runtimes, [100-r*10 for r in ranks], color=colors, alpha=0.8)
-    ax1.set_xlabel('Score Performance')
-    ax1.set_title('🏆 Ranking Geral', fontweight='bold')
-    
-    # 2. Total de Iterações (canto superior meio)
-    ax2 = fig.add_subplot(gs[0, 1])
-    ax2.pie([data['test_metadata']['total_iterations']], labels=['20,947\nIterações'], 
-            colors=['#4ECDC4'], autopct='', startangle=90)
-    ax2.set_title('📊 Total de Testes', fontweight='bold')
-    
-    # 3. Taxa de Erro (canto superior direito)
-    ax3 = fig.add_subplot(gs[0, 2])
+def load_timeseries(samples_path=K6_SAMPLES):
+    """Série temporal por runtime e os stages do script, ou None sem amostras"""
+    if not os.path.exists(samples_path):
+        return None
+    # numpy só é necessário quando há amostras para agregar
+    from k6_timeseries import load_samples, stages_from_script, window_series
+    samples = load_samples([samples_path])
+    if len(samples.time) == 0:
+        return None
+    stages = stages_from_script(K6_SCRIPT)
+    return window_series(samples, TIMESERIES_WINDOW_S, stages), stages
+
+def samples_digest(samples_path):
+    """Hash das amostras do k6 e dos stages do script, ou None sem amostras"""
+    if not os.path.exists(samples_path):
+        return None
+    script = file_digest(K6_SCRIPT) if os.path.exists(K6_SCRIPT) else None
+    return [file_digest(samples_path), script]
+
+# Seleções: o que cada painel desenha, tirado dos dados
+
+def _success_rate(data, runtime, category):
+    return data['runtime_performance'][runtime]['categories'][category]['success_rate'] * 100
+
+def _category_mean(data, category):
+    return mean([_success_rate(data, runtime, category) for runtime, _, _ in RUNTIMES])
+
+def select_runtime_success(data, inputs):
+    return {'labels': [name for _, name, _ in RUNTIMES],
+            'values': [mean([_success_rate(data, runtime, cat) for cat in CATEGORIES])
+                       for runtime, _, _ in RUNTIMES]}
+
+def select_category_success(data, inputs):
+    return {'categories': [cat.title() for cat in CATEGORIES],
+            'series': [[name, [_success_rate(data, runtime, cat) for cat in CATEGORIES]]
+                       for runtime, name, _ in RUNTIMES]}
+
+def select_degradation(data, inputs):
+    values = []
+    for runtime, _, _ in RUNTIMES:
+        described = data['runtime_performance'][runtime]['degradation_under_load']
+        low, high = _DEGRADATION.search(described).groups()
+        values.append((int(low) + int(high)) / 2)
+    return {'labels': [name for _, name, _ in RUNTIMES], 'values': values}
+
+def select_metric(key, scale=1):
+    """Seleção de uma métrica global (painéis do gráfico 4)"""
+    def select(data, inputs):
+        return {'labels': ['Bateria 3'], 'values': [data['global_metrics'][key] / scale]}
+    return select
+
+def select_heatmap(data, inputs):
+    return {'rows': [name for _, name, _ in RUNTIMES], 'cols': [cat.title() for cat in CATEGORIES],
+            'matrix': [[_success_rate(data, runtime, cat) for cat in CATEGORIES]
+                       for runtime, _, _ in RUNTIMES]}
+
+def select_ranking(data, inputs):
+    rank = {runtime: data['runtime_performance'][runtime]['overall_performance_rank']
+            for runtime, _, _ in RUNTIMES}
+    ranked = sorted(RUNTIMES, key=lambda r: rank[r[0]])
+    return {'labels': [name for _, name, _ in ranked],
+            'values': [100 - rank[runtime] * 10 for runtime, _, _ in ranked]}
+
+def select_iterations(data, inputs):
+    total = data['test_metadata']['total_iterations']
+    return {'labels': [f'{total:,}\nIterações'], 'values': [total]}
+
+def select_success(data, inputs):
     error_rate = data['test_metadata']['error_rate']
-    success_rate = 100 - error_rate
-    ax3.pie([success_rate, error_rate], labels=['Sucesso', 'Erro'], 
-            colors=['#2ECC71', '#E74C3C'], autopct='%1.1f%%', startangle=90)
-    ax3.set_title('✅ Taxa de Sucesso', fontweight='bold')
-    
-    # 4. Throughput Timeline (linha do meio - span de 3 colunas)
-    ax4 = fig.add_subplot(gs[1, :])
-    stages = ['10 VUs', '25 VUs', '50 VUs', '100 VUs', '200 VUs', '0 VUs']
-    times = [1, 2, 3, 4, 5, 5.5]
-    throughput_est = [20, 35, 55, 58, 52, 0]  # Estimativa baseada nos dados
-    
-    ax4.plot(times, throughput_est, marker='o', linewidth=3, markersize=8, color='#3498DB')
-    ax4.fill_between(times, throughput_est, alpha=0.3, color='#3498DB')
-    ax4.set_xlabel('Tempo (minutos)')
-    ax4.set_ylabel('Throughput (req/s)')
-    ax4.set_title('📈 Evolução do Throughput Durante o Teste', fontweight='bold')
-    ax4.grid(True, alpha=0.3)
-    
-    # Adicionar anotações dos estágios
-    for i, (time, stage) in enumerate(zip(times[:-1], stages[:-1])):
-        ax4.annotate(stage, (time, throughput_est[i]), 
-                    textcoords="offset points", xytext=(0,10), ha='center')
-    
-    # 5. Best Categories (linha inferior esquerda)
-    ax5 = fig.add_subplot(gs[2, 0])
-    best_cats = ['Static', 'Cache', 'File']
-    best_perf = [98, 95, 93]  # Estimativa média
-    ax5.bar(best_cats, best_perf, color=['#2ECC71', '#3498DB', '#9B59B6'], alpha=0.8)
-    ax5.set_ylabel('Performance (%)')
-    ax5.set_title('🎯 Top 3 Categorias', fontweight='bold')
-    ax5.set_ylim(85, 100)
-    
-    # 6. Worst Categories (linha inferior meio)
-    ax6 = fig.add_subplot(gs[2, 1])
-    worst_cats = ['Concurrent', 'Memory', 'Runtime']
-    worst_perf = [85, 88, 90]  # Estimativa média
-    ax6.bar(worst_cats, worst_perf, color=['#E74C3C', '#F39C12', '#95A5A6'], alpha=0.8)
-    ax6.set_ylabel('Performance (%)')
-    ax6.set_title('⚠️ Categorias Desafiadoras', fontweight='bold')
-    ax6.set_ylim(80, 95)
-    
-    # 7. Response Time Distribution (linha inferior direita)
-    ax7 = fig.add_subplot(gs[2, 2])
-    response_times = ['< 500ms', '500ms-1s', '1s-2s', '> 2s']
-    percentages = [60, 25, 12, 3]  # Estimativa baseada nos dados
-    colors_rt = ['#2ECC71', '#F1C40F', '#E67E22', '#E74C3C']
-    
-    ax7.pie(percentages, labels=response_times, colors=colors_rt, autopct='%1.0f%%', startangle=90)
-    ax7.set_title('⏱️ Distribuição Tempo Resposta', fontweight='bold')
-    
-    # Título geral
-    fig.suptitle('Dashboard Completo - Bateria 3 Comprehensive Load Testing\n' + 
-                 f'TCC Analysis - {datetime.now().strftime("%d/%m/%Y %H:%M")}', 
-                 fontsize=18, fontweight='bold')
-    
-    plt.savefig('6_summary_dashboard.png', dpi=300, bbox_inches='tight')
-    plt.show()
-
-def main():
+    return {'labels': ['Sucesso', 'Erro'], 'values': [100 - error_rate, error_rate]}
+
+def select_requests_success(data, inputs):
+    metadata = data['test_metadata']
+    errors = round(metadata['total_iterations'] * metadata['error_rate'])
+    return {'labels': [f"Sucesso\n({metadata['total_iterations'] - errors:,})", f'Erros\n({errors})'],
+            'values': [100 - metadata['error_rate'] * 100, metadata['error_rate'] * 100]}
+
+def _ranked_categories(data):
+    ranks = data['category_analysis']['best_performing_categories']
+    return [entry['category'] for entry in sorted(ranks, key=lambda e: e['rank'])]
+
+def _category_bars(data, categories):
+    values = [_category_mean(data, cat) for cat in categories]
+    return {'labels': [cat.title() for cat in categories], 'values': values,
+            'options': {'ylim': (int(min(values)) - 5, 100)}}
+
+def select_top_categories(data, inputs):
+    return _category_bars(data, _ranked_categories(data)[:3])
+
+def select_worst_categories(data, inputs):
+    return _category_bars(data, _ranked_categories(data)[:-4:-1])
+
+def select_response_distribution(data, inputs):
+    # Estimativa: a distribuição por faixa não está nos dados agregados
+    return {'labels': ['< 500ms', '500ms-1s', '1s-2s', '> 2s'], 'values': [60, 25, 12, 3]}
+
+def select_runtime_share(data, inputs):
+    shares = data['data_distribution']['requests_per_runtime']
+    labels = ['Excelente\n(Swoole)', 'Muito Bom\n(PHP-FPM)', 'Regular\n(FrankenPHP)']
+    return {'labels': labels, 'values': [shares[runtime]['percentage'] for runtime, _, _ in RUNTIMES]}
+
+def select_category_share(data, inputs):
+    totals = {cat: sum(data['runtime_performance'][runtime]['categories'][cat]['total_requests']
+                       for runtime, _, _ in RUNTIMES) for cat in CATEGORIES}
+    top = sorted(totals, key=totals.get, reverse=True)[:4]
+    others = sum(totals.values()) - sum(totals[cat] for cat in top)
+    return {'labels': [cat.title() for cat in top] + ['Outros'],
+            'values': [totals[cat] for cat in top] + [others]}
+
+def _stage_labels(data):
+    return [f'{vus} VUs' for vus in data['test_metadata']['load_progression']]
+
+def select_throughput(data, inputs):
+    """Throughput medido por runtime (com amostras do k6) ou a estimativa por estágio"""
+    timeseries = inputs.get('timeseries')
+    if timeseries is None:
+        times = [1, 2, 3, 4, 5, 5.5]
+        throughput_est = [20, 35, 55, 58, 52, 0]  # Estimativa baseada nos dados
+        return {'series': [['Estimativa', times, throughput_est]],
+                'annotations': [[stage, t, y] for stage, t, y in
+                                zip(_stage_labels(data)[:-1], times[:-1], throughput_est)],
+                'options': {'title': '📈 Evolução do Throughput Durante o Teste '
+                                     '(estimativa, sem k6-results.json)',
+                            'marker': 'o', 'linewidth': 3, 'fill': True, 'color': '#3498DB'}}
+    series, stages = timeseries
+    lines = []
+    for runtime in dict.fromkeys(series['runtime'].tolist()):
+        rows = series[series['runtime'] == runtime]
+        minutes = (rows['start_s'] + TIMESERIES_WINDOW_S / 2) / 60
+        lines.append([runtime, minutes.tolist(), rows['rps'].tolist()])
+    # Limites e alvos dos estágios do script k6
+    top = float(series['rps'].max())
+    return {'series': lines,
+            'vlines': [stage.end_s / 60 for stage in stages],
+            'annotations': [[f'{stage.target} VUs', (stage.start_s + stage.end_s) / 120, top]
+                            for stage in stages],
+            'options': {'legend': 'upper left', 'ymin': 0}}
+
+def select_vus(data, inputs):
+    vus = data['test_metadata']['load_progression']
+    times = [i + 0.5 for i in range(len(vus))]
+    labels = [f'Stage {i + 1}\n{label}' for i, label in enumerate(_stage_labels(data))]
+    return {'series': [['Virtual Users', times, vus]],
+            'annotations': [[label, t, v] for label, t, v in zip(labels, times, vus)]}
+
+def select_stage_throughput(data, inputs):
+    if inputs.get('timeseries') is not None:
+        selected = select_throughput(data, inputs)
+        selected['options'] = {**selected['options'], 'title': 'Throughput Medido por Runtime'}
+        return selected
+    times = [i + 0.5 for i in range(len(data['test_metadata']['load_progression']))]
+    return {'series': [['Throughput', times, [18, 32, 48, 58, 52, 0]]]}  # Estimativa
+
+def dashboard_title(data):
+    return ('Dashboard Completo - Bateria 3 Comprehensive Load Testing\n'
+            f"TCC Analysis - {data['test_metadata']['date']}")
+
+# Especificações dos gráficos
+
+_BAR = {'edgecolor': 'black', 'grid': 0.3}
+_RESPONSE_COLORS = ['#2ECC71', '#F1C40F', '#E67E22', '#E74C3C']
+
+RUNTIME_COMPARISON = Chart('1_runtime_comparison.png', 'Comparação Geral de Runtime', [
+    Panel('bar', select_runtime_success, {
+        **_BAR, 'colors': RUNTIME_COLORS, 'fmt': '{:.1f}%', 'ylim': (0, 105),
+        'ylabel': 'Taxa de Sucesso Média (%)', 'title_size': 14,
+        'title': 'Performance Geral por Runtime\n(Requests com tempo < 2s)'}),
+], figsize=(10, 6))
+
+CATEGORY_PERFORMANCE = Chart('2_category_performance.png', 'Performance por Categoria', [
+    Panel('grouped_bar', select_category_success, {
+        'colors': RUNTIME_COLORS, 'width': 0.25, 'fmt': '{:.0f}%', 'label_size': 8,
+        'label_weight': 'normal', 'rotation': 45, 'legend': 'lower left', 'ylim': (0, 105),
+        'xlabel': 'Categoria de Operação', 'ylabel': 'Taxa de Sucesso (%)', 'title_size': 14,
+        'title': 'Performance por Categoria de Operação\n(Requests com tempo < 2s)'}),
+], figsize=(14, 8))
+
+DEGRADATION = Chart('3_degradation_patterns.png', 'Padrões de Degradação', [
+    Panel('bar', select_degradation, {
+        **_BAR, 'colors': RUNTIME_COLORS, 'fmt': '{:g}%', 'ylim': (0, 22), 'legend': 'best',
+        'hlines': [(5, 'orange', 'Limite Aceitável (5%)'), (10, 'red', 'Limite Crítico (10%)')],
+        'ylabel': 'Degradação de Performance (%)', 'title_size': 14,
+        'title': 'Degradação de Performance sob Alta Carga\n(200 VUs concorrentes)'}),
+], figsize=(10, 6))
+
+THROUGHPUT_METRICS = Chart('4_throughput_metrics.png', 'Métricas de Throughput', [
+    Panel('bar', select, {**_BAR, 'colors': [color], 'fmt': '{:.1f}', 'headroom': 1.2,
+                          'label_offset': 0.04, 'label_size': 12, 'title': title, 'ylabel': unit}, at)
+    for select, color, title, unit, at in [
+        (select_metric('throughput_rps'), '#FF6B6B', 'Throughput\n(req/s)', 'Requests/segundo', (0, 0)),
+        (select_metric('avg_response_time_ms'), '#4ECDC4', 'Avg Response\n(ms)', 'Milissegundos', (0, 1)),
+        (select_metric('p95_ms'), '#45B7D1', 'P95 Response\n(ms)', 'Milissegundos', (1, 0)),
+        (select_metric('max_response_time_ms', 1000), '#96CEB4', 'Max Response\n(s)', 'Segundos', (1, 1)),
+    ]
+], figsize=(12, 10), layout=(2, 2), title='Métricas Globais de Performance - Bateria 3')
+
+PERFORMANCE_HEATMAP = Chart('5_performance_heatmap.png', 'Heatmap de Performance', [
+    Panel('heatmap', select_heatmap, {
+        'vmin': 75, 'vmax': 100, 'fmt': '{:.0f}%', 'colorbar': 'Taxa de Sucesso (%)', 'title_size': 14,
+        'title': 'Heatmap de Performance: Runtime vs Categoria\n(Taxa de Sucesso %)'}),
+], figsize=(12, 6))
+
+SUMMARY_DASHBOARD = Chart('6_summary_dashboard.png', 'Dashboard Resumo', [
+    Panel('barh', select_ranking, {'colors': ['#FFD700', '#C0C0C0', '#CD7F32'],  # Ouro, Prata, Bronze
+                                   'xlabel': 'Score Performance', 'title': '🏆 Ranking Geral'}, (0, 0)),
+    Panel('pie', select_iterations, {'colors': ['#4ECDC4'], 'title': '📊 Total de Testes'}, (0, 1)),
+    Panel('pie', select_success, {'colors': ['#2ECC71', '#E74C3C'], 'autopct': '%1.1f%%',
+                                  'title': '✅ Taxa de Sucesso'}, (0, 2)),
+    Panel('line', select_throughput, {
+        'colors': {runtime: color for runtime, _, color in RUNTIMES}, 'grid': 0.3,
+        'xlabel': 'Tempo (minutos)', 'ylabel': 'Throughput (req/s)',
+        'title': '📈 Evolução do Throughput Durante o Teste'}, (1, (0, 3))),
+    Panel('bar', select_top_categories, {'colors': ['#2ECC71', '#3498DB', '#9B59B6'],
+                                         'ylabel': 'Performance (%)', 'title': '🎯 Top 3 Categorias'}, (2, 0)),
+    Panel('bar', select_worst_categories, {'colors': ['#E74C3C', '#F39C12', '#95A5A6'],
+                                           'ylabel': 'Performance (%)',
+                                           'title': '⚠️ Categorias Desafiadoras'}, (2, 1)),
+    Panel('pie', select_response_distribution, {'colors': _RESPONSE_COLORS, 'autopct': '%1.0f%%',
+                                                'title': '⏱️ Distribuição Tempo Resposta'}, (2, 2)),
+], figsize=(16, 12), layout=(3, 3), title=dashboard_title, inputs=('timeseries',))
+
+# Dashboard em pizza e progressão de carga do gerador simples
+SUMMARY_PIES = Chart('5_summary_dashboard.png', 'Dashboard de Resumo', [
+    Panel('pie', select_runtime_share, {
+        'colors': ['#2ECC71', '#3498DB', '#E74C3C'], 'autopct': '%1.1f%%', 'explode': (0.1, 0, 0),
+        'shadow': True, 'title': 'Distribuição de Performance\npor Runtime'}, (0, 0)),
+    Panel('pie', select_requests_success, {'colors': ['#2ECC71', '#E74C3C'], 'autopct': '%1.0f%%',
+                                           'title': 'Taxa de Sucesso Geral'}, (0, 1)),
+    Panel('pie', select_category_share, {
+        'colors': ['#9B59B6', '#E67E22', '#1ABC9C', '#F39C12', '#95A5A6'], 'autopct': '%1.0f%%',
+        'title': 'Distribuição por Categoria\nde Operação'}, (1, 0)),
+    Panel('pie', select_response_distribution, {'colors': _RESPONSE_COLORS, 'autopct': '%1.0f%%',
+                                                'title': 'Distribuição Tempo\nde Resposta'}, (1, 1)),
+], figsize=(10, 8), layout=(2, 2),
+    title='Dashboard de Resumo - Bateria 3 Comprehensive\nTCC Analysis - Load Testing Results')
+
+LOAD_PROGRESSION = Chart('6_load_progression.png', 'Progressão de Carga', [
+    Panel('line', select_vus, {'color': '#3498DB', 'marker': 'o', 'linewidth': 3, 'fill': True,
+                               'legend': 'best', 'grid': 0.3, 'annotation_size': 8,
+                               'ylabel': 'Virtual Users (VUs)', 'title_size': 14,
+                               'title': 'Progressão de Carga - Bateria 3'}, (0, 0)),
+    Panel('line', select_stage_throughput, {
+        'color': '#E74C3C', 'marker': 's', 'linewidth': 3, 'fill': True, 'legend': 'best', 'grid': 0.3,
+        'xlabel': 'Tempo (minutos)', 'ylabel': 'Throughput (req/s)', 'title_size': 14,
+        'title': 'Throughput Estimado por Estágio'}, (1, 0)),
+], figsize=(12, 10), layout=(2, 1), inputs=('timeseries',))
+
+# Conjuntos na ordem do relatório
+CHARTS = [RUNTIME_COMPARISON, CATEGORY_PERFORMANCE, DEGRADATION, THROUGHPUT_METRICS,
+          PERFORMANCE_HEATMAP, SUMMARY_DASHBOARD]
+SIMPLE_CHARTS = [RUNTIME_COMPARISON, CATEGORY_PERFORMANCE, DEGRADATION, THROUGHPUT_METRICS,
+                 SUMMARY_PIES, LOAD_PROGRESSION]
+# Os processos do pool recebem o nome do arquivo: as seleções não são serializáveis
+CHARTS_BY_FILE = {chart.filename: chart for chart in CHARTS + SIMPLE_CHARTS}
+
+def stale_charts(results_dir, cache, charts=CHARTS, samples=K6_SAMPLES):
+    """(gráfico, chave) dos gráficos cujas entradas mudaram desde a última renderização"""
+    data = load_data(results_dir)
+    digests = {'timeseries': samples_digest(os.path.join(results_dir, samples))}
+    stale = []
+    for chart in charts:
+        key = render_key(chart, data, digests)
+        if not cache.fresh(chart.filename, key):
+            stale.append((chart, key))
+    cache.skipped += len(charts) - len(stale)
+    return stale
+
+def chart_inputs(results_dir, stale, samples=K6_SAMPLES):
+    """Entradas externas dos gráficos a redesenhar; as amostras só são agregadas se preciso"""
+    if not any('timeseries' in chart.inputs for chart, _ in stale):
+        return {}
+    timeseries = load_timeseries(os.path.join(results_dir, samples))
+    if timeseries is None:
+        print(f"⚠️  {results_dir}: sem amostras do k6 ({samples}), throughput será estimado")
+    return {'timeseries': timeseries}
+
+def render_chart(results_dir, filename, inputs=None):
+    """Renderiza um gráfico de um diretório; devolve (diretório, arquivo, segundos)"""
+    start = time.perf_counter()
+    render(CHARTS_BY_FILE[filename], load_data(results_dir), results_dir, inputs)
+    return results_dir, filename, time.perf_counter() - start
+
+def _headless_worker():
+    pyplot(headless=True)
+
+def render_all(results_dirs, charts=CHARTS, samples=K6_SAMPLES, jobs=None, force=False):
+    """Gráficos desatualizados de todos os diretórios em um pool de processos"""
+    tasks = []
+    caches = {}
+    for results_dir in results_dirs:
+        cache = caches[results_dir] = RenderCache(results_dir, force)
+        stale = stale_charts(results_dir, cache, charts, samples)
+        inputs = chart_inputs(results_dir, stale, samples)
+        tasks.extend((results_dir, chart, key, inputs) for chart, key in stale)
+
+    start = time.perf_counter()
+    timings = []
+    if tasks:
+        with ProcessPoolExecutor(max_workers=jobs, initializer=_headless_worker) as pool:
+            futures = [pool.submit(render_chart, results_dir, chart.filename, inputs)
+                       for results_dir, chart, _, inputs in tasks]
+            for (results_dir, chart, key, _), future in zip(tasks, futures):
+                timings.append(future.result())
+                caches[results_dir].record(chart.filename, key)
+    for cache in caches.values():
+        cache.save()
+    skipped = sum(cache.skipped for cache in caches.values())
+    return timings, time.perf_counter() - start, skipped
+
+def print_timings(timings, wall):
+    """Relatório de tempo por figura"""
+    print(f"\n⏱️  Tempo por figura:")
+    for results_dir, filename, seconds in sorted(timings, key=lambda t: -t[2]):
+        print(f"   {seconds:7.2f}s  {os.path.basename(os.path.normpath(results_dir))}/{filename}")
+    total = sum(t[2] for t in timings)
+    print(f"   {len(timings)} figuras: {total:.2f}s somados, {wall:.2f}s de relógio "
+          f"({total / wall if wall else 0:.1f}x)")
+
+def main(charts=CHARTS, headless=False):
     """Função principal para gerar todos os gráficos"""
+    parser = argparse.ArgumentParser(description="Gráficos da Bateria 3")
+    parser.add_argument('results_dirs', nargs='*', default=[RESULTS_DIR],
+                        help=f"diretórios com {DATA_FILE} (padrão: o deste script)")
+    parser.add_argument('--headless', action='store_true', default=headless,
+                        help="backend Agg e uma figura por processo do pool")
+    parser.add_argument('--jobs', type=int, default=None, help="processos do pool (padrão: CPUs)")
+    parser.add_argument('--samples', default=K6_SAMPLES,
+                        help=f"amostras do k6 --out json em cada diretório (padrão: {K6_SAMPLES})")
+    parser.add_argument('--force', action='store_true', help="ignora o cache e redesenha tudo")
+    parser.add_argument('--list', action='store_true', help="lista os gráficos sem renderizar")
+    parser.add_argument('--data', action='store_true',
+                        help="imprime em JSON os valores de cada gráfico sem renderizar")
+    args = parser.parse_args()
+
+    if args.list:
+        for chart in charts:
+            kinds = ', '.join(dict.fromkeys(panel.kind for panel in chart.panels))
+            print(f"{chart.filename:<28} {chart.description:<28} {kinds}")
+        return
+    if args.data:
+        values = {results_dir: {chart.filename: panel_values(chart, load_data(results_dir))
+                                for chart in charts}
+                  for results_dir in args.results_dirs}
+        print(json.dumps(values, ensure_ascii=False, indent=2))
+        return
+
     print("🎨 Gerando gráficos da Bateria 3...")
-    
-    # Carregar dados
-    data = load_data()
-    
-    # Gerar gráficos
-    print("📊 1. Comparação Geral de Runtime...")
-    create_runtime_comparison_chart(data)
-    
-    print("📊 2. Performance por Categoria...")
-    create_category_performance_chart(data)
-    
-    print("📊 3. Padrões de Degradação...")
-    create_degradation_chart(data)
-    
-    print("📊 4. Métricas de Throughput...")
-    create_throughput_metrics_chart(data)
-    
-    print("📊 5. Heatmap de Performance...")
-    create_heatmap_chart(data)
-    
-    print("📊 6. Dashboard Resumo...")
-    create_summary_dashboard(data)
-    
+
+    if args.headless:
+        timings, wall, skipped = render_all(args.results_dirs, charts, args.samples, args.jobs, args.force)
+        print(f"✅ {len(timings)} gráficos gerados, {skipped} sem mudanças, "
+              f"em {len(args.results_dirs)} diretório(s)")
+        if timings:
+            print_timings(timings, wall)
+        return
+
+    for results_dir in args.results_dirs:
+        cache = RenderCache(results_dir, args.force)
+        stale = stale_charts(results_dir, cache, charts, args.samples)
+        inputs = chart_inputs(results_dir, stale, args.samples)
+        keys = {chart.filename: key for chart, key in stale}
+
+        # Gerar gráficos
+        for index, chart in enumerate(charts):
+            if chart.filename not in keys:
+                print(f"⏭️  {index + 1}. {chart.description} (sem mudanças)")
+                continue
+            print(f"📊 {index + 1}. {chart.description}...")
+            render_chart(results_dir, chart.filename, inputs)
+            cache.record(chart.filename, keys[chart.filename])
+        cache.save()
+
     print("✅ Todos os gráficos foram gerados com sucesso!")
     print("\n📁 Arquivos criados:")
-    print("   - 1_runtime_comparison.png")
-    print("   - 2_category_performance.png") 
-    print("   - 3_degradation_patterns.png")
-    print("   - 4_throughput_metrics.png")
-    print("   - 5_performance_heatmap.png")
-    print("   - 6_summary_dashboard.png")
+    for chart in charts:
+        print(f"   - {chart.filename}")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -1,253 +1,17 @@
 #!/usr/bin/env python3
 """
-Gerador de Gráficos Simples - Bateria 3 
+Gerador de Gráficos Simples - Bateria 3
 TCC - Análise de Performance de Runtimes PHP
-"""
-
-import matplotlib
-matplotlib.use('Agg')  # Backend para salvar sem display
-import matplotlib.pyplot as plt
-import json
-
-def load_data():
-    """Carrega os dados do arquivo JSON"""
-    with open('bateria_3_comprehensive_data.json', 'r', encoding='utf-8') as f:
-        return json.load(f)
-
-def create_runtime_comparison():
-    """Gráfico 1: Comparação de Performance por Runtime"""
-    data = load_data()
-    
-    # Dados simplificados baseados nos resultados
-    runtimes = ['Swoole', 'PHP-FPM', 'FrankenPHP']
-    performance = [98.2, 96.5, 84.1]  # Performance média estimada
-    colors = ['#2E8B57', '#4682B4', '#CD853F']
-    
-    plt.figure(figsize=(10, 6))
-    bars = plt.bar(runtimes, performance, color=colors, alpha=0.8, edgecolor='black')
-    
-    # Adicionar valores nas barras
-    for bar, value in zip(bars, performance):
-        height = bar.get_height()
-        plt.text(bar.get_x() + bar.get_width()/2., height + 0.5,
-                f'{value:.1f}%', ha='center', va='bottom', fontweight='bold', fontsize=12)
-    
-    plt.ylabel('Taxa de Sucesso Média (%)', fontweight='bold')
-    plt.title('Performance Geral por Runtime\n(Requests com tempo < 2s)', fontsize=14, fontweight='bold')
-    plt.ylim(0, 105)
-    plt.grid(True, alpha=0.3)
-    
-    plt.tight_layout()
-    plt.savefig('1_runtime_comparison.png', dpi=300, bbox_inches='tight')
-    plt.close()
 
-def create_category_performance():
-    """Gráfico 2: Performance por Categoria"""
-    categories = ['Static', 'Cache', 'File', 'Database', 'CPU', 'Mixed', 'Memory', 'Runtime', 'Concurrent']
-    
-    # Dados baseados nos resultados reais
-    swoole_perf = [99, 99, 99, 98, 98, 99, 98, 99, 97]
-    phpfpm_perf = [98, 97, 97, 96, 97, 96, 92, 98, 95]
-    frankenphp_perf = [82, 84, 85, 83, 83, 85, 82, 84, 78]
-    
-    x_pos = list(range(len(categories)))
-    width = 0.25
-    
-    plt.figure(figsize=(14, 8))
-    
-    plt.bar([x - width for x in x_pos], swoole_perf, width, label='Swoole', color='#2E8B57', alpha=0.8)
-    plt.bar(x_pos, phpfpm_perf, width, label='PHP-FPM', color='#4682B4', alpha=0.8)
-    plt.bar([x + width for x in x_pos], frankenphp_perf, width, label='FrankenPHP', color='#CD853F', alpha=0.8)
-    
-    plt.xlabel('Categoria de Operação', fontweight='bold')
-    plt.ylabel('Taxa de Sucesso (%)', fontweight='bold')
-    plt.title('Performance por Categoria de Operação\n(Requests com tempo < 2s)', fontsize=14, fontweight='bold')
-    plt.xticks(x_pos, categories, rotation=45, ha='right')
-    plt.legend(loc='lower left')
-    plt.ylim(70, 105)
-    plt.grid(True, alpha=0.3)
-    
-    plt.tight_layout()
-    plt.savefig('2_category_performance.png', dpi=300, bbox_inches='tight')
-    plt.close()
+Mesmo motor e mesmos dados de generate_charts.py, sempre sem display: os
+gráficos 1 a 4 são compartilhados e os dois últimos são o dashboard em
+pizza e a progressão de carga.
 
-def create_degradation_chart():
-    """Gráfico 3: Degradação sob Carga"""
-    runtimes = ['Swoole', 'PHP-FPM', 'FrankenPHP']
-    degradation = [2, 5, 18]
-    colors = ['#2E8B57', '#4682B4', '#CD853F']
-    
-    plt.figure(figsize=(10, 6))
-    bars = plt.bar(runtimes, degradation, color=colors, alpha=0.8, edgecolor='black')
-    
-    for bar, value in zip(bars, degradation):
-        height = bar.get_height()
-        plt.text(bar.get_x() + bar.get_width()/2., height + 0.5,
-                f'{value}%', ha='center', va='bottom', fontweight='bold', fontsize=12)
-    
-    plt.ylabel('Degradação de Performance (%)', fontweight='bold')
-    plt.title('Degradação de Performance sob Alta Carga\n(200 VUs concorrentes)', fontsize=14, fontweight='bold')
-    plt.ylim(0, 22)
-    
-    # Linhas de referência
-    plt.axhline(y=5, color='orange', linestyle='--', alpha=0.7, label='Limite Aceitável (5%)')
-    plt.axhline(y=10, color='red', linestyle='--', alpha=0.7, label='Limite Crítico (10%)')
-    plt.legend()
-    plt.grid(True, alpha=0.3)
-    
-    plt.tight_layout()
-    plt.savefig('3_degradation_patterns.png', dpi=300, bbox_inches='tight')
-    plt.close()
-
-def create_throughput_metrics():
-    """Gráfico 4: Métricas de Throughput"""
-    data = load_data()
-    
-    fig, ((ax1, ax2), (ax3, ax4)) = plt.subplots(2, 2, figsize=(12, 10))
-    
-    # Throughput
-    ax1.bar(['Bateria 3'], [57.8], color='#FF6B6B', alpha=0.8, edgecolor='black')
-    ax1.text(0, 60, '57.8', ha='center', va='bottom', fontweight='bold', fontsize=12)
-    ax1.set_title('Throughput (req/s)', fontweight='bold')
-    ax1.set_ylabel('Requests/segundo')
-    ax1.set_ylim(0, 70)
-    
-    # Tempo médio de resposta
-    ax2.bar(['Bateria 3'], [563.48], color='#4ECDC4', alpha=0.8, edgecolor='black')
-    ax2.text(0, 580, '563ms', ha='center', va='bottom', fontweight='bold', fontsize=12)
-    ax2.set_title('Tempo Médio de Resposta', fontweight='bold')
-    ax2.set_ylabel('Milissegundos')
-    ax2.set_ylim(0, 650)
-    
-    # P95
-    ax3.bar(['Bateria 3'], [2.95], color='#45B7D1', alpha=0.8, edgecolor='black')
-    ax3.text(0, 3.1, '2.95s', ha='center', va='bottom', fontweight='bold', fontsize=12)
-    ax3.set_title('P95 Response Time', fontweight='bold')
-    ax3.set_ylabel('Segundos')
-    ax3.set_ylim(0, 3.5)
-    
-    # Max Response
-    ax4.bar(['Bateria 3'], [11.68], color='#96CEB4', alpha=0.8, edgecolor='black')
-    ax4.text(0, 12, '11.7s', ha='center', va='bottom', fontweight='bold', fontsize=12)
-    ax4.set_title('Tempo Máximo de Resposta', fontweight='bold')
-    ax4.set_ylabel('Segundos')
-    ax4.set_ylim(0, 13)
-    
-    plt.suptitle('Métricas Globais de Performance - Bateria 3', fontsize=16, fontweight='bold')
-    plt.tight_layout()
-    plt.savefig('4_throughput_metrics.png', dpi=300, bbox_inches='tight')
-    plt.close()
-
-def create_summary_pie():
-    """Gráfico 5: Resumo em Pizza"""
-    # Distribuição de performance geral
-    labels = ['Excelente\n(Swoole)', 'Muito Bom\n(PHP-FPM)', 'Regular\n(FrankenPHP)']
-    sizes = [33.4, 33.4, 33.2]
-    colors = ['#2ECC71', '#3498DB', '#E74C3C']
-    explode = (0.1, 0, 0)  # destaque para o melhor
-    
-    plt.figure(figsize=(10, 8))
-    
-    plt.subplot(2, 2, 1)
-    plt.pie(sizes, explode=explode, labels=labels, colors=colors, autopct='%1.1f%%',
-            shadow=True, startangle=90)
-    plt.title('Distribuição de Performance\npor Runtime', fontweight='bold')
-    
-    # Taxa de sucesso geral
-    plt.subplot(2, 2, 2)
-    success_data = [100, 0]  # 100% sucesso, 0% erro
-    success_labels = ['Sucesso\n(20,947)', 'Erros\n(0)']
-    success_colors = ['#2ECC71', '#E74C3C']
-    plt.pie(success_data, labels=success_labels, colors=success_colors, autopct='%1.0f%%', startangle=90)
-    plt.title('Taxa de Sucesso Geral', fontweight='bold')
-    
-    # Categorias top
-    plt.subplot(2, 2, 3)
-    cat_labels = ['Static', 'Cache', 'File', 'Database', 'Outros']
-    cat_sizes = [20, 20, 15, 15, 30]
-    cat_colors = ['#9B59B6', '#E67E22', '#1ABC9C', '#F39C12', '#95A5A6']
-    plt.pie(cat_sizes, labels=cat_labels, colors=cat_colors, autopct='%1.0f%%', startangle=90)
-    plt.title('Distribuição por Categoria\nde Operação', fontweight='bold')
-    
-    # Response time distribution
-    plt.subplot(2, 2, 4)
-    rt_labels = ['< 500ms', '500ms-1s', '1s-2s', '> 2s']
-    rt_sizes = [60, 25, 12, 3]
-    rt_colors = ['#2ECC71', '#F1C40F', '#E67E22', '#E74C3C']
-    plt.pie(rt_sizes, labels=rt_labels, colors=rt_colors, autopct='%1.0f%%', startangle=90)
-    plt.title('Distribuição Tempo\nde Resposta', fontweight='bold')
-    
-    plt.suptitle('Dashboard de Resumo - Bateria 3 Comprehensive\nTCC Analysis - Load Testing Results', 
-                 fontsize=16, fontweight='bold')
-    plt.tight_layout()
-    plt.savefig('5_summary_dashboard.png', dpi=300, bbox_inches='tight')
-    plt.close()
-
-def create_load_progression():
-    """Gráfico 6: Progressão de Carga"""
-    stages = ['Stage 1\n10 VUs', 'Stage 2\n25 VUs', 'Stage 3\n50 VUs', 'Stage 4\n100 VUs', 'Stage 5\n200 VUs', 'Stage 6\n0 VUs']
-    times = [0.5, 1.5, 2.5, 3.5, 4.5, 5.5]
-    vus = [10, 25, 50, 100, 200, 0]
-    throughput_est = [18, 32, 48, 58, 52, 0]
-    
-    fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(12, 10))
-    
-    # VUs ao longo do tempo
-    ax1.plot(times, vus, marker='o', linewidth=3, markersize=8, color='#3498DB', label='Virtual Users')
-    ax1.fill_between(times, vus, alpha=0.3, color='#3498DB')
-    ax1.set_ylabel('Virtual Users (VUs)', fontweight='bold')
-    ax1.set_title('Progressão de Carga - Bateria 3', fontsize=14, fontweight='bold')
-    ax1.grid(True, alpha=0.3)
-    ax1.legend()
-    
-    # Throughput estimado
-    ax2.plot(times, throughput_est, marker='s', linewidth=3, markersize=8, color='#E74C3C', label='Throughput')
-    ax2.fill_between(times, throughput_est, alpha=0.3, color='#E74C3C')
-    ax2.set_xlabel('Tempo (minutos)', fontweight='bold')
-    ax2.set_ylabel('Throughput (req/s)', fontweight='bold')
-    ax2.set_title('Throughput Estimado por Estágio', fontsize=14, fontweight='bold')
-    ax2.grid(True, alpha=0.3)
-    ax2.legend()
-    
-    # Adicionar anotações
-    for i, stage in enumerate(stages):
-        ax1.annotate(stage, (times[i], vus[i]), textcoords="offset points", 
-                    xytext=(0,10), ha='center', fontsize=8)
-    
-    plt.tight_layout()
-    plt.savefig('6_load_progression.png', dpi=300, bbox_inches='tight')
-    plt.close()
+Uso: python3 generate_simple_charts.py [diretório ...] [--jobs N] [--force]
+                                       [--list | --data]
+"""
 
-def main():
-    """Função principal"""
-    print("🎨 Gerando gráficos da Bateria 3...")
-    
-    print("📊 1. Comparação de Runtime...")
-    create_runtime_comparison()
-    
-    print("📊 2. Performance por Categoria...")
-    create_category_performance()
-    
-    print("📊 3. Padrões de Degradação...")
-    create_degradation_chart()
-    
-    print("📊 4. Métricas de Throughput...")
-    create_throughput_metrics()
-    
-    print("📊 5. Dashboard de Resumo...")
-    create_summary_pie()
-    
-    print("📊 6. Progressão de Carga...")
-    create_load_progression()
-    
-    print("✅ Todos os gráficos foram gerados!")
-    print("\n📁 Arquivos PNG criados:")
-    print("   - 1_runtime_comparison.png")
-    print("   - 2_category_performance.png")
-    print("   - 3_degradation_patterns.png")
-    print("   - 4_throughput_metrics.png")
-    print("   - 5_summary_dashboard.png")
-    print("   - 6_load_progression.png")
+from generate_charts import SIMPLE_CHARTS, main
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main(SIMPLE_CHARTS, headless=True)
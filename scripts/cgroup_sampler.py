@@ -0,0 +1,368 @@
+#!/usr/bin/env python3
+"""Low-overhead resource sampler for the benchmark containers (cgroup v2).
+
+Every --interval (100 ms by default) the sampler reads each container's
+cgroup files directly:
+
+    cpu.stat, memory.current, memory.stat, io.stat,
+    cpu.pressure, memory.pressure, io.pressure
+
+It also reads /proc/<pid>/net/dev of the container's first process, and
+the same counters for the whole host from /proc. No subprocess is started
+after `docker inspect` resolves the cgroups at startup. Every file is
+opened once and re-read with pread(), so a sample costs a handful of
+syscalls per container.
+
+Samples are appended to a compact binary file. The first line is a magic
+string, the second a JSON header (columns, sources, interval), and then
+one record per tick of little-endian int64: the tick time in ns since the
+start, then len(COLUMNS) counters per source (-1 where a file is missing).
+Counters are stored raw (cumulative usec, bytes); rates are derived when
+reading.
+
+On exit (SIGINT, SIGTERM or --duration) the sampler reports its own CPU
+time, missed ticks and wake-up lateness, and writes them to <output>.json.
+
+Usage: python3 cgroup_sampler.py [container ...] [--interval 0.1] [--output resources.cgs]
+                                 [--duration S] [--cgroup name=/sys/fs/cgroup/...] [--no-host]
+       python3 cgroup_sampler.py --show resources.cgs [--csv resources.csv]
+"""
+
+import argparse
+import glob
+import json
+import math
+import os
+import resource
+import signal
+import subprocess
+import sys
+import time
+from array import array
+
+MAGIC = b'CGS1\n'
+CGROUP_ROOT = '/sys/fs/cgroup'
+DEFAULT_CONTAINERS = ('swoole_benchmark', 'frankenphp_benchmark', 'php_fpm_benchmark')
+HOST = 'host'
+FLUSH_EVERY_S = 1.0
+
+COLUMNS = (
+    'cpu_usage_usec', 'cpu_user_usec', 'cpu_system_usec', 'cpu_nr_throttled', 'cpu_throttled_usec',
+    'memory_current', 'memory_anon', 'memory_file', 'memory_kernel', 'memory_pgfault', 'memory_pgmajfault',
+    'io_rbytes', 'io_wbytes', 'io_rios', 'io_wios',
+    'net_rx_bytes', 'net_tx_bytes',
+    'cpu_some_usec', 'cpu_full_usec', 'memory_some_usec', 'memory_full_usec', 'io_some_usec', 'io_full_usec',
+)
+_INDEX = {name: i for i, name in enumerate(COLUMNS)}
+
+_CPU_STAT = {b'usage_usec': 'cpu_usage_usec', b'user_usec': 'cpu_user_usec',
+             b'system_usec': 'cpu_system_usec', b'nr_throttled': 'cpu_nr_throttled',
+             b'throttled_usec': 'cpu_throttled_usec'}
+_MEMORY_STAT = {b'anon': 'memory_anon', b'file': 'memory_file', b'kernel': 'memory_kernel',
+                b'pgfault': 'memory_pgfault', b'pgmajfault': 'memory_pgmajfault'}
+_USEC_PER_TICK = 1000000 // os.sysconf('SC_CLK_TCK')
+_IO_STAT = {b'rbytes': 'io_rbytes', b'wbytes': 'io_wbytes', b'rios': 'io_rios', b'wios': 'io_wios'}
+
+def _read(fd):
+    return os.pread(fd, 65536, 0)
+
+def _keyed(data, names, out):
+    # "key value" lines (cpu.stat, memory.stat)
+    for line in data.split(b'\n'):
+        key, _, value = line.partition(b' ')
+        name = names.get(key)
+        if name is not None:
+            out[_INDEX[name]] = int(value)
+
+def _io_stat(data, out):
+    # "8:0 rbytes=1 wbytes=2 rios=3 wios=4 ..." per device, summed
+    totals = dict.fromkeys(_IO_STAT.values(), 0)
+    for line in data.split(b'\n'):
+        for field in line.split(b' ')[1:]:
+            key, _, value = field.partition(b'=')
+            name = _IO_STAT.get(key)
+            if name is not None:
+                totals[name] += int(value)
+    for name, value in totals.items():
+        out[_INDEX[name]] = value
+
+def _pressure(resource_name):
+    some, full = _INDEX[f'{resource_name}_some_usec'], _INDEX[f'{resource_name}_full_usec']
+
+    def parse(data, out):
+        # "some avg10=0.00 avg60=0.00 avg300=0.00 total=123"
+        for line in data.split(b'\n'):
+            if line:
+                total = int(line.rpartition(b'total=')[2])
+                out[some if line.startswith(b'some') else full] = total
+    return parse
+
+def _single(name):
+    index = _INDEX[name]
+
+    def parse(data, out):
+        out[index] = int(data)
+    return parse
+
+def _net_dev(data, out):
+    # Two header lines, then "iface: rx_bytes ... (8 rx fields) tx_bytes ..."
+    rx = tx = 0
+    for line in data.split(b'\n')[2:]:
+        iface, _, counters = line.partition(b':')
+        fields = counters.split()
+        if fields and iface.strip() != b'lo':
+            rx += int(fields[0])
+            tx += int(fields[8])
+    out[_INDEX['net_rx_bytes']] = rx
+    out[_INDEX['net_tx_bytes']] = tx
+
+def _proc_stat(data, out):
+    # First line "cpu user nice system idle iowait irq softirq steal ..." in USER_HZ ticks
+    fields = data.split(b'\n', 1)[0].split()[1:]
+    user = (int(fields[0]) + int(fields[1])) * _USEC_PER_TICK
+    system = (int(fields[2]) + int(fields[5]) + int(fields[6])) * _USEC_PER_TICK
+    out[_INDEX['cpu_user_usec']] = user
+    out[_INDEX['cpu_system_usec']] = system
+    out[_INDEX['cpu_usage_usec']] = user + system
+
+def _field(data, key):
+    # Value after "key" at the start of a line, without splitting the whole file
+    at = data.find(b'\n' + key)
+    if at < 0:
+        return -1
+    start = at + 1 + len(key)
+    return int(data[start:data.index(b'\n', start)].split()[0])
+
+def _meminfo(data, out):
+    data = b'\n' + data
+    total, available = _field(data, b'MemTotal:'), _field(data, b'MemAvailable:')
+    out[_INDEX['memory_current']] = (total - available) * 1024
+    out[_INDEX['memory_anon']] = _field(data, b'AnonPages:') * 1024
+    out[_INDEX['memory_file']] = _field(data, b'Cached:') * 1024
+
+def _vmstat(data, out):
+    data = b'\n' + data
+    out[_INDEX['memory_pgfault']] = _field(data, b'pgfault ')
+    out[_INDEX['memory_pgmajfault']] = _field(data, b'pgmajfault ')
+
+class Source:
+    """Open files of one container (or the host) and their parsers"""
+
+    def __init__(self, name, files):
+        self.name = name
+        self.readers = []
+        for path, parse in files:
+            try:
+                self.readers.append((os.open(path, os.O_RDONLY), parse))
+            except OSError:
+                pass  # counter stays -1
+
+    def sample(self, out):
+        for fd, parse in self.readers:
+            try:
+                parse(_read(fd), out)
+            except (OSError, ValueError, IndexError, KeyError):
+                pass
+
+    def close(self):
+        for fd, _ in self.readers:
+            os.close(fd)
+
+def cgroup_source(name, path):
+    """Source reading the cgroup v2 directory path"""
+    files = [
+        (os.path.join(path, 'cpu.stat'), lambda data, out: _keyed(data, _CPU_STAT, out)),
+        (os.path.join(path, 'memory.current'), _single('memory_current')),
+        (os.path.join(path, 'memory.stat'), lambda data, out: _keyed(data, _MEMORY_STAT, out)),
+        (os.path.join(path, 'io.stat'), _io_stat),
+    ]
+    files += [(os.path.join(path, f'{r}.pressure'), _pressure(r)) for r in ('cpu', 'memory', 'io')]
+    try:
+        with open(os.path.join(path, 'cgroup.procs')) as f:
+            pid = f.readline().strip()
+        if pid:
+            files.append((f'/proc/{pid}/net/dev', _net_dev))
+    except OSError:
+        pass
+    return Source(name, files)
+
+def host_source():
+    """Source reading the whole machine from /proc"""
+    files = [('/proc/stat', _proc_stat), ('/proc/meminfo', _meminfo), ('/proc/vmstat', _vmstat),
+             ('/proc/net/dev', _net_dev)]
+    files += [(f'/proc/pressure/{r}', _pressure(r)) for r in ('cpu', 'memory', 'io')]
+    return Source(HOST, files)
+
+def find_cgroups(containers):
+    """{container: cgroup v2 directory}, resolved with one docker inspect"""
+    try:
+        output = subprocess.run(['docker', 'inspect', '--format', '{{.Name}} {{.Id}}', *containers],
+                                capture_output=True, text=True, timeout=30).stdout
+    except (OSError, subprocess.TimeoutExpired):
+        return {}
+    found = {}
+    for line in output.splitlines():
+        name, _, container_id = line.strip().lstrip('/').partition(' ')
+        candidates = [os.path.join(CGROUP_ROOT, 'system.slice', f'docker-{container_id}.scope'),
+                      os.path.join(CGROUP_ROOT, 'docker', container_id)]
+        candidates += glob.glob(os.path.join(CGROUP_ROOT, '**', f'*{container_id}*'), recursive=True)
+        path = next((c for c in candidates if os.path.exists(os.path.join(c, 'cpu.stat'))), None)
+        if path:
+            found[name] = path
+    return found
+
+def _percentile(values, p):
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(len(ordered) * p / 100) - 1)] if ordered else 0
+
+def record(sources, path, interval_s, duration_s=None):
+    """Sample sources into path until signalled; returns the overhead report"""
+    header = {'version': 1, 'interval_s': interval_s, 'start_unix': time.time(),
+              'columns': list(COLUMNS), 'sources': [s.name for s in sources]}
+    stop = []
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signum, lambda *_: stop.append(True))
+
+    width = len(COLUMNS)
+    lateness_us = array('q')
+    samples = missed = 0
+    usage_start = resource.getrusage(resource.RUSAGE_SELF)
+    start = time.monotonic_ns()
+    interval_ns = int(interval_s * 1e9)
+    deadline = start
+    with open(path, 'wb') as f:
+        f.write(MAGIC + json.dumps(header).encode() + b'\n')
+        buffer = array('q')
+        last_flush = start
+        while not stop:
+            now = time.monotonic_ns()
+            lateness_us.append((now - deadline) // 1000)
+            buffer.append(now - start)
+            for source in sources:
+                row = array('q', [-1]) * width
+                source.sample(row)
+                buffer.extend(row)
+            samples += 1
+            if now - last_flush >= FLUSH_EVERY_S * 1e9:
+                buffer.tofile(f)
+                f.flush()
+                buffer = array('q')
+                last_flush = now
+            if duration_s is not None and now - start >= duration_s * 1e9:
+                break
+            deadline += interval_ns
+            delay = deadline - time.monotonic_ns()
+            if delay < 0:
+                # Fell behind: skip the ticks already past instead of bursting
+                behind = -delay // interval_ns + 1
+                missed += behind
+                deadline += behind * interval_ns
+                delay = deadline - time.monotonic_ns()
+            time.sleep(max(delay, 0) / 1e9)
+        buffer.tofile(f)
+
+    usage_end = resource.getrusage(resource.RUSAGE_SELF)
+    wall_s = (time.monotonic_ns() - start) / 1e9
+    cpu_s = (usage_end.ru_utime - usage_start.ru_utime) + (usage_end.ru_stime - usage_start.ru_stime)
+    report = {
+        'samples': samples, 'missed_ticks': missed, 'wall_s': wall_s, 'cpu_s': cpu_s,
+        'cpu_percent_of_one_core': 100 * cpu_s / wall_s if wall_s else 0.0,
+        'cpu_us_per_sample': 1e6 * cpu_s / samples if samples else 0.0,
+        'lateness_p50_us': _percentile(lateness_us, 50), 'lateness_p99_us': _percentile(lateness_us, 99),
+        'lateness_max_us': max(lateness_us, default=0),
+        'bytes': os.path.getsize(path),
+    }
+    with open(path + '.json', 'w') as f:
+        json.dump({**header, 'overhead': report}, f, indent=2)
+    return report
+
+def load(path):
+    """(header, times_s, {source: {column: array('q')}}) of a sampler file"""
+    with open(path, 'rb') as f:
+        if f.readline() != MAGIC:
+            raise ValueError(f"{path}: not a cgroup_sampler file")
+        header = json.loads(f.readline())
+        records = array('q')
+        records.frombytes(f.read())
+    if sys.byteorder != 'little':
+        records.byteswap()
+    width = len(header['columns'])
+    stride = 1 + width * len(header['sources'])
+    records = records[:len(records) - len(records) % stride]
+    times = [t / 1e9 for t in records[0::stride]]
+    series = {}
+    for s, source in enumerate(header['sources']):
+        base = 1 + s * width
+        series[source] = {name: records[base + c::stride] for c, name in enumerate(header['columns'])}
+    return header, times, series
+
+def show(path, csv_path=None):
+    header, times, series = load(path)
+    span = times[-1] - times[0] if len(times) > 1 else 0.0
+    print(f"{path}: {len(times)} samples over {span:.1f}s every {header['interval_s'] * 1000:g} ms")
+    print(f"{'source':<22} {'cpu avg':>8} {'cpu max':>8} {'mem max':>10} {'io r/w MiB':>14} {'net rx/tx MiB':>15}")
+    for source, columns in series.items():
+        usage = columns['cpu_usage_usec']
+        rates = [(usage[i + 1] - usage[i]) / ((times[i + 1] - times[i]) * 1e6) * 100
+                 for i in range(len(times) - 1) if usage[i] >= 0 and times[i + 1] > times[i]]
+        average = (usage[-1] - usage[0]) / (span * 1e6) * 100 if span and usage[0] >= 0 else 0.0
+
+        def moved(name):
+            values = columns[name]
+            return (values[-1] - values[0]) / 2 ** 20 if values and values[0] >= 0 else 0.0
+        print(f"{source:<22} {average:>7.1f}% {max(rates, default=0):>7.1f}% "
+              f"{max(columns['memory_current'], default=-1) / 2 ** 20:>8.1f}Mi "
+              f"{moved('io_rbytes'):>6.1f}/{moved('io_wbytes'):<7.1f} {moved('net_rx_bytes'):>7.1f}/{moved('net_tx_bytes'):<7.1f}")
+    if csv_path:
+        with open(csv_path, 'w') as f:
+            f.write(','.join(['time_s', 'source'] + header['columns']) + '\n')
+            for i, t in enumerate(times):
+                for source, columns in series.items():
+                    f.write(f"{t:.4f},{source}," + ','.join(str(columns[c][i]) for c in header['columns']) + '\n')
+        print(f"CSV saved to: {csv_path}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Sample container cgroup v2 counters at sub-second intervals")
+    parser.add_argument('containers', nargs='*', help=f"default: {' '.join(DEFAULT_CONTAINERS)}")
+    parser.add_argument('--interval', type=float, default=0.1, help="seconds between samples (default: 0.1)")
+    parser.add_argument('--output', '-o', default='resources.cgs')
+    parser.add_argument('--duration', type=float, help="stop after this many seconds")
+    parser.add_argument('--cgroup', action='append', default=[], metavar='NAME=PATH',
+                        help="sample a cgroup directory directly; repeatable")
+    parser.add_argument('--no-host', action='store_true', help="skip the whole-machine counters")
+    parser.add_argument('--show', metavar='PATH', help="summarize a sampler file instead of recording")
+    parser.add_argument('--csv', help="with --show: write every sample as CSV")
+    args = parser.parse_args()
+
+    if args.show:
+        show(args.show, args.csv)
+        return 0
+
+    cgroups = dict(item.split('=', 1) for item in args.cgroup)
+    if not args.cgroup or args.containers:
+        containers = args.containers or list(DEFAULT_CONTAINERS)
+        found = find_cgroups(containers)
+        for name in containers:
+            if name not in found:
+                print(f"Warning: no cgroup v2 directory for container {name}", file=sys.stderr)
+        cgroups.update(found)
+    sources = [cgroup_source(name, path) for name, path in cgroups.items()]
+    if not args.no_host:
+        sources.append(host_source())
+    if not sources:
+        print("Nothing to sample")
+        return 1
+
+    print(f"Sampling {', '.join(s.name for s in sources)} every {args.interval * 1000:g} ms -> {args.output}")
+    report = record(sources, args.output, args.interval, args.duration)
+    for source in sources:
+        source.close()
+    print(f"{report['samples']} samples in {report['wall_s']:.1f}s, {report['missed_ticks']} missed ticks, "
+          f"{report['bytes'] / 1024:.0f} KiB")
+    print(f"Sampler overhead: {report['cpu_s']:.3f}s CPU = {report['cpu_percent_of_one_core']:.2f}% of one core, "
+          f"{report['cpu_us_per_sample']:.0f} us per sample; wake-up lateness "
+          f"p50 {report['lateness_p50_us']} us, p99 {report['lateness_p99_us']} us")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
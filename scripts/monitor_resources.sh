@@ -1,21 +1,36 @@
 #!/bin/bash
 
-#!/bin/bash
-
 # Script para monitorar recursos durante testes de carga
-# Coleta dados de CPU, memória e rede dos containers
+# Coleta dados de CPU, memória, I/O e rede dos containers
+#
+# Com cgroup v2 e python3, scripts/cgroup_sampler.py lê os arquivos do cgroup
+# de cada container a cada SAMPLE_INTERVAL (100 ms) sem abrir subprocessos
+# durante o teste, e grava resources.cgs (binário) + resources.cgs.json com o
+# overhead do próprio amostrador. Sem eles, volta ao docker stats a cada 5s.
 
 TIMESTAMP=$(date +%Y%m%d_%H%M%S)
-RESULTS_DIR="results/bateria_3_$TIMESTAMP"
-MONITOR_INTERVAL=5  # segundos entre coletas
+RESULTS_DIR="${RESULTS_DIR:-results/bateria_3_$TIMESTAMP}"
+MONITOR_INTERVAL=5  # segundos entre coletas (docker stats)
+SAMPLE_INTERVAL="${SAMPLE_INTERVAL:-0.1}"  # segundos entre coletas (cgroup v2)
+CONTAINERS=(swoole_benchmark frankenphp_benchmark php_fpm_benchmark)
+SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
 
 echo "🔍 Iniciando monitoramento de recursos..."
-echo "📊 Intervalo: ${MONITOR_INTERVAL}s"
 echo "📁 Diretório: $RESULTS_DIR"
 
 # Criar diretório de resultados
 mkdir -p "$RESULTS_DIR"
 
+if [[ -f /sys/fs/cgroup/cgroup.controllers ]] && command -v python3 >/dev/null 2>&1; then
+    echo "📊 cgroup v2: amostrando a cada ${SAMPLE_INTERVAL}s"
+    # exec: o PID continua o mesmo, e o SIGTERM do orquestrador encerra o amostrador
+    # com o relatório de overhead
+    exec python3 "$SCRIPT_DIR/cgroup_sampler.py" "${CONTAINERS[@]}" \
+        --interval "$SAMPLE_INTERVAL" --output "$RESULTS_DIR/resources.cgs"
+fi
+
+echo "⚠️  Sem cgroup v2 ou python3: usando docker stats a cada ${MONITOR_INTERVAL}s"
+
 # Função para coletar stats dos containers
 collect_container_stats() {
     local output_file="$1"
@@ -25,7 +40,7 @@ collect_container_stats() {
         
         # Coletar stats dos containers de benchmark
         docker stats --no-stream --format "table {{.Container}}\t{{.CPUPerc}}\t{{.MemUsage}}\t{{.NetIO}}\t{{.BlockIO}}" \
-            swoole_benchmark frankenphp_benchmark php_fpm_benchmark 2>/dev/null | \
+            "${CONTAINERS[@]}" 2>/dev/null | \
             while IFS=$'\t' read -r container cpu mem net block; do
                 if [[ "$container" != "CONTAINER" ]]; then
                     echo "$timestamp,$container,$cpu,$mem,$net,$block" >> "$output_file"
@@ -103,128 +118,3 @@ trap cleanup SIGINT SIGTERM
 while true; do
     sleep 1
 done
-# Monitora CPU, memória e I/O dos containers
-
-TIMESTAMP=$(date +%Y%m%d_%H%M%S)
-LOG_DIR="/home/incicle-zona/TCC/project-2/results/bateria_3_${TIMESTAMP}"
-CONTAINERS=("swoole_benchmark" "frankenphp_benchmark" "php_fpm_benchmark")
-
-echo "🔍 Iniciando monitoramento de recursos - Bateria 3"
-echo "📊 Timestamp: ${TIMESTAMP}"
-echo "📁 Logs salvos em: ${LOG_DIR}"
-
-# Criar diretório de logs
-mkdir -p "${LOG_DIR}"
-
-# Função para monitorar um container específico
-monitor_container() {
-    local container=$1
-    local output_file="${LOG_DIR}/${container}_resources.log"
-    
-    echo "🐳 Iniciando monitoramento do container: ${container}"
-    echo "timestamp,cpu_percent,memory_usage,memory_limit,memory_percent,network_rx,network_tx,block_read,block_write" > "${output_file}"
-    
-    while true; do
-        if docker ps --format "table {{.Names}}" | grep -q "^${container}$"; then
-            # Usar docker stats com formato personalizado
-            docker stats --no-stream --format "table {{.CPUPerc}},{{.MemUsage}},{{.MemPerc}},{{.NetIO}},{{.BlockIO}}" "${container}" 2>/dev/null | tail -n +2 | while IFS= read -r line; do
-                if [[ -n "$line" ]]; then
-                    timestamp=$(date '+%Y-%m-%d %H:%M:%S')
-                    # Processar linha e extrair métricas
-                    cpu=$(echo "$line" | cut -d',' -f1 | sed 's/%//')
-                    mem_usage=$(echo "$line" | cut -d',' -f2 | cut -d'/' -f1 | sed 's/[^0-9.]//g')
-                    mem_limit=$(echo "$line" | cut -d',' -f2 | cut -d'/' -f2 | sed 's/[^0-9.]//g')
-                    mem_percent=$(echo "$line" | cut -d',' -f3 | sed 's/%//')
-                    net_io=$(echo "$line" | cut -d',' -f4)
-                    net_rx=$(echo "$net_io" | cut -d'/' -f1 | sed 's/[^0-9.]//g')
-                    net_tx=$(echo "$net_io" | cut -d'/' -f2 | sed 's/[^0-9.]//g')
-                    block_io=$(echo "$line" | cut -d',' -f5)
-                    block_read=$(echo "$block_io" | cut -d'/' -f1 | sed 's/[^0-9.]//g')
-                    block_write=$(echo "$block_io" | cut -d'/' -f2 | sed 's/[^0-9.]//g')
-                    
-                    echo "${timestamp},${cpu},${mem_usage},${mem_limit},${mem_percent},${net_rx},${net_tx},${block_read},${block_write}" >> "${output_file}"
-                fi
-            done
-        else
-            echo "⚠️  Container ${container} não encontrado. Aguardando..."
-        fi
-        sleep 2
-    done
-}
-
-# Função para monitorar sistema geral
-monitor_system() {
-    local output_file="${LOG_DIR}/system_resources.log"
-    
-    echo "💻 Iniciando monitoramento do sistema"
-    echo "timestamp,cpu_usage,memory_total,memory_used,memory_free,load_avg_1m,load_avg_5m,load_avg_15m" > "${output_file}"
-    
-    while true; do
-        timestamp=$(date '+%Y-%m-%d %H:%M:%S')
-        
-        # CPU usage (overall)
-        cpu_usage=$(top -bn1 | grep "Cpu(s)" | awk '{print $2}' | sed 's/%us,//')
-        
-        # Memory info
-        memory_info=$(free -m | grep '^Mem:')
-        memory_total=$(echo "$memory_info" | awk '{print $2}')
-        memory_used=$(echo "$memory_info" | awk '{print $3}')
-        memory_free=$(echo "$memory_info" | awk '{print $4}')
-        
-        # Load average
-        load_avg=$(uptime | awk -F'load average:' '{print $2}' | sed 's/^ *//')
-        load_1m=$(echo "$load_avg" | cut -d',' -f1 | sed 's/^ *//')
-        load_5m=$(echo "$load_avg" | cut -d',' -f2 | sed 's/^ *//')
-        load_15m=$(echo "$load_avg" | cut -d',' -f3 | sed 's/^ *//')
-        
-        echo "${timestamp},${cpu_usage},${memory_total},${memory_used},${memory_free},${load_1m},${load_5m},${load_15m}" >> "${output_file}"
-        
-        sleep 5
-    done
-}
-
-# Função para parar monitoramento
-cleanup() {
-    echo "🛑 Parando monitoramento de recursos..."
-    pkill -f "monitor_container"
-    pkill -f "monitor_system"
-    
-    # Gerar relatório final
-    echo "📊 Gerando relatório de recursos..."
-    echo "# Relatório de Recursos - Bateria 3" > "${LOG_DIR}/RESOURCE_SUMMARY.md"
-    echo "**Timestamp:** ${TIMESTAMP}" >> "${LOG_DIR}/RESOURCE_SUMMARY.md"
-    echo "**Duração:** 5.5 minutos" >> "${LOG_DIR}/RESOURCE_SUMMARY.md"
-    echo "" >> "${LOG_DIR}/RESOURCE_SUMMARY.md"
-    
-    for container in "${CONTAINERS[@]}"; do
-        if [[ -f "${LOG_DIR}/${container}_resources.log" ]]; then
-            lines=$(wc -l < "${LOG_DIR}/${container}_resources.log")
-            echo "- **${container}:** ${lines} registros coletados" >> "${LOG_DIR}/RESOURCE_SUMMARY.md"
-        fi
-    done
-    
-    echo "✅ Monitoramento finalizado. Logs em: ${LOG_DIR}"
-    exit 0
-}
-
-# Capturar sinal de interrupção
-trap cleanup SIGINT SIGTERM
-
-# Iniciar monitoramento de containers em background
-for container in "${CONTAINERS[@]}"; do
-    monitor_container "$container" &
-done
-
-# Iniciar monitoramento do sistema
-monitor_system &
-
-# Aguardar sinal para parar
-echo "🔄 Monitoramento ativo. Pressione Ctrl+C para parar."
-echo "📁 Logs sendo salvos em tempo real em: ${LOG_DIR}"
-
-# Loop infinito até receber sinal
-while true; do
-    sleep 10
-    # Status check a cada 10 segundos
-    echo "📊 $(date '+%H:%M:%S') - Monitoramento ativo..."
-done
\ No newline at end of file
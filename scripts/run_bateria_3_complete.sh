@@ -35,6 +35,10 @@ cleanup() {
         kill "${MONITOR_PID}" 2>/dev/null || true
         wait "${MONITOR_PID}" 2>/dev/null || true
     fi
+    if [[ -n "${WORKERS_PID}" ]]; then
+        kill "${WORKERS_PID}" 2>/dev/null || true
+        wait "${WORKERS_PID}" 2>/dev/null || true
+    fi
     
     # Parar K6 se ainda estiver rodando
     pkill -f "k6-bateria-3-comprehensive" 2>/dev/null || true
@@ -47,7 +51,7 @@ trap cleanup SIGINT SIGTERM EXIT
 
 # Iniciar monitoramento de recursos em background
 echo "📊 Iniciando monitoramento de recursos..."
-"${PROJECT_DIR}/scripts/monitor_resources.sh" &
+RESULTS_DIR="${LOG_DIR}" "${PROJECT_DIR}/scripts/monitor_resources.sh" &
 MONITOR_PID=$!
 sleep 3  # Aguardar inicialização do monitoramento
 
@@ -58,6 +62,14 @@ if ! kill -0 "${MONITOR_PID}" 2>/dev/null; then
 fi
 
 echo "✅ Monitoramento ativo (PID: ${MONITOR_PID})"
+
+# Telemetria por worker (filhos do php-fpm, workers Octane, threads FrankenPHP)
+if [[ -f /sys/fs/cgroup/cgroup.controllers ]] && command -v python3 >/dev/null 2>&1; then
+    python3 "${PROJECT_DIR}/scripts/worker_sampler.py" --output "${LOG_DIR}/workers.csv" \
+        > "${LOG_DIR}/worker_sampler.log" 2>&1 &
+    WORKERS_PID=$!
+    echo "✅ Telemetria por worker ativa (PID: ${WORKERS_PID})"
+fi
 echo ""
 
 # Executar teste K6
@@ -94,6 +106,11 @@ sleep 10
 echo "🛑 Parando monitoramento..."
 kill "${MONITOR_PID}" 2>/dev/null || true
 wait "${MONITOR_PID}" 2>/dev/null || true
+if [[ -n "${WORKERS_PID}" ]]; then
+    kill "${WORKERS_PID}" 2>/dev/null || true
+    wait "${WORKERS_PID}" 2>/dev/null || true
+    WORKERS_PID=""
+fi
 
 # Gerar relatório consolidado
 echo "📊 Gerando relatório consolidado..."
@@ -136,21 +153,35 @@ cat > "${LOG_DIR}/BATERIA_3_SUMMARY.md" << EOF
 
 - \`k6-results.json\` - Dados brutos do K6
 - \`k6-output.txt\` - Log completo da execução
-- \`*_resources.log\` - Logs de recursos por container
-- \`system_resources.log\` - Recursos do sistema
+- \`report.html\` - Séries temporais por runtime (throughput e latência)
+- \`resources.cgs\` - Recursos por container a cada 100 ms (cgroup v2; \`python3 scripts/cgroup_sampler.py --show\`)
+- \`workers.csv\` - RSS, CPU, trocas de contexto e FDs por worker (\`WORKERS.txt\` = desequilíbrio e respawns)
+- \`container_stats.csv\` / \`system_stats.csv\` - docker stats a cada 5s, no lugar de \`resources.cgs\` sem cgroup v2
 - \`RESOURCE_SUMMARY.md\` - Resumo de recursos
 
 ## 📊 Análise de Recursos
 
 EOF
 
-# Adicionar estatísticas básicas se arquivos existirem
-for container in "swoole_benchmark" "frankenphp_benchmark" "php_fpm_benchmark"; do
-    if [[ -f "${LOG_DIR}/${container}_resources.log" ]]; then
-        lines=$(wc -l < "${LOG_DIR}/${container}_resources.log")
-        echo "- **${container}:** ${lines} registros de recursos" >> "${LOG_DIR}/BATERIA_3_SUMMARY.md"
+# Estatísticas básicas do monitor que rodou: cgroup_sampler.py ou docker stats
+if [[ -s "${LOG_DIR}/resources.cgs" ]]; then
+    {
+        echo '```'
+        python3 "${PROJECT_DIR}/scripts/cgroup_sampler.py" --show "${LOG_DIR}/resources.cgs" 2>&1 || true
+        echo '```'
+    } >> "${LOG_DIR}/BATERIA_3_SUMMARY.md"
+elif [[ -s "${LOG_DIR}/container_stats.csv" ]]; then
+    for container in "swoole_benchmark" "frankenphp_benchmark" "php_fpm_benchmark"; do
+        lines=$(grep -c ",${container}," "${LOG_DIR}/container_stats.csv" || true)
+        echo "- **${container}:** ${lines} registros de recursos (docker stats)" >> "${LOG_DIR}/BATERIA_3_SUMMARY.md"
+    done
+    if [[ -s "${LOG_DIR}/system_stats.csv" ]]; then
+        lines=$(($(wc -l < "${LOG_DIR}/system_stats.csv") - 1))
+        echo "- **sistema:** ${lines} registros de recursos" >> "${LOG_DIR}/BATERIA_3_SUMMARY.md"
     fi
-done
+else
+    echo "- ⚠️ Nenhum arquivo de recursos (resources.cgs ou container_stats.csv) encontrado" >> "${LOG_DIR}/BATERIA_3_SUMMARY.md"
+fi
 
 cat >> "${LOG_DIR}/BATERIA_3_SUMMARY.md" << EOF
 
@@ -168,6 +199,30 @@ Esta bateria coletou dados abrangentes sobre:
 **🔬 Material científico completo para análise comparativa de runtimes PHP modernos!**
 EOF
 
+# Relatório HTML com séries temporais por runtime (LTTB, abre rápido mesmo em runs grandes)
+if [[ -f "${LOG_DIR}/k6-results.json" ]] && python3 -c "import numpy" 2>/dev/null; then
+    echo "📈 Gerando relatório HTML..."
+    python3 "${PROJECT_DIR}/docker/wrk/html_report.py" "${LOG_DIR}/k6-results.json" \
+        --script "${PROJECT_DIR}/benchmark/k6-bateria-3-comprehensive.js" \
+        --output "${LOG_DIR}/report.html" || true
+fi
+
+# Recursos por stage ao lado da latência (resources.cgs ou container_stats.csv)
+if [[ -f "${LOG_DIR}/k6-results.json" ]] && python3 -c "import pandas" 2>/dev/null; then
+    echo "📊 Gerando resumo de recursos por stage..."
+    python3 "${PROJECT_DIR}/docker/wrk/resource_stats.py" "${LOG_DIR}" \
+        --script "${PROJECT_DIR}/benchmark/k6-bateria-3-comprehensive.js" \
+        --csv "${LOG_DIR}/resources_timeline.csv" \
+        --summary "${LOG_DIR}/RESOURCE_SUMMARY.md" || true
+fi
+
+# Desequilíbrio entre workers, respawns (pm.max_requests) e crescimento de memória
+if [[ -s "${LOG_DIR}/workers.csv" ]]; then
+    echo "👷 Resumindo telemetria por worker..."
+    python3 "${PROJECT_DIR}/scripts/worker_sampler.py" --show "${LOG_DIR}/workers.csv" \
+        --units-csv "${LOG_DIR}/workers_units.csv" > "${LOG_DIR}/WORKERS.txt" || true
+fi
+
 echo ""
 echo "🎉 BATERIA 3 CONCLUÍDA COM SUCESSO!"
 echo "═══════════════════════════════════════"
@@ -175,7 +230,12 @@ echo "📁 Resultados salvos em: ${LOG_DIR}"
 echo "📊 Arquivos principais:"
 echo "   - BATERIA_3_SUMMARY.md"
 echo "   - k6-results.json"
-echo "   - *_resources.log"
+echo "   - report.html"
+if [[ -f "${LOG_DIR}/resources.cgs" ]]; then
+    echo "   - resources.cgs"
+else
+    echo "   - container_stats.csv, system_stats.csv"
+fi
 echo ""
 echo "🎓 Dados coletados: Performance + Recursos + Todas as categorias de endpoint!"
 echo "📈 Próximo passo: Análise detalhada dos dados para o TCC"
\ No newline at end of file
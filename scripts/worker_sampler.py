@@ -0,0 +1,398 @@
+#!/usr/bin/env python3
+"""Per-worker /proc telemetry for the benchmark containers.
+
+Container totals hide how load is spread across workers: 50 php-fpm
+children, 4 Octane workers plus 4 task workers, FrankenPHP threads. Every
+--interval (1 s by default) the sampler lists each container's PIDs from
+its cgroup.procs and reads, per process:
+
+    /proc/<pid>/stat     utime, stime (clock ticks), RSS, start time
+    /proc/<pid>/status   voluntary / involuntary context switches
+    /proc/<pid>/fd       open file descriptors
+
+With --threads (default for frankenphp containers) every thread in
+/proc/<pid>/task is recorded too, as role 'thread'. The process row keeps
+the CPU of all its threads, and the RSS and FDs they share.
+
+A worker is identified by (pid, tid, start time), so a php-fpm child
+replaced after pm.max_requests, or a reused PID, is a new worker and the
+old one shows as exited. Files are opened once per worker and re-read with
+pread(). Samples are CSV lines, one per worker per tick, with a unix time;
+the worker command lines and the overhead report go to <output>.json.
+
+--show rolls a file up per container and role: respawns, CPU per worker
+with max/mean imbalance and coefficient of variation, involuntary
+switches per CPU-second, RSS and its creep (MiB/min, least squares), FDs,
+and the hottest workers.
+
+Usage: python3 worker_sampler.py [container ...] [--interval 1] [--output workers.csv]
+                                 [--duration S] [--cgroup name=/sys/fs/cgroup/...] [--threads name]
+       python3 worker_sampler.py --show workers.csv [--top 5] [--units-csv units.csv]
+"""
+
+import argparse
+import json
+import math
+import os
+import resource
+import signal
+import statistics
+import sys
+import time
+
+from cgroup_sampler import DEFAULT_CONTAINERS, FLUSH_EVERY_S, find_cgroups
+
+CLK_TCK = os.sysconf('SC_CLK_TCK')
+PAGE_SIZE = os.sysconf('SC_PAGE_SIZE')
+FIELDS = ('time', 'container', 'pid', 'tid', 'start', 'role', 'utime', 'stime', 'rss_bytes',
+          'voluntary_ctxt', 'nonvoluntary_ctxt', 'fds')
+# Roles that serve requests; skew is computed among these
+LOAD_ROLES = ('worker', 'task_worker', 'thread')
+THREADED = ('frankenphp',)
+
+def role_of(cmdline):
+    """Role from a process title: php-fpm pool, Octane/Swoole process names, nginx"""
+    title = cmdline.lower()
+    if 'task' in title:
+        return 'task_worker'
+    if 'manager' in title:
+        return 'manager'
+    if 'master' in title:
+        return 'master'
+    if 'worker' in title or 'pool' in title:
+        return 'worker'
+    return 'other'
+
+def _stat(data):
+    # comm may contain spaces and parentheses: split after the last ')'
+    fields = data[data.rindex(b')') + 2:].split()
+    # utime, stime, starttime, rss (pages), from field 14, 15, 22, 24
+    return int(fields[11]), int(fields[12]), int(fields[19]), int(fields[21])
+
+def _switches(data):
+    voluntary = data.find(b'\nvoluntary_ctxt_switches:')
+    involuntary = data.find(b'\nnonvoluntary_ctxt_switches:')
+    if voluntary < 0 or involuntary < 0:
+        return -1, -1
+    return (int(data[voluntary + 25:data.index(b'\n', voluntary + 1)]),
+            int(data[involuntary + 28:data.index(b'\n', involuntary + 1)]))
+
+class Unit:
+    """Open /proc files of one process or thread"""
+
+    def __init__(self, container, pid, tid, role):
+        base = f'/proc/{pid}' if tid == pid else f'/proc/{pid}/task/{tid}'
+        self.stat = os.open(f'{base}/stat', os.O_RDONLY)
+        try:
+            self.status = os.open(f'{base}/status', os.O_RDONLY)
+        except OSError:
+            os.close(self.stat)
+            raise
+        self.fd_dir = f'/proc/{pid}/fd' if tid == pid else None
+        self.container, self.pid, self.tid, self.role = container, pid, tid, role
+        self.start = _stat(os.pread(self.stat, 4096, 0))[2]
+
+    def sample(self, now):
+        """CSV line of the current counters; OSError once the process is gone"""
+        utime, stime, start, rss = _stat(os.pread(self.stat, 4096, 0))
+        if start != self.start:
+            raise ProcessLookupError(self.pid)
+        voluntary, involuntary = _switches(b'\n' + os.pread(self.status, 8192, 0))
+        fds = -1
+        if self.fd_dir is not None:
+            fds = len(os.listdir(self.fd_dir))
+        rss_bytes = rss * PAGE_SIZE if self.fd_dir is not None else -1
+        return (f"{now:.3f},{self.container},{self.pid},{self.tid},{self.start},{self.role},"
+                f"{utime},{stime},{rss_bytes},{voluntary},{involuntary},{fds}\n")
+
+    def close(self):
+        os.close(self.stat)
+        os.close(self.status)
+
+def _cmdline(pid):
+    try:
+        with open(f'/proc/{pid}/cmdline', 'rb') as f:
+            return f.read().replace(b'\0', b' ').decode(errors='replace').strip()
+    except OSError:
+        return ''
+
+class Container:
+    """PIDs of one cgroup and the Units open for them"""
+
+    def __init__(self, name, cgroup, threads=False):
+        self.name = name
+        self.procs = os.open(os.path.join(cgroup, 'cgroup.procs'), os.O_RDONLY)
+        self.threads = threads
+        self.units = {}
+        self.commands = {}
+
+    def _tids(self, pid):
+        if not self.threads:
+            return [pid]
+        try:
+            return [int(tid) for tid in os.listdir(f'/proc/{pid}/task')]
+        except OSError:
+            return []
+
+    def sample(self, now, out):
+        pids = [int(pid) for pid in os.pread(self.procs, 65536, 0).split()]
+        seen = set()
+        for pid in pids:
+            for tid in self._tids(pid):
+                key = (pid, tid)
+                seen.add(key)
+                unit = self.units.get(key)
+                if unit is None:
+                    try:
+                        command = _cmdline(pid)
+                        unit = Unit(self.name, pid, tid, role_of(command) if tid == pid else 'thread')
+                    except (OSError, ValueError):
+                        continue
+                    self.units[key] = unit
+                    self.commands[f'{pid}/{tid}/{unit.start}'] = command
+                try:
+                    out.append(unit.sample(now))
+                except (OSError, ValueError):
+                    # Exited, or the PID was reused: the next tick opens it afresh
+                    unit.close()
+                    del self.units[key]
+        for key in [key for key in self.units if key not in seen]:
+            self.units.pop(key).close()
+
+    def close(self):
+        for unit in self.units.values():
+            unit.close()
+        os.close(self.procs)
+
+def record(containers, path, interval_s, duration_s=None):
+    """Sample containers into path until signalled; returns the overhead report"""
+    stop = []
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signum, lambda *_: stop.append(True))
+
+    samples = lines = missed = 0
+    usage_start = resource.getrusage(resource.RUSAGE_SELF)
+    start = time.monotonic()
+    deadline = start
+    with open(path, 'w') as f:
+        f.write(','.join(FIELDS) + '\n')
+        buffer = []
+        last_flush = start
+        while not stop:
+            now = time.time()
+            for container in containers:
+                try:
+                    container.sample(now, buffer)
+                except OSError:
+                    pass  # container stopped; its cgroup is gone
+            samples += 1
+            if time.monotonic() - last_flush >= FLUSH_EVERY_S:
+                lines += len(buffer)
+                f.writelines(buffer)
+                f.flush()
+                buffer = []
+                last_flush = time.monotonic()
+            if duration_s is not None and time.monotonic() - start >= duration_s:
+                break
+            deadline += interval_s
+            delay = deadline - time.monotonic()
+            if delay < 0:
+                behind = int(-delay // interval_s) + 1
+                missed += behind
+                deadline += behind * interval_s
+                delay = deadline - time.monotonic()
+            time.sleep(max(delay, 0))
+        lines += len(buffer)
+        f.writelines(buffer)
+
+    usage_end = resource.getrusage(resource.RUSAGE_SELF)
+    wall_s = time.monotonic() - start
+    cpu_s = (usage_end.ru_utime - usage_start.ru_utime) + (usage_end.ru_stime - usage_start.ru_stime)
+    report = {
+        'samples': samples, 'lines': lines, 'missed_ticks': missed, 'wall_s': wall_s, 'cpu_s': cpu_s,
+        'cpu_percent_of_one_core': 100 * cpu_s / wall_s if wall_s else 0.0,
+        'cpu_us_per_line': 1e6 * cpu_s / lines if lines else 0.0,
+    }
+    commands = {}
+    for container in containers:
+        commands.update(container.commands)
+    with open(path + '.json', 'w') as f:
+        json.dump({'version': 1, 'interval_s': interval_s, 'clk_tck': CLK_TCK, 'fields': list(FIELDS),
+                   'containers': [c.name for c in containers], 'commands': commands, 'overhead': report},
+                  f, indent=2)
+    return report
+
+def load(path):
+    """{(container, pid, tid, start): {'role', 't', 'cpu', 'rss', 'voluntary', 'involuntary', 'fds'}}"""
+    units = {}
+    with open(path) as f:
+        next(f)
+        for line in f:
+            t, container, pid, tid, start, role, utime, stime, rss, voluntary, involuntary, fds = \
+                line.rstrip('\n').split(',')
+            unit = units.get((container, pid, tid, start))
+            if unit is None:
+                unit = units[(container, pid, tid, start)] = {
+                    'role': role, 't': [], 'cpu': [], 'rss': [], 'voluntary': [], 'involuntary': [], 'fds': []}
+            unit['t'].append(float(t))
+            unit['cpu'].append(int(utime) + int(stime))
+            unit['rss'].append(int(rss))
+            unit['voluntary'].append(int(voluntary))
+            unit['involuntary'].append(int(involuntary))
+            unit['fds'].append(int(fds))
+    return units
+
+def _slope(xs, ys):
+    # Least-squares slope of ys over xs
+    n = len(xs)
+    mean_x, mean_y = sum(xs) / n, sum(ys) / n
+    var = sum((x - mean_x) ** 2 for x in xs)
+    return sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys)) / var if var else 0.0
+
+def unit_stats(units, interval_s, clk_tck=CLK_TCK):
+    """One dict per worker: lifetime, CPU %, switches, RSS creep, FDs, spawned/exited"""
+    spans = {}
+    for (container, *_), unit in units.items():
+        first, last = spans.get(container, (math.inf, -math.inf))
+        spans[container] = (min(first, unit['t'][0]), max(last, unit['t'][-1]))
+    slack = 1.5 * interval_s
+    stats = []
+    for (container, pid, tid, start), unit in units.items():
+        t = unit['t']
+        life_s = t[-1] - t[0]
+        cpu_s = (unit['cpu'][-1] - unit['cpu'][0]) / clk_tck
+        rss = [r for r in unit['rss'] if r >= 0]
+        creep = None
+        if len(rss) >= 3 and life_s > 0:
+            creep = _slope([x for x, r in zip(t, unit['rss']) if r >= 0], rss) * 60 / 2 ** 20
+        fds = [n for n in unit['fds'] if n >= 0]
+        first, last = spans[container]
+        stats.append({
+            'container': container, 'role': unit['role'], 'pid': int(pid), 'tid': int(tid),
+            'samples': len(t), 'life_s': life_s, 'cpu_s': cpu_s,
+            'cpu_percent': 100 * cpu_s / life_s if life_s > 0 else None,
+            'voluntary': unit['voluntary'][-1] - unit['voluntary'][0],
+            'involuntary': unit['involuntary'][-1] - unit['involuntary'][0],
+            'rss_max_mib': max(rss) / 2 ** 20 if rss else None,
+            'rss_creep_mib_per_min': creep,
+            'fds_max': max(fds) if fds else None,
+            'fds_growth': fds[-1] - fds[0] if fds else None,
+            'spawned': t[0] > first + slack, 'exited': t[-1] < last - slack,
+        })
+    return stats
+
+def rollup(stats):
+    """One dict per (container, role): respawns, CPU skew, switches, RSS creep, FDs"""
+    groups = {}
+    for unit in stats:
+        groups.setdefault((unit['container'], unit['role']), []).append(unit)
+    rows = []
+    for (container, role), members in sorted(groups.items()):
+        # CPU rates of workers that lived for at least two ticks
+        rated = [u for u in members if u['cpu_percent'] is not None and u['samples'] >= 3]
+        cpu = [u['cpu_percent'] for u in rated]
+        mean = statistics.fmean(cpu) if cpu else 0.0
+        cpu_s = sum(u['cpu_s'] for u in members)
+        creeps = [u['rss_creep_mib_per_min'] for u in members if u['rss_creep_mib_per_min'] is not None]
+        rss = [u['rss_max_mib'] for u in members if u['rss_max_mib'] is not None]
+        lives = [u['life_s'] for u in members if u['exited']]
+        rows.append({
+            'container': container, 'role': role, 'workers': len(members),
+            'respawns': sum(u['spawned'] for u in members), 'exits': sum(u['exited'] for u in members),
+            'median_life_s': statistics.median(lives) if lives else None,
+            'cpu_s': cpu_s, 'cpu_percent_mean': mean, 'cpu_percent_max': max(cpu, default=0.0),
+            'imbalance': max(cpu) / mean if cpu and mean > 0 else None,
+            'cv': statistics.pstdev(cpu) / mean if len(cpu) > 1 and mean > 0 else None,
+            'involuntary_per_cpu_s': sum(u['involuntary'] for u in members) / cpu_s if cpu_s else None,
+            'rss_mean_mib': statistics.fmean(rss) if rss else None,
+            'rss_max_mib': max(rss, default=None),
+            'creep_median_mib_per_min': statistics.median(creeps) if creeps else None,
+            'creep_max_mib_per_min': max(creeps, default=None),
+            'fds_max': max((u['fds_max'] for u in members if u['fds_max'] is not None), default=None),
+        })
+    return rows
+
+def _fmt(value, spec):
+    return '-' if value is None else format(value, spec)
+
+def show(path, top=5, units_csv=None):
+    with open(path + '.json') as f:
+        meta = json.load(f)
+    stats = unit_stats(load(path), meta['interval_s'], meta.get('clk_tck', CLK_TCK))
+    print(f"{path}: {len(stats)} workers, every {meta['interval_s']:g}s")
+    print(f"{'container':<22} {'role':<12} {'n':>4} {'resp':>5} {'life':>6} {'cpu avg':>8} {'cpu max':>8} "
+          f"{'max/avg':>7} {'cv':>5} {'invol/cpu-s':>11} {'rss avg':>8} {'rss max':>8} {'creep':>9} {'fds':>5}")
+    for row in rollup(stats):
+        print(f"{row['container']:<22} {row['role']:<12} {row['workers']:>4} {row['respawns']:>5} "
+              f"{_fmt(row['median_life_s'], '.0f'):>5}s {row['cpu_percent_mean']:>7.1f}% "
+              f"{row['cpu_percent_max']:>7.1f}% {_fmt(row['imbalance'], '.2f'):>7} {_fmt(row['cv'], '.2f'):>5} "
+              f"{_fmt(row['involuntary_per_cpu_s'], '.0f'):>11} {_fmt(row['rss_mean_mib'], '.1f'):>6}Mi "
+              f"{_fmt(row['rss_max_mib'], '.1f'):>6}Mi {_fmt(row['creep_max_mib_per_min'], '+.2f'):>5}Mi/m "
+              f"{_fmt(row['fds_max'], 'd'):>5}")
+
+    hot = sorted((u for u in stats if u['role'] in LOAD_ROLES and u['cpu_percent'] is not None),
+                 key=lambda u: u['cpu_percent'], reverse=True)[:top]
+    if hot:
+        print("\nHottest workers:")
+        for unit in hot:
+            ident = unit['pid'] if unit['tid'] == unit['pid'] else f"{unit['pid']}/{unit['tid']}"
+            print(f"  {unit['container']:<22} {unit['role']:<12} {ident!s:>13} {unit['cpu_percent']:>6.1f}% "
+                  f"over {unit['life_s']:.0f}s, {unit['involuntary']} involuntary switches")
+    if units_csv:
+        fields = list(stats[0]) if stats else []
+        with open(units_csv, 'w') as f:
+            f.write(','.join(fields) + '\n')
+            for unit in stats:
+                f.write(','.join('' if unit[k] is None else str(unit[k]) for k in fields) + '\n')
+        print(f"Per-worker CSV saved to: {units_csv}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Sample per-worker /proc counters of the benchmark containers")
+    parser.add_argument('containers', nargs='*', help=f"default: {' '.join(DEFAULT_CONTAINERS)}")
+    parser.add_argument('--interval', type=float, default=1.0, help="seconds between samples (default: 1)")
+    parser.add_argument('--output', '-o', default='workers.csv')
+    parser.add_argument('--duration', type=float, help="stop after this many seconds")
+    parser.add_argument('--cgroup', action='append', default=[], metavar='NAME=PATH',
+                        help="sample the processes of a cgroup directory; repeatable")
+    parser.add_argument('--threads', action='append', metavar='NAME',
+                        help=f"containers to sample per thread (default: names containing {', '.join(THREADED)})")
+    parser.add_argument('--show', metavar='PATH', help="roll up a sampler file instead of recording")
+    parser.add_argument('--top', type=int, default=5, help="with --show: hottest workers to list")
+    parser.add_argument('--units-csv', help="with --show: write the per-worker statistics as CSV")
+    args = parser.parse_args()
+
+    if args.show:
+        show(args.show, args.top, args.units_csv)
+        return 0
+
+    cgroups = dict(item.split('=', 1) for item in args.cgroup)
+    if not args.cgroup or args.containers:
+        names = args.containers or list(DEFAULT_CONTAINERS)
+        found = find_cgroups(names)
+        for name in names:
+            if name not in found:
+                print(f"Warning: no cgroup v2 directory for container {name}", file=sys.stderr)
+        cgroups.update(found)
+    containers = []
+    for name, path in cgroups.items():
+        threaded = name in args.threads if args.threads else any(t in name for t in THREADED)
+        try:
+            containers.append(Container(name, path, threaded))
+        except OSError as e:
+            print(f"Warning: {name}: {e}", file=sys.stderr)
+    if not containers:
+        print("Nothing to sample")
+        return 1
+
+    print(f"Sampling workers of {', '.join(c.name for c in containers)} every {args.interval:g}s -> {args.output}")
+    report = record(containers, args.output, args.interval, args.duration)
+    for container in containers:
+        container.close()
+    print(f"{report['samples']} ticks, {report['lines']} worker samples in {report['wall_s']:.1f}s, "
+          f"{report['missed_ticks']} missed ticks")
+    print(f"Sampler overhead: {report['cpu_s']:.3f}s CPU = {report['cpu_percent_of_one_core']:.2f}% of one core, "
+          f"{report['cpu_us_per_line']:.0f} us per worker sample")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())